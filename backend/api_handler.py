@@ -1,11 +1,28 @@
 import os
 import json
+import time
+import base64
 import logging
 import traceback
-from datetime import datetime, timedelta
+from datetime import datetime
 import pathlib
 
 from race_calendar_fetcher import RaceCalendarFetcher, DEFAULT_YEAR
+from calendar_index import parse_calendar_query, parse_year_range
+from circuits import get_timezone
+from clock import parse_at
+from degradation import UNAVAILABLE
+from calendar_archive import IMMUTABLE_CACHE_CONTROL
+from lap_analytics import LapAnalytics
+from circuit_breaker import CircuitOpenError
+from cache_manager import CacheManager
+from rate_limit import RateLimiter, client_identity
+from ics_export import FEED_MAX_AGE, etag_matches, parse_session_filter
+from results_store import RESULTS_DB, ResultsStore
+from dashboard import Dashboard, parse_sections
+from job_queue import admin_authorized
+from profiling import SlowRequestProfiler
+from serialization import encode, CALENDAR_SCHEMA, NEXT_RACE_SCHEMA, RACE_SCHEMA
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -15,7 +32,7 @@ logger = logging.getLogger(__name__)
 # Create cache and data directories
 base_path = pathlib.Path(__file__).parent.resolve()
 cache_dir = os.path.join(base_path, 'cache')
-data_dir = os.path.join(base_path, 'data')
+data_dir = os.environ.get('DATA_DIR') or os.path.join(base_path, 'data')
 
 for directory in [cache_dir, data_dir]:
     os.makedirs(directory, exist_ok=True)
@@ -24,15 +41,81 @@ for directory in [cache_dir, data_dir]:
 # Initialize race calendar fetcher
 calendar_fetcher = RaceCalendarFetcher(data_dir=data_dir, cache_dir=cache_dir)
 
+# Per-client token buckets (per function instance unless RATE_LIMIT_STORAGE is shared)
+rate_limiter = RateLimiter()
+
+# Keeps the FastF1 cache under FASTF1_CACHE_QUOTA_MB, never evicting the current season
+cache_manager = CacheManager(cache_dir)
+try:
+    cache_manager.enforce()
+except Exception as e:
+    logger.error(f"Error enforcing FastF1 cache quota: {e}")
+
+# Lap frames per session with memoized pace aggregates (per function instance);
+# loads share the calendar's FastF1 breaker
+lap_analytics = LapAnalytics(cache_manager=cache_manager, breaker=calendar_fetcher.upstream)
+
+# Standings and winners come from the results index when it was deployed with the function
+results_store = None
+if os.path.exists(os.path.join(data_dir, RESULTS_DB)):
+    try:
+        results_store = ResultsStore(os.path.join(data_dir, RESULTS_DB))
+    except Exception as e:
+        logger.error(f"Error opening results index: {e}")
+
+# Next race, calendar, standings and last winner in one response, cached per section
+dashboard = Dashboard(calendar_fetcher, results_store)
+
+# Opt-in stack sampling of slow invocations (PROFILING_ENABLED=1); profiles live as long as the instance
+request_profiler = SlowRequestProfiler()
+
+def _client_address(event):
+    """Client address as reported by the Netlify edge"""
+    request_headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+    address = request_headers.get('x-nf-client-connection-ip') or request_headers.get('client-ip')
+    if not address and request_headers.get('x-forwarded-for'):
+        address = request_headers['x-forwarded-for'].split(',')[0].strip()
+    return request_headers, address
+
+def _json_body(payload, schema=None):
+    """Encode a response body with the shared serializer"""
+    return encode(payload, schema).decode('utf-8')
+
+def _unavailable(headers, freshness, message):
+    """503 with Retry-After for when upstream is failing and nothing is stored to serve"""
+    return {
+        'statusCode': 503,
+        'headers': dict(headers, **freshness.headers()),
+        'body': _json_body({
+            "error": "Calendar unavailable",
+            "message": message,
+            "freshness": freshness.to_dict()
+        })
+    }
+
 def handler(event, context):
     """Main handler function for Netlify Functions"""
+    if not request_profiler.enabled:
+        return _handle(event, context)
+    query_params = event.get('queryStringParameters') or {}
+    token = request_profiler.start_request(f"{event.get('httpMethod', 'GET')} /{query_params.get('path', '')}")
+    response = None
+    try:
+        response = _handle(event, context)
+        return response
+    finally:
+        request_profiler.finish_request(token, response['statusCode'] if response else 500)
+
+def _handle(event, context):
+    """Route one Netlify Functions event"""
     logger.info(f"Received event: {json.dumps(event)}")
     
     # Add CORS headers
     headers = {
         'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+        'Access-Control-Allow-Headers': 'Content-Type,Authorization,If-None-Match',
         'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
+        'Access-Control-Expose-Headers': 'ETag,Retry-After,X-RateLimit-Limit,X-RateLimit-Remaining,X-Data-Age,X-Data-Stale',
         'Content-Type': 'application/json'
     }
     
@@ -51,73 +134,223 @@ def handler(event, context):
         
         logger.info(f"Handling path: {path}")
         
+        if path not in ('health', 'health/live', 'health/ready', 'metrics'):
+            request_headers, address = _client_address(event)
+            decision = rate_limiter.check(client_identity(request_headers, address))
+            headers.update(decision.headers())
+            if not decision.allowed:
+                return {
+                    'statusCode': 429,
+                    'headers': headers,
+                    'body': _json_body({"error": "Too many requests"})
+                }
+        
+        # Optional viewer timezone and time-travel instant for calendar, next-race and race routes
+        tz = query_params.get('tz')
+        at = None
+        if tz or query_params.get('at'):
+            try:
+                if tz:
+                    get_timezone(tz)
+                if query_params.get('at'):
+                    at = parse_at(query_params['at'])
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': _json_body({"error": "Invalid query", "message": str(e)})
+                }
+        
         # Route to appropriate handler based on the path
-        if path.startswith('calendar'):
+        if path == 'calendars':
+            try:
+                years = parse_year_range(query_params, DEFAULT_YEAR)
+                query = parse_calendar_query(query_params)
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': _json_body({"error": "Invalid query", "message": str(e)})
+                }
+            
+            logger.info(f"Querying calendars for years: {years[0]}-{years[-1]}")
+            try:
+                return {
+                    'statusCode': 200,
+                    'headers': headers,
+                    'body': _json_body(calendar_fetcher.query_calendars(years, query))
+                }
+            except Exception as e:
+                logger.error(f"Error querying calendars: {str(e)}", exc_info=True)
+                return {
+                    'statusCode': 500,
+                    'headers': headers,
+                    'body': _json_body({"error": str(e)})
+                }
+        
+        elif path.startswith('calendar') and path.endswith('.ics'):
+            # calendar.ics or calendar/2025.ics
+            year = DEFAULT_YEAR
+            parts = path[:-len('.ics')].split('/')
+            if len(parts) > 1 and parts[1].isdigit():
+                year = parts[1]
+            
+            try:
+                query = parse_calendar_query(query_params)
+                sessions = parse_session_filter(query_params.get('sessions'))
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': _json_body({"error": "Invalid query", "message": str(e)})
+                }
+            
+            feed = calendar_fetcher.get_calendar_feed(str(year), query, sessions)
+            if feed is None:
+                return {
+                    'statusCode': 500,
+                    'headers': headers,
+                    'body': _json_body({"error": "No calendar data available"})
+                }
+            
+            etag, body = feed
+            feed_headers = dict(headers, **{
+                'Content-Type': 'text/calendar; charset=utf-8',
+                'ETag': etag,
+                'Cache-Control': f'public, max-age={FEED_MAX_AGE}'
+            })
+            request_headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+            if etag_matches(request_headers.get('if-none-match'), etag):
+                return {
+                    'statusCode': 304,
+                    'headers': feed_headers,
+                    'body': ''
+                }
+            return {
+                'statusCode': 200,
+                'headers': feed_headers,
+                'body': body.decode('utf-8')
+            }
+        
+        elif path.startswith('calendar'):
             # Extract year if provided (calendar/2025)
             parts = path.split('/')
             year = DEFAULT_YEAR
             if len(parts) > 1 and parts[1].isdigit():
                 year = parts[1]
+            
+            if len(parts) > 2 and parts[2] == 'changes':
+                since = query_params.get('since')
+                if since is not None and since.isdigit():
+                    since = int(since)
+                try:
+                    return {
+                        'statusCode': 200,
+                        'headers': headers,
+                        'body': _json_body(calendar_fetcher.get_calendar_changes(str(year), since))
+                    }
+                except ValueError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': _json_body({"error": "Invalid since parameter", "message": str(e)})
+                    }
+            
+            try:
+                query = parse_calendar_query(query_params)
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': _json_body({"error": "Invalid query", "message": str(e)})
+                }
                 
             logger.info(f"Fetching calendar for year: {year}")
             try:
-                calendar_data = calendar_fetcher.get_calendar(str(year))
+                if query.is_empty and tz:
+                    calendar_data = calendar_fetcher.get_localized_calendar(str(year), tz, at=at)
+                elif query.is_empty:
+                    calendar_data = calendar_fetcher.get_calendar(str(year), at=at)
+                else:
+                    calendar_data = calendar_fetcher.query_calendar(str(year), query, tz=tz, at=at)
+                freshness = calendar_fetcher.freshness(str(year))
+                if not calendar_data or 'error' in calendar_data:
+                    error = (calendar_data or {}).get('error') or "No calendar data available"
+                    if freshness.tier == UNAVAILABLE:
+                        return _unavailable(headers, freshness, error)
+                    return {
+                        'statusCode': 500,
+                        'headers': headers,
+                        'body': _json_body({"error": error})
+                    }
+                calendar_headers = dict(headers, **freshness.headers())
+                if at is None and calendar_fetcher.is_archived(year):
+                    calendar_headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+                if query.is_empty and not tz and not freshness.stale:
+                    # The whole season: reuse the bytes encoded once per season version
+                    body = calendar_fetcher.get_encoded_calendar(str(year), at=at).decode('utf-8')
+                else:
+                    body = _json_body(freshness.mark(calendar_data), CALENDAR_SCHEMA)
                 return {
                     'statusCode': 200,
-                    'headers': headers,
-                    'body': json.dumps(calendar_data)
+                    'headers': calendar_headers,
+                    'body': body
                 }
             except Exception as e:
                 logger.error(f"Error fetching calendar: {str(e)}", exc_info=True)
                 return {
                     'statusCode': 500,
                     'headers': headers,
-                    'body': json.dumps({"error": str(e)})
+                    'body': _json_body({"error": str(e)})
                 }
                 
         elif path == 'next-race':
             logger.info("Fetching next race")
             try:
-                next_race = calendar_fetcher.get_next_race()
-                if next_race:
-                    return {
-                        'statusCode': 200,
-                        'headers': headers,
-                        'body': json.dumps(next_race)
-                    }
-                else:
-                    # Create a demo race for testing
-                    demo_race = {
-                        "name": "Demo Grand Prix",
-                        "round": 1,
-                        "country": "Demo Country",
-                        "location": "Demo Circuit",
-                        "date": (datetime.now() + timedelta(days=10)).isoformat(),
-                        "status": "future",
-                        "is_sprint": False,
-                        "format": "conventional",
-                        "demo_mode": True,
-                        "sessions": {
-                            "practice_1": (datetime.now() + timedelta(days=8)).isoformat(),
-                            "practice_2": (datetime.now() + timedelta(days=8, hours=4)).isoformat(),
-                            "practice_3": (datetime.now() + timedelta(days=9)).isoformat(),
-                            "qualifying": (datetime.now() + timedelta(days=9, hours=4)).isoformat(),
-                            "race": (datetime.now() + timedelta(days=10)).isoformat()
-                        }
-                    }
-                    return {
-                        'statusCode': 200,
-                        'headers': headers,
-                        'body': json.dumps(demo_race)
-                    }
+                next_race = calendar_fetcher.get_next_race(at=at)
+                if next_race and tz:
+                    next_race = calendar_fetcher.localize_race_dict(str(DEFAULT_YEAR), next_race, tz)
+                freshness = calendar_fetcher.freshness(str(DEFAULT_YEAR))
+                if not next_race:
+                    # No calendar to answer from: say so instead of inventing a race
+                    return _unavailable(headers, freshness, "No calendar data available to determine the next race")
+                return {
+                    'statusCode': 200,
+                    'headers': dict(headers, **freshness.headers()),
+                    'body': _json_body(freshness.mark(next_race), NEXT_RACE_SCHEMA)
+                }
             except Exception as e:
                 logger.error(f"Error fetching next race: {str(e)}", exc_info=True)
                 return {
                     'statusCode': 500,
                     'headers': headers,
-                    'body': json.dumps({"error": str(e)})
+                    'body': _json_body({"error": str(e)})
                 }
                 
+        elif path == 'dashboard' or path.startswith('dashboard/'):
+            # dashboard or dashboard/2025
+            parts = path.split('/')
+            year = parts[1] if len(parts) > 1 and parts[1].isdigit() else DEFAULT_YEAR
+            request_headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+            try:
+                sections = parse_sections(query_params.get('sections'))
+                etag, payload, not_modified = dashboard.build(
+                    str(year), tz=tz, sections=sections, if_none_match=request_headers.get('if-none-match'), at=at)
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': _json_body({"error": "Invalid query", "message": str(e)})
+                }
+            
+            freshness = calendar_fetcher.freshness(str(year))
+            dashboard_headers = dict(headers, **freshness.headers(), **{'ETag': etag, 'Cache-Control': 'no-cache'})
+            return {
+                'statusCode': 304 if not_modified else 200,
+                'headers': dashboard_headers,
+                'body': '' if not_modified else _json_body(freshness.mark(payload))
+            }
+        
         elif path.startswith('race/'):
             # Extract round number
             parts = path.split('/')
@@ -125,32 +358,35 @@ def handler(event, context):
                 return {
                     'statusCode': 400,
                     'headers': headers,
-                    'body': json.dumps({"error": "Missing round number"})
+                    'body': _json_body({"error": "Missing round number"})
                 }
                 
             try:
                 round_number = int(parts[1])
                 logger.info(f"Fetching race by round: {round_number}")
-                race_data = calendar_fetcher.get_race_by_round(round_number)
+                race_data = calendar_fetcher.get_race_by_round(round_number, year=str(DEFAULT_YEAR), tz=tz, at=at)
+                freshness = calendar_fetcher.freshness(str(DEFAULT_YEAR))
                 
                 if race_data:
                     return {
                         'statusCode': 200,
-                        'headers': headers,
-                        'body': json.dumps(race_data)
+                        'headers': dict(headers, **freshness.headers()),
+                        'body': _json_body(freshness.mark(race_data), RACE_SCHEMA)
                     }
+                elif freshness.tier == UNAVAILABLE:
+                    return _unavailable(headers, freshness, f"No calendar data available to look up round {round_number}")
                 else:
                     return {
                         'statusCode': 404,
                         'headers': headers,
-                        'body': json.dumps({"error": "Race not found"})
+                        'body': _json_body({"error": "Race not found"})
                     }
             except Exception as e:
                 logger.error(f"Error fetching race: {str(e)}", exc_info=True)
                 return {
                     'statusCode': 500,
                     'headers': headers,
-                    'body': json.dumps({"error": str(e)})
+                    'body': _json_body({"error": str(e)})
                 }
         
         # Health check endpoint
@@ -158,19 +394,134 @@ def handler(event, context):
             return {
                 'statusCode': 200,
                 'headers': headers,
-                'body': json.dumps({
+                'body': _json_body({
                     "status": "healthy",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": datetime.now().isoformat(),
+                    "cache": cache_manager.usage()
                 })
             }
         
+        elif path.startswith('analytics/'):
+            # analytics/<year>/<round>/<session>/<metric>
+            parts = path.split('/')
+            if len(parts) != 5 or not parts[1].isdigit() or not parts[2].isdigit():
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': _json_body({"error": "Expected analytics/<year>/<round>/<session>/<metric>"})
+                }
+            try:
+                return {
+                    'statusCode': 200,
+                    'headers': headers,
+                    'body': _json_body(lap_analytics.aggregate(parts[4], parts[1], parts[2], parts[3]))
+                }
+            except ValueError as e:
+                return {
+                    'statusCode': 404,
+                    'headers': headers,
+                    'body': _json_body({"error": "Analytics not available", "message": str(e)})
+                }
+            except CircuitOpenError as e:
+                return {
+                    'statusCode': 503,
+                    'headers': dict(headers, **{'Retry-After': str(max(1, int(e.retry_at - time.time())))}),
+                    'body': _json_body({"error": "Analytics unavailable", "message": str(e)})
+                }
+            except Exception as e:
+                logger.error(f"Error computing lap analytics: {str(e)}", exc_info=True)
+                return {
+                    'statusCode': 500,
+                    'headers': headers,
+                    'body': _json_body({"error": str(e)})
+                }
+        
+        elif path == 'health/live':
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': _json_body({"status": "alive", "timestamp": datetime.now().isoformat()})
+            }
+        
+        elif path == 'health/ready':
+            # Answered from in-memory state only
+            report = calendar_fetcher.readiness()
+            report["tiers"]["fastf1_cache"] = cache_manager.usage()
+            report["status"] = "ready" if report["ready"] else "not_ready"
+            report["timestamp"] = datetime.now().isoformat()
+            return {
+                'statusCode': 200 if report["ready"] else 503,
+                'headers': headers,
+                'body': _json_body(report)
+            }
+        
+        elif path == 'metrics':
+            request_headers, _ = _client_address(event)
+            if not admin_authorized(request_headers):
+                return {
+                    'statusCode': 403,
+                    'headers': headers,
+                    'body': _json_body({"error": "Forbidden", "message": "A valid admin token is required"})
+                }
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': _json_body({
+                    "timestamp": datetime.now().isoformat(),
+                    "rate_limit": rate_limiter.metrics(),
+                    "profiler": request_profiler.metrics()
+                })
+            }
+        
+        elif path == 'admin/profiles' or path.startswith('admin/profiles/'):
+            request_headers, _ = _client_address(event)
+            if not admin_authorized(request_headers):
+                return {
+                    'statusCode': 403,
+                    'headers': headers,
+                    'body': _json_body({"error": "Forbidden", "message": "A valid admin token is required"})
+                }
+            if path == 'admin/profiles':
+                return {
+                    'statusCode': 200,
+                    'headers': headers,
+                    'body': _json_body({
+                        "profiler": request_profiler.metrics(),
+                        "profiles": request_profiler.profiles()
+                    })
+                }
+            profile_id = path[len('admin/profiles/'):]
+            profile = request_profiler.get(profile_id)
+            if profile is None:
+                return {
+                    'statusCode': 404,
+                    'headers': headers,
+                    'body': _json_body({"error": "Profile not found", "message": f"No profile with id {profile_id}"})
+                }
+            try:
+                body, mimetype, filename = request_profiler.export(profile, query_params.get('format', 'speedscope'))
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': _json_body({"error": "Invalid format", "message": str(e)})
+                }
+            headers['Content-Type'] = mimetype
+            headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': base64.b64encode(body).decode('ascii'),
+                'isBase64Encoded': True
+            }
+        
         # Default 404 response
         else:
             logger.error(f"Path not found: {path}")
             return {
                 'statusCode': 404,
                 'headers': headers,
-                'body': json.dumps({"error": "Not found"})
+                'body': _json_body({"error": "Not found"})
             }
             
     except Exception as e:
@@ -178,7 +529,7 @@ def handler(event, context):
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({
+            'body': _json_body({
                 "error": "Internal server error",
                 "message": str(e)
             })
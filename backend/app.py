@@ -1,11 +1,29 @@
 import os
 import json
+import time
 import logging
 import traceback
-from datetime import datetime, timedelta
-from flask import Flask, jsonify, render_template, send_from_directory, Response, request
+from datetime import datetime
+from flask import Flask, render_template, send_from_directory, Response, request, stream_with_context, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from race_calendar_fetcher import RaceCalendarFetcher, DEFAULT_YEAR
+from live_updates import LiveStatusBroadcaster
+from calendar_index import parse_calendar_query, parse_year_range
+from ics_export import FEED_MAX_AGE, etag_matches, parse_session_filter
+from rate_limit import RateLimiter, client_identity, limit
+from lap_analytics import LapAnalytics
+from circuit_breaker import CircuitOpenError
+from cache_manager import CacheManager
+from results_store import RESULTS_DB, ResultsStore, parse_history_args
+from job_queue import admin_authorized, create_refresh_queue, parse_refresh_request
+from dashboard import Dashboard, parse_sections
+from clock import parse_at
+from degradation import UNAVAILABLE
+from calendar_archive import IMMUTABLE_CACHE_CONTROL
+from profiling import SlowRequestProfiler
+from session_conditions import SessionConditions
+from serialization import encode, CALENDAR_SCHEMA, NEXT_RACE_SCHEMA, RACE_SCHEMA
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -17,12 +35,23 @@ app = Flask(__name__,
             static_folder='../static',
             template_folder='../')
 
-# Configure CORS properly
-CORS(app, resources={r"/*": {"origins": "*"}})
+# Proxies in front of the app (1 on Heroku) whose X-Forwarded-For entry is trusted as the
+# client address; left at 0 the header is ignored, since any client could set it
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+if TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+# Configure CORS once here; views and after_request must not add the headers again
+CORS(app, resources={r"/*": {"origins": "*"}},
+     allow_headers=['Content-Type', 'Authorization', 'If-None-Match'],
+     methods=['GET', 'PUT', 'POST', 'DELETE', 'OPTIONS'],
+     expose_headers=['ETag', 'Retry-After', 'X-RateLimit-Limit', 'X-RateLimit-Remaining',
+                     'X-Data-Age', 'X-Data-Stale'])
 
 # Create cache and data directories if they don't exist
+# (DATA_DIR points the app at another calendar and results directory, e.g. for load tests)
 cache_dir = os.path.join(os.path.dirname(__file__), 'cache')
-data_dir = os.path.join(os.path.dirname(__file__), 'data')
+data_dir = os.environ.get('DATA_DIR') or os.path.join(os.path.dirname(__file__), 'data')
 
 for directory in [cache_dir, data_dir]:
     if not os.path.exists(directory):
@@ -32,6 +61,83 @@ for directory in [cache_dir, data_dir]:
 # Initialize race calendar fetcher
 calendar_fetcher = RaceCalendarFetcher(data_dir=data_dir, cache_dir=cache_dir)
 
+# Shared push channel for live session status (started on first subscriber)
+live_broadcaster = LiveStatusBroadcaster(calendar_fetcher)
+
+# Per-client token buckets (RATE_LIMIT_STORAGE=redis://... shares them between workers)
+rate_limiter = RateLimiter()
+
+# Keeps the FastF1 cache under FASTF1_CACHE_QUOTA_MB, never evicting the current season
+cache_manager = CacheManager(cache_dir)
+try:
+    cache_manager.enforce()
+except Exception as e:
+    logger.error(f"Error enforcing FastF1 cache quota: {e}")
+
+# Lap frames per session with memoized pace aggregates; loads share the calendar's FastF1 breaker
+lap_analytics = LapAnalytics(cache_manager=cache_manager, breaker=calendar_fetcher.upstream)
+
+# SQLite index over stored results for historical queries
+results_store = ResultsStore(os.path.join(data_dir, RESULTS_DB))
+try:
+    results_store.sync(data_dir)
+except Exception as e:
+    logger.error(f"Error indexing stored results: {e}")
+
+# Weather and track status of the current weekend's sessions (polled on first request)
+session_conditions = SessionConditions(calendar_fetcher)
+
+# Next race, calendar, standings, last winner and conditions in one response, cached per section
+dashboard = Dashboard(calendar_fetcher, results_store, conditions=session_conditions)
+
+# Background workers for admin-triggered refreshes (started on first job)
+refresh_jobs = create_refresh_queue(calendar_fetcher, results_store=results_store)
+
+# Opt-in stack sampling of slow requests (PROFILING_ENABLED=1)
+request_profiler = SlowRequestProfiler()
+
+# Endpoints that are never rate limited (probes and the frontend shell)
+RATE_LIMIT_EXEMPT = {'health_check', 'liveness', 'readiness', 'index', 'serve_static', 'static'}
+
+# Load the current season and its indexes before serving so readiness reflects real data
+# (under gunicorn --preload this happens once, before the workers fork)
+try:
+    calendar_fetcher.get_calendar(str(DEFAULT_YEAR))
+    calendar_fetcher.get_calendar_index(str(DEFAULT_YEAR))
+except Exception as e:
+    logger.error(f"Error warming calendar for {DEFAULT_YEAR}: {e}")
+
+def json_response(payload, status=200, schema=None):
+    """Build a JSON response with the shared serializer"""
+    return Response(encode(payload, schema), status=status, mimetype='application/json')
+
+def unavailable_response(freshness, message):
+    """503 with Retry-After for when upstream is failing and nothing is stored to serve"""
+    response = json_response({
+        "error": "Calendar unavailable",
+        "message": message,
+        "freshness": freshness.to_dict()
+    }, 503)
+    response.headers.extend(freshness.headers())
+    return response
+
+def request_instant():
+    """The ?at= time-travel instant (epoch) of the request, or None for now"""
+    at = request.args.get('at')
+    return parse_at(at) if at else None
+
+# Profiling middleware (registered first so it covers the other hooks)
+@app.before_request
+def start_profiling():
+    if request_profiler.enabled:
+        g.profile_token = request_profiler.start_request(f"{request.method} {request.full_path.rstrip('?')}")
+
+@app.teardown_request
+def finish_profiling(error=None):
+    token = g.pop('profile_token', None)
+    if token is not None:
+        request_profiler.finish_request(token, g.get('response_status', 500 if error else None))
+
 # Request logging middleware
 @app.before_request
 def log_request_info():
@@ -39,34 +145,143 @@ def log_request_info():
     if request.args:
         logger.info(f"Request args: {request.args}")
 
+@app.before_request
+def enforce_rate_limit():
+    if request.method == 'OPTIONS' or request.endpoint in RATE_LIMIT_EXEMPT or request.endpoint is None:
+        return None
+    view = app.view_functions.get(request.endpoint)
+    policy = getattr(view, 'rate_limit_policy', 'default')
+    decision = rate_limiter.check(client_identity(request.headers, request.remote_addr), policy)
+    g.rate_limit = decision
+    if not decision.allowed:
+        response = json_response({
+            "error": "Too many requests",
+            "message": f"Rate limit exceeded, retry in {decision.headers()['Retry-After']} seconds"
+        }, 429)
+        return response
+    return None
+
 # API Routes
 @app.route('/calendar')
 @app.route('/calendar/<int:year>')
 def get_calendar(year=DEFAULT_YEAR):
     try:
         logger.info(f"Fetching calendar for year: {year}")
-        calendar_data = calendar_fetcher.get_calendar(str(year))
+        tz = request.args.get('tz')
+        try:
+            query = parse_calendar_query(request.args)
+            at = request_instant()
+            if query.is_empty and tz:
+                calendar_data = calendar_fetcher.get_localized_calendar(str(year), tz, at=at)
+            elif query.is_empty:
+                calendar_data = calendar_fetcher.get_calendar(str(year), at=at)
+            else:
+                calendar_data = calendar_fetcher.query_calendar(str(year), query, tz=tz, at=at)
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        
+        freshness = calendar_fetcher.freshness(str(year))
+        if freshness.tier == UNAVAILABLE and (not calendar_data or 'error' in calendar_data):
+            logger.warning(f"Calendar for {year} unavailable; retry in {freshness.retry_after:.0f}s")
+            return unavailable_response(freshness, (calendar_data or {}).get('error') or "No calendar data available")
         
         if not calendar_data:
             logger.error(f"No calendar data returned for {year}")
-            return jsonify({"error": "No calendar data available"}), 500
+            return json_response({"error": "No calendar data available"}, 500)
             
         if 'error' in calendar_data:
             logger.error(f"Error in calendar data: {calendar_data['error']}")
-            return jsonify({"error": calendar_data['error']}), 500
+            return json_response({"error": calendar_data['error']}, 500)
             
         logger.info(f"Successfully fetched calendar with {len(calendar_data.get('races', []))} races")
-        return jsonify(calendar_data)
+        if query.is_empty and not tz and not freshness.stale:
+            # The whole season: reuse the bytes encoded once per season version
+            response = Response(calendar_fetcher.get_encoded_calendar(str(year), at=at), mimetype='application/json')
+        else:
+            response = json_response(freshness.mark(calendar_data), schema=CALENDAR_SCHEMA)
+        response.headers.extend(freshness.headers())
+        if at is None and calendar_fetcher.is_archived(year):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
     except Exception as e:
         error_details = traceback.format_exc()
         logger.error(f"Error fetching calendar: {str(e)}\n{error_details}")
-        return jsonify({"error": str(e), "details": error_details.split('\n')}), 500
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/calendar.ics')
+@app.route('/calendar/<int:year>.ics')
+def get_calendar_feed(year=DEFAULT_YEAR):
+    """iCalendar feed; accepts the calendar filters plus ?sessions=race,qualifying"""
+    try:
+        try:
+            query = parse_calendar_query(request.args)
+            sessions = parse_session_filter(request.args.get('sessions'))
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        
+        feed = calendar_fetcher.get_calendar_feed(str(year), query, sessions)
+        if feed is None:
+            return json_response({"error": "No calendar data available"}, 500)
+        
+        etag, body = feed
+        headers = {'ETag': etag, 'Cache-Control': f'public, max-age={FEED_MAX_AGE}'}
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=headers)
+        headers['Content-Disposition'] = f'inline; filename="f1_calendar_{year}.ics"'
+        return Response(body, status=200, mimetype='text/calendar', headers=headers)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error rendering calendar feed: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/calendars')
+def get_calendars():
+    """Query races across several seasons (years=2023,2024 or from_year=/to_year=)"""
+    try:
+        try:
+            years = parse_year_range(request.args, DEFAULT_YEAR)
+            query = parse_calendar_query(request.args)
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        
+        logger.info(f"Querying calendars for years: {years[0]}-{years[-1]}")
+        result = calendar_fetcher.query_calendars(years, query)
+        return json_response(result)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error querying calendars: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/calendar/<int:year>/changes')
+def get_calendar_changes(year):
+    """Schedule changes recorded after ?since=<seq> (or an ISO timestamp)"""
+    try:
+        since = request.args.get('since')
+        if since is not None and since.isdigit():
+            since = int(since)
+        
+        try:
+            return json_response(calendar_fetcher.get_calendar_changes(str(year), since))
+        except ValueError as e:
+            return json_response({"error": "Invalid since parameter", "message": str(e)}, 400)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error fetching calendar changes: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
 
 @app.route('/next-race')
 def get_next_race():
     try:
         logger.info("Fetching next race")
-        next_race = calendar_fetcher.get_next_race()
+        tz = request.args.get('tz')
+        try:
+            at = request_instant()
+            next_race = calendar_fetcher.get_next_race(at=at)
+            if next_race and tz:
+                next_race = calendar_fetcher.localize_race_dict(str(DEFAULT_YEAR), next_race, tz)
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        freshness = calendar_fetcher.freshness(str(DEFAULT_YEAR))
         if next_race:
             logger.info(f"Next race found: {next_race.get('name')} (Round {next_race.get('round')})")
             # If there's a demo flag, indicate this in the response
@@ -74,51 +289,162 @@ def get_next_race():
                 logger.info("Returning demo race (no actual upcoming races found)")
                 next_race['demo_mode'] = True
                 next_race['demo_notice'] = "This is a demonstration race as there are no upcoming races in the calendar"
-            return jsonify(next_race)
+            response = json_response(freshness.mark(next_race), schema=NEXT_RACE_SCHEMA)
+            response.headers.extend(freshness.headers())
+            return response
         else:
-            logger.warning("No upcoming race found")
-            # Create a demo race for testing when no races are found
-            demo_race = {
-                "name": "Demo Grand Prix",
-                "round": 1,
-                "country": "Demo Country",
-                "location": "Demo Circuit",
-                "date": (datetime.now() + timedelta(days=10)).isoformat(),
-                "status": "future",
-                "is_sprint": False,
-                "format": "conventional",
-                "demo_mode": True,
-                "demo_notice": "This is a demonstration race as no races were found",
-                "sessions": {
-                    "practice1": (datetime.now() + timedelta(days=8)).isoformat(),
-                    "practice2": (datetime.now() + timedelta(days=8, hours=4)).isoformat(),
-                    "practice3": (datetime.now() + timedelta(days=9)).isoformat(),
-                    "qualifying": (datetime.now() + timedelta(days=9, hours=4)).isoformat(),
-                    "race": (datetime.now() + timedelta(days=10)).isoformat()
-                }
-            }
-            logger.info("Returning demo race as fallback")
-            return jsonify(demo_race)
+            # No calendar to answer from: say so instead of inventing a race
+            logger.warning("No upcoming race found; calendar unavailable")
+            return unavailable_response(freshness, "No calendar data available to determine the next race")
     except Exception as e:
         error_details = traceback.format_exc()
         logger.error(f"Error fetching next race: {str(e)}\n{error_details}")
-        return jsonify({"error": str(e), "details": error_details.split('\n')}), 500
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/dashboard')
+@app.route('/dashboard/<int:year>')
+def get_dashboard(year=DEFAULT_YEAR):
+    """Everything the first page load needs; If-None-Match may list per-section ETags"""
+    try:
+        try:
+            sections = parse_sections(request.args.get('sections'))
+            etag, payload, not_modified = dashboard.build(
+                str(year), tz=request.args.get('tz'), sections=sections,
+                if_none_match=request.headers.get('If-None-Match'), at=request_instant())
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        
+        freshness = calendar_fetcher.freshness(str(year))
+        headers = dict(freshness.headers(), **{'ETag': etag, 'Cache-Control': 'no-cache'})
+        if not_modified:
+            return Response(status=304, headers=headers)
+        response = json_response(freshness.mark(payload))
+        response.headers.extend(headers)
+        return response
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error building dashboard: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
 
 @app.route('/race/<int:round>')
 def get_race_by_round(round):
     try:
         logger.info(f"Fetching race by round: {round}")
-        race_data = calendar_fetcher.get_race_by_round(round)
+        try:
+            race_data = calendar_fetcher.get_race_by_round(round, year=str(DEFAULT_YEAR), tz=request.args.get('tz'),
+                                                         at=request_instant())
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        freshness = calendar_fetcher.freshness(str(DEFAULT_YEAR))
         if race_data:
             logger.info(f"Race found: {race_data.get('name')}")
-            return jsonify(race_data)
+            response = json_response(freshness.mark(race_data), schema=RACE_SCHEMA)
+            response.headers.extend(freshness.headers())
+            return response
+        elif freshness.tier == UNAVAILABLE:
+            return unavailable_response(freshness, f"No calendar data available to look up round {round}")
         else:
             logger.warning(f"Race with round {round} not found")
-            return jsonify({"error": "Race not found", "message": f"No race found with round number {round}"}), 404
+            return json_response({"error": "Race not found", "message": f"No race found with round number {round}"}, 404)
     except Exception as e:
         error_details = traceback.format_exc()
         logger.error(f"Error fetching race: {str(e)}\n{error_details}")
-        return jsonify({"error": str(e), "details": error_details.split('\n')}), 500
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+def conditions_response(kind, year, round):
+    """Weather or track status of a weekend; ?session=Q for one session, ?since=<epoch> for new rows only"""
+    try:
+        try:
+            since = request.args.get('since')
+            since = float(since) if since else None
+            query = session_conditions.weather if kind == 'weather' else session_conditions.track_status
+            payload = query(year, round, session=request.args.get('session'), since=since)
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        if payload is None:
+            return json_response({"error": "Race not found",
+                                  "message": f"Conditions are only served for rounds of the {session_conditions.year} season"}, 404)
+        if payload["loading"]:
+            # Not held yet; the weekend is being loaded in the background
+            response = json_response(payload, 202)
+            response.headers['Retry-After'] = '5'
+            return response
+        return json_response(payload)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error fetching {kind}: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/weather/<int:year>/<int:round>')
+def get_weather(year, round):
+    return conditions_response('weather', year, round)
+
+@app.route('/track-status/<int:year>/<int:round>')
+def get_track_status(year, round):
+    return conditions_response('track_status', year, round)
+
+@app.route('/analytics/<int:year>/<int:round>/<session>/<metric>')
+def get_lap_analytics(year, round, session, metric):
+    """Pace analysis for a session: fastest-laps, stints, degradation or gaps"""
+    try:
+        logger.info(f"Computing {metric} for {year} round {round} {session}")
+        return json_response(lap_analytics.aggregate(metric, year, round, session))
+    except ValueError as e:
+        return json_response({"error": "Analytics not available", "message": str(e)}, 404)
+    except CircuitOpenError as e:
+        response = json_response({"error": "Analytics unavailable", "message": str(e)}, 503)
+        response.headers['Retry-After'] = str(max(1, int(e.retry_at - time.time())))
+        return response
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error computing lap analytics: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/history/head-to-head')
+def get_head_to_head():
+    """Compare two drivers (?a=VER&b=HAM) across seasons"""
+    try:
+        if not request.args.get('a') or not request.args.get('b'):
+            return json_response({"error": "Invalid query", "message": "a and b driver codes are required"}, 400)
+        try:
+            options = parse_history_args(request.args)
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        return json_response(results_store.head_to_head(request.args['a'], request.args['b'], **options))
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error comparing drivers: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/history/winners')
+def get_winners():
+    """Winners, optionally at one circuit (?circuit=Monza&since=2000)"""
+    try:
+        try:
+            options = parse_history_args(request.args)
+        except ValueError as e:
+            return json_response({"error": "Invalid query", "message": str(e)}, 400)
+        winners = results_store.winners(request.args.get('circuit'), options['from_year'],
+                                        options['to_year'], options['session'])
+        return json_response({"circuit": request.args.get('circuit'), "winners": winners})
+    except Exception as e:
+        error_details = traceback.format_exc()
+        logger.error(f"Error fetching winners: {str(e)}\n{error_details}")
+        return json_response({"error": str(e), "details": error_details.split('\n')}, 500)
+
+@app.route('/events')
+def live_events():
+    """Stream race status changes as Server-Sent Events"""
+    logger.info("Live status subscriber connecting")
+    subscriber = live_broadcaster.subscribe()
+    return Response(
+        stream_with_context(live_broadcaster.stream(subscriber)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 # Frontend Routes
 @app.route('/')
@@ -140,28 +466,124 @@ def health_check():
         "version": "1.0.0",
         "environment": os.environ.get("FLASK_ENV", "development"),
         "cache_dir": cache_dir,
-        "data_dir": data_dir
+        "data_dir": data_dir,
+        "cache": cache_manager.usage()
     }
     logger.info(f"Health check: {status['status']}")
-    return jsonify(status)
+    return json_response(status)
+
+# Admin Routes
+@app.route('/admin/refresh', methods=['POST'])
+@limit('refresh')
+def admin_refresh():
+    """Queue a refresh (target=calendar|round|results, year, round, session) and return its job id"""
+    if not admin_authorized(request.headers):
+        return json_response({"error": "Forbidden", "message": "A valid admin token is required"}, 403)
+    try:
+        kind, params = parse_refresh_request(request.get_json(silent=True) or request.args)
+    except ValueError as e:
+        return json_response({"error": "Invalid refresh request", "message": str(e)}, 400)
+    
+    job, created = refresh_jobs.enqueue(kind, **params)
+    logger.info(f"Refresh job {job.id} {'queued' if created else 'already pending'}: {kind} {params}")
+    response = json_response({"job": job.to_dict(), "deduplicated": not created}, 202)
+    response.headers['Location'] = f"/admin/jobs/{job.id}"
+    return response
+
+@app.route('/admin/jobs')
+def admin_jobs():
+    """Most recent refresh jobs"""
+    if not admin_authorized(request.headers):
+        return json_response({"error": "Forbidden", "message": "A valid admin token is required"}, 403)
+    return json_response({
+        "stats": refresh_jobs.stats(),
+        "jobs": [job.to_dict() for job in refresh_jobs.jobs()]
+    })
+
+@app.route('/admin/jobs/<job_id>')
+def admin_job_status(job_id):
+    """Status and result of one refresh job"""
+    if not admin_authorized(request.headers):
+        return json_response({"error": "Forbidden", "message": "A valid admin token is required"}, 403)
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        return json_response({"error": "Job not found", "message": f"No job with id {job_id}"}, 404)
+    return json_response(job.to_dict())
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    """Slow-request profiles held in memory by this worker, most recent first"""
+    if not admin_authorized(request.headers):
+        return json_response({"error": "Forbidden", "message": "A valid admin token is required"}, 403)
+    return json_response({
+        "profiler": request_profiler.metrics(),
+        "profiles": request_profiler.profiles()
+    })
+
+@app.route('/admin/profiles/<profile_id>')
+def admin_profile_download(profile_id):
+    """Download one profile (?format=speedscope|pstats)"""
+    if not admin_authorized(request.headers):
+        return json_response({"error": "Forbidden", "message": "A valid admin token is required"}, 403)
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        return json_response({"error": "Profile not found", "message": f"No profile with id {profile_id}"}, 404)
+    try:
+        body, mimetype, filename = request_profiler.export(profile, request.args.get('format', 'speedscope'))
+    except ValueError as e:
+        return json_response({"error": "Invalid format", "message": str(e)}, 400)
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Rate limiter, job queue, profiler and session conditions state and counters"""
+    if not admin_authorized(request.headers):
+        return json_response({"error": "Forbidden", "message": "A valid admin token is required"}, 403)
+    return json_response({
+        "timestamp": datetime.now().isoformat(),
+        "rate_limit": rate_limiter.metrics(),
+        "jobs": refresh_jobs.stats(),
+        "profiler": request_profiler.metrics(),
+        "conditions": session_conditions.stats()
+    })
+
+# Probes: both answer from in-memory state only (no disk or network access)
+@app.route('/health/live')
+def liveness():
+    """The process is up and serving requests"""
+    return json_response({"status": "alive", "timestamp": datetime.now().isoformat()})
+
+@app.route('/health/ready')
+def readiness():
+    """Calendars are loaded; reports their age, refresh outcomes, cache tiers and upstream state"""
+    report = calendar_fetcher.readiness()
+    report["tiers"]["fastf1_cache"] = cache_manager.usage()
+    report["jobs"] = refresh_jobs.stats()
+    report["status"] = "ready" if report["ready"] else "not_ready"
+    report["timestamp"] = datetime.now().isoformat()
+    return json_response(report, 200 if report["ready"] else 503)
 
 # Error handlers
 @app.errorhandler(404)
 def not_found_error(error):
     logger.warning(f"404 error: {request.path}")
-    return jsonify({"error": "Not found", "message": f"The requested URL {request.path} was not found"}), 404
+    return json_response({"error": "Not found", "message": f"The requested URL {request.path} was not found"}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
     logger.error(f"500 error: {error}")
-    return jsonify({"error": "Internal server error", "message": str(error)}), 500
+    return json_response({"error": "Internal server error", "message": str(error)}, 500)
 
 @app.after_request
 def after_request(response):
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-    response.headers.add('Access-Control-Allow-Credentials', 'true')
+    decision = g.get('rate_limit')
+    if decision is not None:
+        for header, value in decision.headers().items():
+            response.headers[header] = value
+    if 'profile_token' in g:
+        g.response_status = response.status_code
     return response
 
 if __name__ == '__main__':
@@ -169,4 +591,5 @@ if __name__ == '__main__':
     logger.info(f"Starting F1 Dashboard on port {port}")
     logger.info(f"Cache directory: {cache_dir}")
     logger.info(f"Data directory: {data_dir}")
-    app.run(host='0.0.0.0', port=port, debug=True) 
\ No newline at end of file
+    # Development server only; production runs gunicorn --config gunicorn.conf.py app:app
+    app.run(host='0.0.0.0', port=port, debug=os.environ.get("FLASK_ENV", "development") == "development")
\ No newline at end of file
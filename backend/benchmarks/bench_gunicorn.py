@@ -0,0 +1,189 @@
+"""Compare gunicorn serving profiles under the same local load.
+
+Each profile starts `gunicorn --config gunicorn.conf.py app:app` with its
+own environment overrides on a free port, waits for /health/ready, then
+drives a fixed read-heavy request mix from keep-alive client threads. It
+reports startup time, throughput, latency percentiles, errors and the
+resident memory of the master plus workers (shared copy-on-write pages are
+counted once per process, so compare preload on and off by their
+difference, not the absolute figures).
+
+Usage:
+    python benchmarks/bench_gunicorn.py [--duration 20] [--clients 32] [--profiles gthread,no-preload]
+    python benchmarks/bench_gunicorn.py --json > gunicorn_profiles.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import tempfile
+import subprocess
+import http.client
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Environment overrides per profile (see gunicorn.conf.py for the variables)
+PROFILES = {
+    "gthread": {"WEB_CONCURRENCY": "4", "GUNICORN_THREADS": "4"},
+    "gthread-1x16": {"WEB_CONCURRENCY": "1", "GUNICORN_THREADS": "16"},
+    "gevent": {"WEB_CONCURRENCY": "4", "GUNICORN_WORKER_CLASS": "gevent"},
+    "no-preload": {"WEB_CONCURRENCY": "4", "GUNICORN_THREADS": "4", "GUNICORN_PRELOAD": "0"},
+}
+
+# Dashboard-shaped traffic: mostly the first-paint routes
+REQUEST_MIX = [
+    "/dashboard", "/dashboard", "/dashboard",
+    "/next-race", "/next-race",
+    "/calendar", "/calendar?status=future", "/calendar?tz=Europe/London",
+    "/race/1", "/health/live",
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port, server, timeout=120):
+    """Poll /health/ready until it answers 200; return the seconds it took."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server on port {port} exited with status {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/health/ready')
+            if connection.getresponse().status == 200:
+                return time.perf_counter() - started
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready in {timeout}s")
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and its children in MB (Linux /proc)."""
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        return None
+    total = 0
+    for member in pids:
+        try:
+            with open(f'/proc/{member}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total / 1024
+
+
+def client(port, deadline, latencies, errors, offset):
+    """One keep-alive client cycling through the request mix until deadline."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    position = offset
+    while time.perf_counter() < deadline:
+        path = REQUEST_MIX[position % len(REQUEST_MIX)]
+        position += 1
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(path)
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def worker_class(log):
+    """The worker class gunicorn reported at startup ("Using worker: gthread"), or None."""
+    log.seek(0)
+    match = re.search(r'Using worker: (\S+)', log.read().decode('utf-8', 'replace'))
+    return match.group(1) if match else None
+
+
+def run_profile(name, overrides, duration, clients):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), RATE_LIMIT_ENABLED='0', **overrides)
+    # The error log names the worker class actually running, which is what the results report
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--access-logfile', os.devnull, 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    try:
+        startup = wait_ready(port, server)
+        latencies, errors = [], []
+        deadline = time.perf_counter() + duration
+        threads = [threading.Thread(target=client, args=(port, deadline, latencies, errors, number))
+                   for number in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {
+            "profile": name,
+            "env": overrides,
+            "worker_class": worker_class(log),
+            "startup_seconds": round(startup, 2),
+            "requests": len(latencies),
+            "errors": len(errors),
+            "requests_per_second": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+            "rss_mb": process_tree_rss_mb(server.pid)
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+        log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gunicorn serving profiles.")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds of load per profile")
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent keep-alive clients")
+    parser.add_argument('--profiles', default=','.join(PROFILES), help="Comma-separated profile names")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.profiles.split(','):
+        if name not in PROFILES:
+            parser.error(f"Unknown profile {name}; choose from {', '.join(PROFILES)}")
+        results.append(run_profile(name, PROFILES[name], args.duration, args.clients))
+        if not args.json:
+            row = results[-1]
+            print(f"{row['profile']:<14} {row['worker_class'] or '?':<8} start {row['startup_seconds']:6.2f}s  {row['requests_per_second']:8.1f} req/s  "
+                  f"p50 {row['p50_ms']} ms  p95 {row['p95_ms']} ms  p99 {row['p99_ms']} ms  "
+                  f"errors {row['errors']}  rss {row['rss_mb'] or 0:.0f} MB", flush=True)
+
+    if args.json:
+        print(json.dumps({"duration": args.duration, "clients": args.clients, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Memory and serialization benchmark: nested race dicts vs the __slots__ model.
+
+Builds a synthetic multi-season history (1950 onwards, ~1100 events) in the
+process_calendar dict shape and compares:
+
+- retained memory of the dicts vs SeasonCalendar/Race/Session objects
+- parse cost (dict -> model) and serialization cost (model -> dict -> JSON)
+- a "next race" scan that re-parses ISO strings vs reading epoch timestamps
+
+Usage:
+    python benchmarks/bench_race_model.py
+"""
+import os
+import sys
+import json
+import time
+import datetime
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from race_model import SeasonCalendar  # noqa: E402
+
+FIRST_SEASON = 1950
+LAST_SEASON = 2025
+
+
+def build_history():
+    """Build synthetic calendars in the process_calendar dict shape."""
+    history = {}
+    for year in range(FIRST_SEASON, LAST_SEASON + 1):
+        races = []
+        rounds = 7 + (year - FIRST_SEASON) * 17 // (LAST_SEASON - FIRST_SEASON)
+        for round_number in range(1, rounds + 1):
+            race_day = datetime.datetime(year, 3, 1, 15, tzinfo=datetime.timezone.utc) + datetime.timedelta(weeks=round_number)
+            sessions = {
+                "practice1": (race_day - datetime.timedelta(days=2, hours=3)).isoformat(),
+                "practice2": (race_day - datetime.timedelta(days=2)).isoformat(),
+                "practice3": (race_day - datetime.timedelta(days=1, hours=3)).isoformat(),
+                "qualifying": (race_day - datetime.timedelta(days=1)).isoformat(),
+                "race": race_day.isoformat()
+            }
+            races.append({
+                "round": round_number,
+                "country": f"Country {round_number}",
+                "location": f"Circuit {round_number}",
+                "name": f"Grand Prix {round_number}",
+                "official_name": f"Formula 1 Grand Prix {round_number} {year}",
+                "date": race_day.isoformat(),
+                "status": "completed",
+                "is_sprint": False,
+                "format": "conventional",
+                "sessions": sessions
+            })
+        history[str(year)] = {"year": str(year), "last_updated": "2025-01-01T00:00:00+00:00", "races": races}
+    return history
+
+
+def measure(label, build):
+    """Return (object, retained bytes) for the object produced by build()."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print(f"{label:<32} {size / 1024:10.1f} KiB")
+    return obj, size
+
+
+def timed(label, func, repeat=5):
+    """Print the best wall time of func over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best * 1000:10.2f} ms")
+    return best
+
+
+def main():
+    raw = json.dumps(build_history())
+    events = sum(len(season["races"]) for season in json.loads(raw).values())
+    print(f"Synthetic history: {LAST_SEASON - FIRST_SEASON + 1} seasons, {events} events\n")
+
+    print("Retained memory")
+    dicts, dict_size = measure("nested dicts", lambda: json.loads(raw))
+    models, model_size = measure("SeasonCalendar models",
+                                 lambda: {year: SeasonCalendar.from_dict(data, year) for year, data in json.loads(raw).items()})
+    print(f"{'ratio':<32} {model_size / dict_size:10.2f}x\n")
+
+    print("Serialization")
+    timed("dict -> model (parse once)", lambda: [SeasonCalendar.from_dict(data, year) for year, data in dicts.items()])
+
+    def uncached_to_dict():
+        for season in models.values():
+            season.touch()
+            season.to_dict()
+
+    timed("model -> dict (uncached)", uncached_to_dict)
+    timed("model -> dict (cached)", lambda: [season.to_dict() for season in models.values()])
+    timed("json.dumps(model dicts)", lambda: json.dumps([season.to_dict() for season in models.values()]))
+    timed("json.dumps(raw dicts)", lambda: json.dumps(list(dicts.values())))
+    print()
+
+    print("Next-race scan over the full history")
+    now = datetime.datetime(2025, 6, 1, tzinfo=datetime.timezone.utc)
+    now_epoch = now.timestamp()
+
+    def scan_dicts():
+        for season in dicts.values():
+            for race in season["races"]:
+                datetime.datetime.fromisoformat(race["date"]) > now
+
+    def scan_models():
+        for season in models.values():
+            for race in season.races:
+                race.date > now_epoch
+
+    timed("re-parse ISO strings", scan_dicts)
+    timed("compare epoch timestamps", scan_models)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Encode/decode throughput of the serialization layer for the full-season payload.
+
+Compares the stdlib fallback with orjson (when installed), with and without
+schema normalization, for the compact API encoding and the indented
+persistence encoding, and the per-version cached bytes the calendar routes
+serve. Also checks that both backends produce identical bytes.
+
+Usage:
+    python benchmarks/bench_serialization.py [path/to/f1_calendar_YYYY.json]
+"""
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import serialization  # noqa: E402
+from race_model import SeasonCalendar  # noqa: E402
+
+DEFAULT_PAYLOAD = os.path.join(BACKEND_DIR, 'data', 'f1_calendar_2025.json')
+ITERATIONS = 2000
+
+
+def throughput(func, iterations=ITERATIONS):
+    """Return operations per second for func."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def run_backend(name, payload):
+    """Benchmark one backend and return the bytes it produced."""
+    season = SeasonCalendar.from_dict(payload)
+    compact = serialization.encode(payload, serialization.CALENDAR_SCHEMA)
+    indented = serialization.encode(payload, serialization.CALENDAR_SCHEMA, indent=True)
+    rows = [
+        ("encode (raw)", lambda: serialization.dumps(payload)),
+        ("encode (schema)", lambda: serialization.encode(payload, serialization.CALENDAR_SCHEMA)),
+        ("encode (schema, indent)", lambda: serialization.encode(payload, serialization.CALENDAR_SCHEMA, indent=True)),
+        ("encode (cached per version)", season.encoded),
+        ("decode", lambda: serialization.loads(compact)),
+    ]
+    for label, func in rows:
+        ops = throughput(func)
+        print(f"{name:<8} {label:<26} {ops:10.0f} ops/s {ops * len(compact) / 1e6:8.1f} MB/s")
+    return compact, indented
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PAYLOAD
+    raw = serialization.read_json_file(path)
+    payload = SeasonCalendar.from_dict(raw, year=raw.get('year')).to_dict()
+    print(f"Payload: {path} ({len(payload['races'])} races, "
+          f"{len(serialization.dumps(payload))} bytes compact)\n")
+
+    fast_module = serialization.orjson
+    results = {}
+    if fast_module is not None:
+        results['orjson'] = run_backend('orjson', payload)
+    else:
+        print("orjson not installed; only the stdlib backend is measured")
+
+    serialization.orjson = None
+    try:
+        results['json'] = run_backend('json', payload)
+    finally:
+        serialization.orjson = fast_module
+
+    if 'orjson' in results:
+        identical = results['orjson'] == results['json']
+        print(f"\nByte-identical output across backends: {'yes' if identical else 'NO'}")
+        if not identical:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
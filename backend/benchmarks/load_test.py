@@ -0,0 +1,531 @@
+"""Load test the read API against SLO thresholds, fully local.
+
+Targets:
+    app      app.py in a child process, served by a threaded WSGI server
+    handler  the Netlify handler, called in this process through an adapter
+             (one invocation at a time per --instances, like function instances)
+    url      a server that is already running, e.g. gunicorn with its profile
+
+For the app and handler targets, upstream is mocked. The data directory is
+copied to a temporary one, and every season in --years that is not stored is
+filled in from the newest stored calendar, moved to that year. FastF1's
+schedule and session loaders are replaced by ones that fail and are counted,
+so no request can reach the network. Steady-state traffic should report
+zero upstream calls. Every request pins the clock with ?at=, and the server's
+clock is frozen at the same instant (CLOCK_AT), so statuses, the next race
+and the cached status windows are the same from run to run.
+
+Each virtual client is an asyncio task with its own keep-alive connection.
+It sends the scenario's requests back to back, or waits --think-ms between
+them to model dashboards that poll. The report lists throughput, latency
+percentiles, error rate, stale responses and upstream calls, overall and per
+route, and checks them against the SLO thresholds. With --json it prints the
+report as JSON; the exit status is 1 when an SLO is missed.
+
+Usage:
+    python benchmarks/load_test.py --target app --scenario dashboard --duration 30 --clients 64
+    python benchmarks/load_test.py --target handler --scenario multi-year --slo p95_ms=50 --json > report.json
+    python benchmarks/load_test.py --target url --url http://127.0.0.1:5000 --clients 200 --think-ms 1000
+"""
+import os
+import re
+import sys
+import json
+import time
+import logging
+import random
+import shutil
+import signal
+import asyncio
+import argparse
+import calendar
+import tempfile
+import threading
+import subprocess
+import urllib.parse
+import concurrent.futures
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_gunicorn import free_port, percentile, wait_ready  # noqa: E402
+from calendar_archive import ARCHIVE_FILE, CalendarArchive, stored_calendars  # noqa: E402
+from serialization import read_json_file, write_json_file  # noqa: E402
+
+# Weighted request templates per scenario. {year} is the current season,
+# {any_year} a random season of --years and {round} a random round.
+SCENARIOS = {
+    # Open dashboards: first paint and periodic refreshes
+    "dashboard": [
+        (4, "/dashboard"),
+        (3, "/next-race"),
+        (2, "/calendar"),
+        (1, "/race/{round}"),
+    ],
+    # Someone browsing the current season
+    "browse": [
+        (3, "/calendar/{year}"),
+        (3, "/race/{round}"),
+        (2, "/next-race"),
+        (1, "/calendar?status=future"),
+        (1, "/calendar?tz=Europe/London"),
+    ],
+    # Readers jumping between seasons
+    "multi-year": [
+        (5, "/calendar/{any_year}"),
+        (2, "/calendars?from_year={any_year}&to_year={year}&status=completed"),
+        (1, "/next-race"),
+        (1, "/race/{round}"),
+    ],
+}
+SCENARIOS["mixed"] = [entry for entries in SCENARIOS.values() for entry in entries]
+
+# Default instant of every request: mid-season, between two race weekends
+DEFAULT_AT = '2025-05-07T12:00:00Z'
+
+DEFAULT_YEARS = '2018-2025'
+
+# Thresholds a run must meet; max_* and p*_ms and error_rate are upper bounds, min_rps a lower one
+DEFAULT_SLO = {"p95_ms": 250.0, "p99_ms": 1000.0, "error_rate": 0.001}
+SLO_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'error_rate', 'min_rps')
+
+DATE_PREFIX = re.compile(r'^\d{4}-(\d{2})-(\d{2})')
+
+
+def parse_years(value):
+    """Parse 2018-2025 or 2023,2024 into a sorted list of years."""
+    if '-' in value:
+        first, last = (int(part) for part in value.split('-', 1))
+        return list(range(first, last + 1))
+    return sorted({int(year) for year in value.split(',') if year.strip()})
+
+
+def parse_slo(values):
+    """Merge metric=threshold arguments into the default SLO."""
+    slo = dict(DEFAULT_SLO)
+    for value in values or []:
+        metric, _, threshold = value.partition('=')
+        if metric not in SLO_METRICS:
+            raise ValueError(f"Unknown SLO metric {metric}; choose from {', '.join(SLO_METRICS)}")
+        slo[metric] = float(threshold)
+    return slo
+
+
+def shift_season(calendar_data, year):
+    """A copy of a calendar with every date moved to year (same month and day)."""
+    def shift(value):
+        if isinstance(value, dict):
+            return {key: shift(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [shift(item) for item in value]
+        if isinstance(value, str):
+            match = DATE_PREFIX.match(value)
+            if match:
+                month, day = match.groups()
+                if (month, day) == ('02', '29') and not calendar.isleap(year):
+                    day = '28'
+                return f"{year}-{month}-{day}{value[10:]}"
+        return value
+    return shift(calendar_data)
+
+
+def newest_season(data_dir):
+    """The newest calendar stored as JSON in data_dir."""
+    stored = stored_calendars(data_dir)
+    if not stored:
+        raise RuntimeError(f"No stored calendars in {data_dir} to build the mock seasons from")
+    return read_json_file(stored[max(stored)])
+
+
+def season_rounds(calendar_data):
+    return max([race.get('round') or 0 for race in calendar_data.get('races', [])] + [1])
+
+
+def seed_data_dir(source, years):
+    """Copy a data directory to a temporary one and fill in the seasons it lacks.
+
+    Args:
+        source (str): The data directory to copy.
+        years (list): Seasons the load test requests.
+
+    Returns:
+        str: The temporary data directory.
+    """
+    data_dir = tempfile.mkdtemp(prefix='f1-load-test-')
+    shutil.copytree(source, data_dir, dirs_exist_ok=True)
+    stored = stored_calendars(data_dir)
+    template = newest_season(data_dir)
+    archive = CalendarArchive(os.path.join(data_dir, ARCHIVE_FILE))
+    for year in years:
+        if str(year) not in stored and str(year) not in archive:
+            write_json_file(os.path.join(data_dir, f'f1_calendar_{year}.json'), shift_season(template, year))
+    return data_dir
+
+
+class UpstreamMock:
+    """Replaces FastF1's loaders with ones that fail, counting each call."""
+
+    def __init__(self):
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def install(self):
+        import fastf1
+        for name in ('get_event_schedule', 'get_session'):
+            setattr(fastf1, name, self._offline(name))
+
+    def _offline(self, name):
+        def offline(*args, **kwargs):
+            with self._lock:
+                self.calls[name] = self.calls.get(name, 0) + 1
+            raise ConnectionError(f"fastf1.{name} is mocked offline during load tests")
+        return offline
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.calls)
+
+
+def mock_environment(data_dir, at):
+    """Point the app at the seeded data, freeze its clock at the test instant and mock upstream."""
+    os.environ.update(DATA_DIR=data_dir, CLOCK_AT=at, CLOCK_FROZEN='1', RATE_LIMIT_ENABLED='0',
+                      PROFILING_ENABLED='0')
+    upstream = UpstreamMock()
+    upstream.install()
+    return upstream
+
+
+def serve(port, data_dir, at):
+    """Child process of the app target: serve app.py until SIGTERM, then print the upstream calls."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this, keep-alive
+        # responses wait on the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    upstream = mock_environment(data_dir, at)
+    os.chdir(BACKEND_DIR)
+    import app as app_module
+
+    server = make_server('127.0.0.1', port, app_module.app, threaded=True, request_handler=KeepAliveHandler)
+    signal.signal(signal.SIGTERM, lambda *args: threading.Thread(target=server.shutdown).start())
+    server.serve_forever()
+    print(json.dumps({"upstream_calls": upstream.snapshot()}), flush=True)
+
+
+class HttpClient:
+    """One keep-alive HTTP/1.1 connection on asyncio streams."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def get(self, path):
+        """Send a GET; returns (status, body bytes, stale)."""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            return await self._exchange(path)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await self.close()
+            raise
+
+    async def _exchange(self, path):
+        self._writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Accept-Encoding: identity\r\n\r\n".encode('latin-1'))
+        await self._writer.drain()
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        version, status = status_line.split()[:2]
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            size = len(await self._reader.readexactly(int(headers['content-length'])))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            size = 0
+            while True:
+                length = int((await self._reader.readline()).split(b';')[0], 16)
+                if length:
+                    size += len(await self._reader.readexactly(length))
+                await self._reader.readline()
+                if not length:
+                    break
+        else:
+            size = len(await self._reader.read())
+            headers['connection'] = 'close'
+
+        if version != b'HTTP/1.1' or headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return int(status), size, headers.get('x-data-stale') == 'true'
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+
+class HandlerClient:
+    """Adapter calling the Netlify handler with the event a redirect would produce."""
+
+    def __init__(self, handler, executor):
+        self.handler = handler
+        self.executor = executor
+
+    @staticmethod
+    def event(path):
+        route, _, query = path.lstrip('/').partition('?')
+        params = dict(urllib.parse.parse_qsl(query))
+        params['path'] = route
+        return {'httpMethod': 'GET', 'path': f'/.netlify/functions/api/{route}',
+                'queryStringParameters': params, 'headers': {}}
+
+    async def get(self, path):
+        response = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.handler, self.event(path), None)
+        headers = response.get('headers') or {}
+        return response['statusCode'], len(response.get('body') or ''), headers.get('X-Data-Stale') == 'true'
+
+    async def close(self):
+        pass
+
+
+class Recorder:
+    """Latencies and outcomes per route template."""
+
+    def __init__(self):
+        self.routes = {}
+        self.recording = False
+
+    def add(self, route, latency, status, stale):
+        if not self.recording:
+            return
+        entry = self.routes.setdefault(route, {"latencies": [], "errors": 0, "stale": 0, "statuses": {}})
+        entry["latencies"].append(latency)
+        entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+        if status is None or status >= 400:
+            entry["errors"] += 1
+        if stale:
+            entry["stale"] += 1
+
+
+def summarize(latencies, errors, stale, elapsed):
+    """Throughput, percentiles and error rate of one set of requests."""
+    requests = len(latencies)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 5) if requests else None,
+        "stale": stale,
+        "requests_per_second": round(requests / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else None
+    }
+
+
+def evaluate_slo(totals, slo):
+    """Check each SLO threshold against the totals.
+
+    Returns:
+        dict: {"thresholds", "checks": [{"metric", "threshold", "value", "passed"}], "passed"}
+    """
+    checks = []
+    for metric, threshold in slo.items():
+        if metric == 'min_rps':
+            value = totals["requests_per_second"]
+            passed = value is not None and value >= threshold
+        else:
+            value = totals[metric]
+            passed = value is not None and value <= threshold
+        checks.append({"metric": metric, "threshold": threshold, "value": value, "passed": passed})
+    return {"thresholds": slo, "checks": checks, "passed": all(check["passed"] for check in checks)}
+
+
+def request_plan(scenario, years, rounds, at, seed):
+    """An endless, seeded sequence of (route template, path) for one client."""
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in SCENARIOS[scenario]]
+    templates = [template for _, template in SCENARIOS[scenario]]
+    current = max(years)
+    at_param = urllib.parse.quote(at)
+    while True:
+        template = rng.choices(templates, weights)[0]
+        path = template.format(year=current, any_year=rng.choice(years), round=rng.randint(1, rounds))
+        yield template, f"{path}{'&' if '?' in path else '?'}at={at_param}"
+
+
+async def virtual_client(open_client, plan, recorder, deadline, think):
+    client = open_client()
+    try:
+        while time.perf_counter() < deadline:
+            route, path = next(plan)
+            started = time.perf_counter()
+            try:
+                status, _, stale = await client.get(path)
+            except Exception:
+                status, stale = None, False
+            recorder.add(route, time.perf_counter() - started, status, stale)
+            if think:
+                await asyncio.sleep(think)
+    finally:
+        await client.close()
+
+
+async def drive(open_client, args, years, rounds):
+    """Run the warmup, then the measured period; returns (recorder, measured seconds)."""
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.warmup + args.duration
+    tasks = [asyncio.ensure_future(virtual_client(
+        open_client, request_plan(args.scenario, years, rounds, args.at, args.seed + number),
+        recorder, deadline, args.think_ms / 1000))
+        for number in range(args.clients)]
+    await asyncio.sleep(args.warmup)
+    recorder.recording = True
+    measured = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return recorder, time.perf_counter() - measured
+
+
+def run(args):
+    years = parse_years(args.years)
+    rounds = args.rounds or season_rounds(newest_season(args.data_dir))
+    data_dir = upstream_calls = executor = server = None
+    try:
+        if args.target in ('app', 'handler'):
+            data_dir = seed_data_dir(args.data_dir, years)
+
+        if args.target == 'url':
+            target = urllib.parse.urlsplit(args.url)
+            host, port = target.hostname, target.port or 80
+            open_client = lambda: HttpClient(host, port)  # noqa: E731
+        elif args.target == 'app':
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve', str(port),
+                 '--data-dir', data_dir, '--at', args.at],
+                cwd=BACKEND_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            wait_ready(port, server)
+            open_client = lambda: HttpClient('127.0.0.1', port)  # noqa: E731
+        else:
+            upstream = mock_environment(data_dir, args.at)
+            os.chdir(BACKEND_DIR)
+            import api_handler
+            # The handler logs every event at INFO; keep the terminal readable
+            logging.getLogger().setLevel(logging.WARNING)
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=args.instances)
+            open_client = lambda: HandlerClient(api_handler.handler, executor)  # noqa: E731
+
+        recorder, elapsed = asyncio.run(drive(open_client, args, years, rounds))
+    finally:
+        if server is not None:
+            server.terminate()
+            output, _ = server.communicate(timeout=60)
+            lines = [line for line in (output or '').splitlines() if line.startswith('{')]
+            if lines:
+                upstream_calls = json.loads(lines[-1])["upstream_calls"]
+        if executor is not None:
+            executor.shutdown(wait=False)
+            upstream_calls = upstream.snapshot()
+        if data_dir is not None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    routes = {}
+    latencies, errors, stale = [], 0, 0
+    for route, entry in sorted(recorder.routes.items()):
+        routes[route] = dict(summarize(entry["latencies"], entry["errors"], entry["stale"], elapsed),
+                             statuses=entry["statuses"])
+        latencies += entry["latencies"]
+        errors += entry["errors"]
+        stale += entry["stale"]
+    totals = summarize(latencies, errors, stale, elapsed)
+    return {
+        "target": args.target,
+        "scenario": args.scenario,
+        "clients": args.clients,
+        "think_ms": args.think_ms,
+        "duration": round(elapsed, 2),
+        "at": args.at,
+        "years": [years[0], years[-1]],
+        "seed": args.seed,
+        "totals": totals,
+        "routes": routes,
+        "upstream_calls": upstream_calls,
+        "slo": evaluate_slo(totals, args.slo)
+    }
+
+
+def print_report(report):
+    totals = report["totals"]
+    print(f"{report['target']} / {report['scenario']}: {report['clients']} clients for {report['duration']}s "
+          f"at {report['at']}")
+    print(f"{'route':<64} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for route, row in list(report["routes"].items()) + [("total", totals)]:
+        print(f"{route:<64} {row['requests_per_second'] or 0:8.1f} {row['p50_ms'] or 0:8.2f} "
+              f"{row['p95_ms'] or 0:8.2f} {row['p99_ms'] or 0:8.2f} {row['errors']:7d}")
+    print(f"stale responses {totals['stale']}, upstream calls {report['upstream_calls']}")
+    for check in report["slo"]["checks"]:
+        print(f"  {'PASS' if check['passed'] else 'FAIL'} {check['metric']} {check['value']} "
+              f"({'>=' if check['metric'] == 'min_rps' else '<='} {check['threshold']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the read API against SLO thresholds.")
+    parser.add_argument('--target', choices=('app', 'handler', 'url'), default='app')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Base URL for --target url")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='dashboard')
+    parser.add_argument('--duration', type=float, default=30, help="Measured seconds of load")
+    parser.add_argument('--warmup', type=float, default=5, help="Seconds of load before measuring")
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent virtual clients")
+    parser.add_argument('--think-ms', type=float, default=0, help="Pause between a client's requests")
+    parser.add_argument('--instances', type=int, default=1,
+                        help="Concurrent handler invocations for --target handler")
+    parser.add_argument('--years', default=DEFAULT_YEARS, help="Seasons requested, e.g. 2018-2025 or 2023,2024")
+    parser.add_argument('--rounds', type=int, help="Rounds per season (default: from the stored calendar)")
+    parser.add_argument('--at', default=DEFAULT_AT, help="Instant of every request (?at=)")
+    parser.add_argument('--seed', type=int, default=1, help="Seed of the request sequence")
+    parser.add_argument('--data-dir', default=os.path.join(BACKEND_DIR, 'data'),
+                        help="Data directory the mock seasons (and the round count) come from")
+    parser.add_argument('--slo', action='append', metavar='METRIC=VALUE',
+                        help=f"SLO threshold, repeatable ({', '.join(SLO_METRICS)})")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.data_dir, args.at)
+        return 0
+    try:
+        args.slo = parse_slo(args.slo)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0 if report["slo"]["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
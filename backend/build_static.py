@@ -0,0 +1,282 @@
+"""Render the API's read-only routes into a static, precompressed bundle.
+
+Example:
+    # Build into the frontend's public directory and route the CDN to it
+    python build_static.py --out ../frontend/public/static-api --redirects ../frontend/public/_redirects
+
+    # From a scheduled job: rebuild only once the bundle has gone stale
+    python build_static.py --if-stale --out ../frontend/public/static-api --redirects ../frontend/public/_redirects
+
+Every route is rendered through the Netlify handler itself, so the static
+files are byte-identical to what the function would return. Each body is
+written twice: under a content-hashed name (immutable, cacheable forever)
+and under a stable alias that the redirect rules point at. Both get .gz
+(and .br when brotli is installed) siblings.
+
+Archived seasons are final, so their /calendar/<year> files never expire.
+/calendar, /race/<round> and /next-race depend on time through race and
+session statuses. They are rendered for the scheduler's status windows
+(see RaceCalendarFetcher.get_status_window) with ?at=, and every file
+records the valid_from/valid_until of its window. The stable aliases
+point at the window current at build time, and the manifest's
+valid_until is when the first of them expires: --if-stale rebuilds from
+then on.
+"""
+import os
+import sys
+import gzip
+import time
+import hashlib
+import logging
+import argparse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from serialization import read_json_file, write_json_file
+from session_scheduler import status_boundaries
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# URL prefix the bundle is published under
+DEFAULT_PREFIX = '/static-api'
+
+# Query parameters that change a response; requests carrying them go to the function
+DYNAMIC_PARAMS = ('status', 'format', 'is_sprint', 'country', 'from', 'to', 'fields',
+                  'page', 'per_page', 'tz', 'sessions', 'at')
+
+REDIRECTS_BEGIN = '# BEGIN static API bundle (generated by backend/build_static.py)'
+REDIRECTS_END = '# END static API bundle'
+
+
+def _render(handler, path, at=None):
+    """Call the handler for a path (as of an instant) and return the body, or None on a non-200."""
+    params = {'path': path}
+    if at is not None:
+        params['at'] = repr(float(at))
+    response = handler({'httpMethod': 'GET', 'queryStringParameters': params, 'headers': {}}, None)
+    if response['statusCode'] != 200:
+        logger.warning(f"Skipping {path}: handler returned {response['statusCode']}")
+        return None
+    return response['body'].encode('utf-8')
+
+
+def write_asset(out_dir, name, body):
+    """Write a body under a hashed name and a stable alias, with compressed siblings.
+
+    Args:
+        out_dir (str): Bundle directory.
+        name (str): Alias path without extension, e.g. "calendar/2025".
+        body (bytes): Response body.
+
+    Returns:
+        dict: Manifest entry (alias, hashed file, digest, sizes).
+    """
+    digest = hashlib.sha256(body).hexdigest()
+    hashed = f"{name}.{digest[:12]}.json"
+    alias = f"{name}.json"
+    entry = {"alias": alias, "file": hashed, "sha256": digest, "bytes": len(body)}
+
+    for relative in (hashed, alias):
+        path = os.path.join(out_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(body)
+        # mtime=0 keeps the gzip output deterministic between builds
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(body))
+
+    entry["gzip_bytes"] = os.path.getsize(os.path.join(out_dir, hashed + '.gz'))
+    return entry
+
+
+def status_windows(fetcher, year, now):
+    """The scheduler's status windows of a season from now on.
+
+    Each window is identified by fetcher.get_status_window and represented
+    by an instant inside it. A boundary instant is a one-instant window of
+    its own; the CDN cannot route a single instant, so it is covered by the
+    file of the window that follows it.
+
+    Args:
+        fetcher (RaceCalendarFetcher): Fetcher the handler reads from.
+        year (str): The season year.
+        now (float): Start of the first window (epoch).
+
+    Returns:
+        list: (window, valid_from, valid_until or None, instant) tuples,
+            where window is the [start, end] boundary positions that
+            get_status_window returns.
+    """
+    season = fetcher.get_season(year)
+    if season is None:
+        return []
+    edges = [now] + [boundary for boundary in status_boundaries(season) if boundary > now]
+
+    windows = []
+    for position, start in enumerate(edges):
+        end = edges[position + 1] if position + 1 < len(edges) else None
+        if position == 0:
+            instant = now
+        elif end is None:
+            instant = start + 1
+        else:
+            instant = (start + end) / 2
+        key = fetcher.get_status_window(year, instant)
+        windows.append((list(key[1:]), start, end, instant))
+    return windows
+
+
+def _timeline(handler, path, windows):
+    """Bodies of a route across status windows, merging consecutive windows that render the same."""
+    spans = []
+    for window, valid_from, valid_until, instant in windows:
+        body = _render(handler, path, at=instant)
+        if spans and spans[-1]["body"] == body:
+            spans[-1]["valid_until"] = valid_until
+            spans[-1]["window"][1] = window[1]
+        else:
+            spans.append({"body": body, "valid_from": valid_from, "valid_until": valid_until, "window": list(window)})
+    return [span for span in spans if span["body"] is not None]
+
+
+def build_bundle(out_dir, prefix=DEFAULT_PREFIX, now=None):
+    """Render every read-only route into out_dir and write manifest.json.
+
+    Calendars are read through the handler, so DATA_DIR selects the data.
+
+    Args:
+        out_dir (str): Bundle directory.
+        prefix (str): URL prefix the bundle is published under.
+        now (float, optional): Build time (epoch).
+
+    Returns:
+        dict: The manifest.
+    """
+    import api_handler
+    from race_calendar_fetcher import DEFAULT_YEAR
+
+    now = time.time() if now is None else now
+    handler = api_handler.handler
+    fetcher = api_handler.calendar_fetcher
+    # The build is a single trusted client rendering many routes
+    api_handler.rate_limiter.enabled = False
+
+    routes = {}
+    archived = fetcher.archive.years()
+    for year in archived:
+        body = _render(handler, f'calendar/{year}')
+        if body is not None:
+            routes[f'/calendar/{year}'] = write_asset(out_dir, f'calendar/{year}', body)
+            routes[f'/calendar/{year}'].update({"valid_from": None, "valid_until": None})
+
+    year = str(DEFAULT_YEAR)
+    windows = [] if year in archived else status_windows(fetcher, year, now)
+    timelines = {}
+    if windows:
+        _, valid_from, valid_until, _ = windows[0]
+        body = _render(handler, 'calendar', at=now)
+        if body is not None:
+            for route in ('/calendar', f'/calendar/{year}'):
+                routes[route] = write_asset(out_dir, 'calendar/current', body)
+                routes[route].update({"valid_from": valid_from, "valid_until": valid_until})
+
+        season = fetcher.get_season(year)
+        paths = ['next-race'] + [f'race/{race.round}' for race in season.races if race.round]
+        for path in paths:
+            spans = _timeline(handler, path, windows)
+            entries = []
+            for span in spans:
+                entry = write_asset(out_dir, f"{path}/{int(span['valid_from'])}", span["body"])
+                entry.update({key: span[key] for key in ("valid_from", "valid_until", "window")})
+                entries.append(entry)
+            if entries and entries[0]["valid_from"] == now:
+                # The stable alias is the window current at build time
+                routes[f'/{path}'] = write_asset(out_dir, path, spans[0]["body"])
+                routes[f'/{path}'].update({"valid_from": now, "valid_until": entries[0]["valid_until"]})
+            timelines[f'/{path}'] = entries
+
+    expiries = [entry["valid_until"] for entry in routes.values() if entry["valid_until"] is not None]
+    manifest = {
+        "generated_at": now,
+        "valid_until": min(expiries) if expiries else None,
+        "prefix": prefix,
+        "routes": routes,
+        "windows": timelines
+    }
+    write_json_file(os.path.join(out_dir, 'manifest.json'), manifest)
+    logger.info(f"Static bundle: {len(routes)} routes and {len(windows)} status windows in {out_dir}")
+    return manifest
+
+
+def is_stale(out_dir, now=None):
+    """Whether the bundle in out_dir is missing or past its manifest's valid_until."""
+    path = os.path.join(out_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return True
+    valid_until = read_json_file(path).get("valid_until")
+    return valid_until is not None and valid_until <= (time.time() if now is None else now)
+
+
+def redirect_rules(manifest):
+    """Netlify _redirects lines sending plain requests for bundled routes to the static files.
+
+    Requests that carry a query parameter which changes the response are
+    sent to the function first, so only exact, unfiltered reads are served
+    statically.
+    """
+    prefix = manifest["prefix"]
+    function = '/.netlify/functions/api_handler'
+    lines = [REDIRECTS_BEGIN]
+    for route in sorted(manifest["routes"]):
+        path = route.lstrip('/')
+        for param in DYNAMIC_PARAMS:
+            lines.append(f"{route} {param}=:value {function}?path={path} 200")
+        lines.append(f"{route} {prefix}/{manifest['routes'][route]['alias']} 200")
+    lines.append(REDIRECTS_END)
+    return lines
+
+
+def update_redirects(path, manifest):
+    """Insert (or replace) the generated block in a _redirects file, before its other rules."""
+    existing = []
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            existing = f.read().splitlines()
+    if REDIRECTS_BEGIN in existing and REDIRECTS_END in existing:
+        start, end = existing.index(REDIRECTS_BEGIN), existing.index(REDIRECTS_END)
+        existing = existing[:start] + existing[end + 1:]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(redirect_rules(manifest) + [''] + existing).rstrip('\n') + '\n')
+
+
+def main(argv=None):
+    """Build the bundle from the command line."""
+    parser = argparse.ArgumentParser(description="Build the static API bundle.")
+    parser.add_argument('--out', default=os.path.join(BACKEND_DIR, '..', 'frontend', 'public', 'static-api'))
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX, help="URL prefix the bundle is served under")
+    parser.add_argument('--redirects', help="Netlify _redirects file to update with routing rules")
+    parser.add_argument('--if-stale', action='store_true',
+                        help="Leave the bundle alone until its manifest's valid_until has passed")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.if_stale and not is_stale(args.out):
+        print(f"Bundle in {args.out} is still valid", flush=True)
+        return 0
+    manifest = build_bundle(args.out, args.prefix)
+    if args.redirects:
+        update_redirects(args.redirects, manifest)
+    print(f"Wrote {len(manifest['routes'])} routes to {args.out}, valid until {manifest['valid_until']}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import os
+import time
+import shutil
+import logging
+import datetime
+import threading
+
+from serialization import read_json_file, write_json_file
+
+logger = logging.getLogger(__name__)
+
+# Size limit for the FastF1 cache directory
+DEFAULT_QUOTA_BYTES = int(float(os.environ.get('FASTF1_CACHE_QUOTA_MB', '2048')) * 1024 * 1024)
+
+# Last-use times of cached sessions, kept inside the cache directory
+USAGE_FILE = '.cache_usage.json'
+
+
+class CachedSession:
+    """One session directory of the FastF1 cache (<year>/<event>/<session>)."""
+
+    __slots__ = ('path', 'year', 'event', 'session', 'size', 'last_used')
+
+    def __init__(self, path, year, event, session, size, last_used):
+        self.path = path
+        self.year = year
+        self.event = event
+        self.session = session
+        self.size = size
+        self.last_used = last_used
+
+    @property
+    def key(self):
+        return f"{self.year}/{self.event}/{self.session}"
+
+
+def _tree_size(path):
+    """Total size of the files below path, and the newest modification time."""
+    size = 0
+    newest = 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            size += stat.st_size
+            newest = max(newest, stat.st_mtime)
+    return size, newest
+
+
+class CacheManager:
+    """Keeps the FastF1 cache directory under a size quota.
+
+    FastF1 stores one directory per session below <year>/<event>/. Those
+    session directories are the unit of accounting and eviction: when the
+    cache grows past the quota, the least recently used sessions are
+    deleted until it fits again. Sessions of pinned seasons (the current
+    one by default) are never evicted. Loose files such as FastF1's HTTP
+    cache database are counted but left alone.
+    """
+
+    def __init__(self, cache_dir, quota_bytes=DEFAULT_QUOTA_BYTES, pinned_years=None, clock=time.time):
+        """Initialize the manager.
+
+        Args:
+            cache_dir (str): The FastF1 cache directory.
+            quota_bytes (int): Maximum total size.
+            pinned_years (iterable, optional): Seasons never evicted;
+                defaults to the current year.
+            clock (callable): Returns the current epoch time.
+        """
+        self.cache_dir = cache_dir
+        self.quota_bytes = quota_bytes
+        self.clock = clock
+        if pinned_years is None:
+            pinned_years = [datetime.datetime.fromtimestamp(clock(), datetime.timezone.utc).year]
+        self.pinned_years = {str(year) for year in pinned_years}
+        self._usage_path = os.path.join(cache_dir, USAGE_FILE)
+        self._lock = threading.Lock()
+        self._usage = self._load_usage()
+        self._snapshot = None
+        self._last_eviction = None
+
+    def _load_usage(self):
+        if not os.path.exists(self._usage_path):
+            return {}
+        try:
+            return read_json_file(self._usage_path)
+        except Exception as e:
+            logger.warning(f"Could not read cache usage file {self._usage_path}: {e}")
+            return {}
+
+    def _save_usage(self):
+        try:
+            write_json_file(self._usage_path, self._usage)
+        except Exception as e:
+            logger.warning(f"Could not write cache usage file {self._usage_path}: {e}")
+
+    def touch(self, session_path):
+        """Record that a cached session was used.
+
+        Args:
+            session_path (str): The session directory, absolute or relative
+                to the cache directory. FastF1's Session.api_path (e.g.
+                "/static/2024/2024-03-02_Bahrain_Grand_Prix/2024-03-02_Race/")
+                is accepted as well.
+        """
+        relative = session_path
+        if os.path.isabs(relative) and relative.startswith(os.path.abspath(self.cache_dir)):
+            relative = os.path.relpath(relative, self.cache_dir)
+        relative = relative.strip('/')
+        if relative.startswith('static/'):
+            relative = relative[len('static/'):]
+        key = '/'.join(relative.split(os.sep))
+        with self._lock:
+            self._usage[key] = self.clock()
+            self._save_usage()
+
+    def scan(self):
+        """Walk the cache and measure every session directory.
+
+        Returns:
+            list: CachedSession entries.
+        """
+        sessions = []
+        loose_bytes = 0
+        if not os.path.isdir(self.cache_dir):
+            self._update_snapshot(sessions, loose_bytes)
+            return sessions
+
+        for year in sorted(os.listdir(self.cache_dir)):
+            year_path = os.path.join(self.cache_dir, year)
+            if not (year.isdigit() and os.path.isdir(year_path)):
+                if os.path.isfile(year_path) and year != USAGE_FILE:
+                    loose_bytes += os.path.getsize(year_path)
+                continue
+            for event in sorted(os.listdir(year_path)):
+                event_path = os.path.join(year_path, event)
+                if not os.path.isdir(event_path):
+                    loose_bytes += os.path.getsize(event_path)
+                    continue
+                for session in sorted(os.listdir(event_path)):
+                    session_path = os.path.join(event_path, session)
+                    if not os.path.isdir(session_path):
+                        # Event-level files are small; count them with the event's sessions
+                        loose_bytes += os.path.getsize(session_path)
+                        continue
+                    size, newest = _tree_size(session_path)
+                    key = f"{year}/{event}/{session}"
+                    last_used = self._usage.get(key, newest)
+                    sessions.append(CachedSession(session_path, year, event, session, size, last_used))
+
+        self._update_snapshot(sessions, loose_bytes)
+        return sessions
+
+    def _update_snapshot(self, sessions, loose_bytes):
+        by_season = {}
+        for session in sessions:
+            by_season[session.year] = by_season.get(session.year, 0) + session.size
+        total = sum(by_season.values()) + loose_bytes
+        self._snapshot = {
+            "cache_dir": self.cache_dir,
+            "quota_bytes": self.quota_bytes,
+            "total_bytes": total,
+            "used_percent": round(100.0 * total / self.quota_bytes, 1) if self.quota_bytes else None,
+            "sessions": len(sessions),
+            "by_season": by_season,
+            "other_bytes": loose_bytes,
+            "pinned_years": sorted(self.pinned_years),
+            "scanned_at": self.clock(),
+            "last_eviction": self._last_eviction
+        }
+
+    def enforce(self):
+        """Evict least recently used sessions until the cache fits the quota.
+
+        Returns:
+            list: Keys of the evicted sessions.
+        """
+        with self._lock:
+            sessions = self.scan()
+            total = self._snapshot["total_bytes"]
+            if total <= self.quota_bytes:
+                return []
+
+            evicted = []
+            candidates = sorted((s for s in sessions if s.year not in self.pinned_years),
+                                key=lambda s: s.last_used)
+            for session in candidates:
+                if total <= self.quota_bytes:
+                    break
+                try:
+                    shutil.rmtree(session.path)
+                except OSError as e:
+                    logger.error(f"Could not evict cached session {session.key}: {e}")
+                    continue
+                total -= session.size
+                evicted.append(session.key)
+                self._usage.pop(session.key, None)
+                self._remove_empty_parents(session.path)
+
+            if total > self.quota_bytes:
+                logger.warning(f"FastF1 cache still over quota after eviction "
+                               f"({total} > {self.quota_bytes} bytes); remaining sessions are pinned")
+            self._last_eviction = {"at": self.clock(), "evicted": len(evicted)}
+            self._save_usage()
+            self.scan()
+        logger.info(f"Evicted {len(evicted)} cached sessions: {evicted}")
+        return evicted
+
+    def _remove_empty_parents(self, session_path):
+        """Remove event and year directories left empty by an eviction."""
+        parent = os.path.dirname(session_path)
+        for _ in range(2):
+            try:
+                if os.listdir(parent):
+                    return
+                os.rmdir(parent)
+            except OSError:
+                return
+            parent = os.path.dirname(parent)
+
+    def usage(self):
+        """Last measured usage (no disk access; call scan or enforce to refresh)."""
+        if self._snapshot is None:
+            return {"cache_dir": self.cache_dir, "quota_bytes": self.quota_bytes, "scanned_at": None}
+        return dict(self._snapshot)
@@ -0,0 +1,329 @@
+"""Compressed archive of finished seasons.
+
+Layout of the archive file:
+    header   MAGIC, format version, index offset and index length (big endian)
+    seasons  one zlib-compressed calendar per season, back to back
+    index    zlib-compressed JSON: per-season offset, length, race count and digest
+
+Opening the archive reads only the header and the index; a season is read
+and decompressed when it is first requested. Only seasons whose every race
+is in the past are archived, and an archived season is never replaced.
+
+Usage:
+    python calendar_archive.py build [--data-dir data] [--years 1950,1951] [--prune]
+    python calendar_archive.py list [--data-dir data]
+"""
+import os
+import re
+import sys
+import zlib
+import struct
+import hashlib
+import logging
+import argparse
+import datetime
+import tempfile
+import threading
+
+from serialization import dumps, encode, loads, read_json_file, CALENDAR_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FILE = 'f1_calendar_archive.bin'
+
+MAGIC = b'F1CA'
+FORMAT_VERSION = 1
+
+# MAGIC, format version, index offset, index length
+HEADER = struct.Struct('>4sHQI')
+
+COMPRESSION_LEVEL = 9
+
+# Responses for archived seasons never change
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+CALENDAR_FILE_PATTERN = re.compile(r'^f1_calendar_(\d{4})\.json$')
+
+
+class ArchiveError(RuntimeError):
+    """Raised when the archive file is unreadable or a season fails its digest check."""
+
+
+def season_is_final(calendar_data, now=None):
+    """Whether every race of a season is in the past, so it can never change again.
+
+    Args:
+        calendar_data (dict): The season calendar.
+        now (float, optional): Reference epoch; defaults to the current time.
+
+    Returns:
+        bool: False for empty seasons and seasons with undated races.
+    """
+    races = calendar_data.get('races') or []
+    if not races:
+        return False
+    now = datetime.datetime.now(datetime.timezone.utc) if now is None else \
+        datetime.datetime.fromtimestamp(now, datetime.timezone.utc)
+    for race in races:
+        try:
+            race_date = datetime.datetime.fromisoformat(str(race.get('date')).replace('Z', '+00:00'))
+        except ValueError:
+            return False
+        if race_date.tzinfo is None:
+            race_date = race_date.replace(tzinfo=datetime.timezone.utc)
+        if race_date >= now:
+            return False
+    return True
+
+
+class CalendarArchive:
+    """Read access to the season archive, opened lazily.
+
+    The index is read on first use and re-read when the file is replaced
+    (a rebuild renames a new file over it). No file handle is kept open
+    between reads, so the object is safe to create before forking.
+    """
+
+    def __init__(self, path):
+        """Initialize the archive reader.
+
+        Args:
+            path (str): The archive file; it does not have to exist.
+        """
+        self.path = path
+        self._index = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._reads = 0
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def index(self):
+        """Per-season entries keyed by year (empty when there is no archive).
+
+        Raises:
+            ArchiveError: If the file is not a readable archive.
+        """
+        signature = self._stat_signature()
+        with self._lock:
+            if self._index is not None and signature == self._signature:
+                return self._index
+            if signature is None:
+                self._index, self._signature = {}, None
+                return self._index
+            with open(self.path, 'rb') as f:
+                self._index = _read_index(f)
+            self._signature = signature
+            logger.info(f"Opened calendar archive {self.path} ({len(self._index)} seasons)")
+            return self._index
+
+    def __contains__(self, year):
+        return str(year) in self.index()
+
+    def years(self):
+        """Archived seasons, oldest first."""
+        return sorted(self.index())
+
+    def read(self, year):
+        """Read and decompress one season.
+
+        Args:
+            year (str): The season year.
+
+        Returns:
+            dict: The calendar, or None if the season is not archived.
+
+        Raises:
+            ArchiveError: If the stored bytes do not match the index digest.
+        """
+        entry = self.index().get(str(year))
+        if entry is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            blob = f.read(entry['length'])
+        if hashlib.sha256(blob).hexdigest() != entry['sha256']:
+            raise ArchiveError(f"Archived season {year} is corrupt (digest mismatch)")
+        with self._lock:
+            self._reads += 1
+        return loads(zlib.decompress(blob))
+
+    def stats(self):
+        """Season count and sizes for readiness reports (from memory; the index is not loaded here)."""
+        with self._lock:
+            index = self._index
+            reads = self._reads
+        if index is None:
+            return {"path": os.path.basename(self.path), "opened": False, "reads": reads}
+        return {
+            "path": os.path.basename(self.path),
+            "opened": True,
+            "seasons": len(index),
+            "compressed_bytes": sum(entry['length'] for entry in index.values()),
+            "uncompressed_bytes": sum(entry['size'] for entry in index.values()),
+            "reads": reads
+        }
+
+
+def _read_index(f):
+    header = f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ArchiveError("Archive is truncated")
+    magic, version, offset, length = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ArchiveError("Not a calendar archive")
+    if version != FORMAT_VERSION:
+        raise ArchiveError(f"Unsupported archive format version {version}")
+    f.seek(offset)
+    try:
+        return loads(zlib.decompress(f.read(length)))['seasons']
+    except (zlib.error, ValueError, KeyError) as e:
+        raise ArchiveError(f"Archive index is unreadable: {e}")
+
+
+def write_archive(path, calendars, now=None):
+    """Add finished seasons to the archive, creating it if needed.
+
+    Seasons already in the archive are copied over byte for byte and are
+    never replaced. The new file is written next to the old one and renamed
+    over it, so readers see either the old or the new archive.
+
+    Args:
+        path (str): The archive file.
+        calendars (dict): Calendars to add, keyed by year.
+        now (float, optional): Reference epoch for season_is_final.
+
+    Returns:
+        list: The years that were added.
+
+    Raises:
+        ValueError: If a season still has races to come.
+    """
+    existing = CalendarArchive(path)
+    index = dict(existing.index())
+    additions = {}
+    for year, calendar_data in calendars.items():
+        year = str(year)
+        if year in index:
+            logger.info(f"Season {year} is already archived; keeping the archived copy")
+            continue
+        if not season_is_final(calendar_data, now):
+            raise ValueError(f"Season {year} has races to come and cannot be archived")
+        additions[year] = calendar_data
+    if not additions:
+        return []
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.bin')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0))
+            seasons = {}
+            if index:
+                with open(path, 'rb') as source:
+                    for year, entry in index.items():
+                        source.seek(entry['offset'])
+                        seasons[year] = dict(entry, offset=out.tell())
+                        out.write(source.read(entry['length']))
+            archived_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            for year, calendar_data in sorted(additions.items()):
+                raw = encode(calendar_data, CALENDAR_SCHEMA)
+                blob = zlib.compress(raw, COMPRESSION_LEVEL)
+                seasons[year] = {
+                    "offset": out.tell(),
+                    "length": len(blob),
+                    "size": len(raw),
+                    "races": len(calendar_data.get('races', [])),
+                    "sha256": hashlib.sha256(blob).hexdigest(),
+                    "immutable": True,
+                    "archived_at": archived_at
+                }
+                out.write(blob)
+            index_blob = zlib.compress(dumps({"format": FORMAT_VERSION, "seasons": seasons}), COMPRESSION_LEVEL)
+            index_offset = out.tell()
+            out.write(index_blob)
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, FORMAT_VERSION, index_offset, len(index_blob)))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return sorted(additions)
+
+
+def stored_calendars(data_dir, years=None):
+    """The per-season JSON calendars in a data directory, keyed by year."""
+    calendars = {}
+    for name in sorted(os.listdir(data_dir)):
+        match = CALENDAR_FILE_PATTERN.match(name)
+        if match and (years is None or match.group(1) in years):
+            calendars[match.group(1)] = os.path.join(data_dir, name)
+    return calendars
+
+
+def build(data_dir, years=None, prune=False, now=None):
+    """Archive every finished season stored as JSON in data_dir.
+
+    Args:
+        data_dir (str): Directory with f1_calendar_<year>.json files.
+        years (set, optional): Only consider these years.
+        prune (bool): Delete the JSON files of archived seasons.
+        now (float, optional): Reference epoch for season_is_final.
+
+    Returns:
+        list: The years that were added.
+    """
+    path = os.path.join(data_dir, ARCHIVE_FILE)
+    files = stored_calendars(data_dir, years)
+    calendars = {}
+    for year, calendar_path in files.items():
+        calendar_data = read_json_file(calendar_path)
+        if 'error' in calendar_data or not season_is_final(calendar_data, now):
+            logger.info(f"Skipping {year}: season is not finished")
+            continue
+        calendars[year] = calendar_data
+    added = write_archive(path, calendars, now)
+
+    if prune:
+        archive = CalendarArchive(path)
+        for year in calendars:
+            if year in archive:
+                os.remove(files[year])
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack finished seasons into the calendar archive.")
+    parser.add_argument('command', choices=('build', 'list'))
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    parser.add_argument('--years', help="Comma-separated seasons to archive (default: all finished ones)")
+    parser.add_argument('--prune', action='store_true', help="Delete the JSON files of archived seasons")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == 'build':
+        years = {year.strip() for year in args.years.split(',')} if args.years else None
+        added = build(args.data_dir, years, prune=args.prune)
+        print(f"Archived {len(added)} seasons{': ' + ', '.join(added) if added else ''}")
+
+    archive = CalendarArchive(os.path.join(args.data_dir, ARCHIVE_FILE))
+    index = archive.index()
+    if args.command == 'list':
+        for year, entry in sorted(index.items()):
+            print(f"{year}  {entry['races']:3d} races  {entry['length']:8d} bytes "
+                  f"({entry['size']} uncompressed)")
+    stats = archive.stats()
+    print(f"{stats.get('seasons', 0)} seasons, {stats.get('compressed_bytes', 0)} bytes compressed, "
+          f"{stats.get('uncompressed_bytes', 0)} uncompressed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import bisect
+import logging
+import datetime
+
+logger = logging.getLogger(__name__)
+
+# Pagination defaults for calendar queries
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+# Upper bound on the number of seasons a single multi-season query may touch
+MAX_QUERY_YEARS = 80
+
+# Query string parameters understood by parse_calendar_query
+FILTER_PARAMS = ('status', 'format', 'is_sprint', 'country', 'from', 'to')
+QUERY_PARAMS = FILTER_PARAMS + ('fields', 'page', 'per_page')
+
+
+class CalendarQuery:
+    """Validated calendar filters, projection and pagination."""
+
+    __slots__ = ('status', 'format', 'is_sprint', 'country', 'date_from', 'date_to',
+                 'fields', 'page', 'per_page')
+
+    def __init__(self, status=None, format=None, is_sprint=None, country=None,
+                 date_from=None, date_to=None, fields=None, page=None, per_page=None):
+        self.status = status
+        self.format = format
+        self.is_sprint = is_sprint
+        self.country = country
+        self.date_from = date_from
+        self.date_to = date_to
+        self.fields = fields
+        self.page = page
+        self.per_page = per_page
+
+    @property
+    def has_filters(self):
+        """True if any filter is set."""
+        return any(value is not None for value in (
+            self.status, self.format, self.is_sprint, self.country, self.date_from, self.date_to))
+
+    @property
+    def is_empty(self):
+        """True if the query would return the full, unprojected calendar."""
+        return not self.has_filters and self.fields is None and self.page is None
+
+
+def _parse_bound(value, end_of_day=False):
+    """Parse a from/to bound into an epoch timestamp."""
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    if end_of_day and len(value) == 10:
+        # A bare YYYY-MM-DD upper bound includes the whole day
+        parsed += datetime.timedelta(days=1) - datetime.timedelta(microseconds=1)
+    return parsed.timestamp()
+
+
+def parse_calendar_query(args):
+    """Build a CalendarQuery from request arguments.
+
+    Args:
+        args (Mapping): Query string parameters.
+
+    Returns:
+        CalendarQuery: The validated query.
+
+    Raises:
+        ValueError: If a parameter is malformed.
+    """
+    query = CalendarQuery()
+
+    if args.get('status'):
+        query.status = args['status'].lower()
+    if args.get('format'):
+        query.format = args['format'].lower()
+    if args.get('country'):
+        query.country = args['country'].lower()
+    if args.get('is_sprint'):
+        value = args['is_sprint'].lower()
+        if value not in ('true', 'false', '1', '0'):
+            raise ValueError("is_sprint must be true or false")
+        query.is_sprint = value in ('true', '1')
+    if args.get('from'):
+        query.date_from = _parse_bound(args['from'])
+    if args.get('to'):
+        query.date_to = _parse_bound(args['to'], end_of_day=True)
+    if args.get('fields'):
+        query.fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+
+    if args.get('page') or args.get('per_page'):
+        try:
+            query.page = int(args.get('page') or 1)
+            query.per_page = int(args.get('per_page') or DEFAULT_PER_PAGE)
+        except ValueError:
+            raise ValueError("page and per_page must be integers")
+        if query.page < 1 or not 1 <= query.per_page <= MAX_PER_PAGE:
+            raise ValueError(f"page must be >= 1 and per_page between 1 and {MAX_PER_PAGE}")
+
+    return query
+
+
+def parse_year_range(args, default_year):
+    """Resolve the seasons of a multi-season query.
+
+    Accepts either years=2023,2024 or from_year=/to_year=.
+
+    Returns:
+        list: Sorted list of year strings.
+
+    Raises:
+        ValueError: If the years are malformed or the range is too large.
+    """
+    try:
+        if args.get('years'):
+            years = sorted({int(year) for year in args['years'].split(',') if year.strip()})
+        else:
+            from_year = int(args.get('from_year') or args.get('to_year') or default_year)
+            to_year = int(args.get('to_year') or from_year)
+            if to_year < from_year:
+                raise ValueError("to_year must not be before from_year")
+            years = list(range(from_year, to_year + 1))
+    except ValueError as e:
+        raise ValueError(f"Invalid year range: {e}")
+
+    if not years:
+        raise ValueError("No years requested")
+    if len(years) > MAX_QUERY_YEARS:
+        raise ValueError(f"At most {MAX_QUERY_YEARS} seasons can be queried at once")
+    return [str(year) for year in years]
+
+
+class CalendarIndex:
+    """Secondary indexes over the races of one season.
+
+    Built once per season version, so status changes applied by the
+    scheduler are picked up on the next query while every other query is
+    answered from set intersections and a bisect over sorted race dates.
+    """
+
+    def __init__(self, season):
+        """Build the indexes.
+
+        Args:
+            season (SeasonCalendar): The season to index.
+        """
+        self.version = season.version
+        self.by_status = {}
+        self.by_format = {}
+        self.by_sprint = {True: set(), False: set()}
+        self.by_country = {}
+        self.dates = []
+        self.all_positions = frozenset(range(len(season.races)))
+
+        for position, race in enumerate(season.races):
+            self.by_status.setdefault((race.status or "").lower(), set()).add(position)
+            self.by_format.setdefault((race.format or "").lower(), set()).add(position)
+            self.by_sprint[bool(race.is_sprint)].add(position)
+            self.by_country.setdefault((race.country or "").lower(), set()).add(position)
+            if race.date is not None:
+                self.dates.append((race.date, position))
+        self.dates.sort()
+        self._date_keys = [epoch for epoch, _ in self.dates]
+
+    def positions(self, query):
+        """Return the sorted race positions matching the query filters."""
+        candidates = [
+            self.by_status.get(query.status, set()) if query.status is not None else None,
+            self.by_format.get(query.format, set()) if query.format is not None else None,
+            self.by_sprint[query.is_sprint] if query.is_sprint is not None else None,
+            self.by_country.get(query.country, set()) if query.country is not None else None,
+        ]
+        if query.date_from is not None or query.date_to is not None:
+            low = bisect.bisect_left(self._date_keys, query.date_from) if query.date_from is not None else 0
+            high = bisect.bisect_right(self._date_keys, query.date_to) if query.date_to is not None else len(self.dates)
+            candidates.append({position for _, position in self.dates[low:high]})
+
+        sets = sorted((c for c in candidates if c is not None), key=len)
+        if not sets:
+            return sorted(self.all_positions)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return sorted(result)
+
+
+def project(race, fields):
+    """Keep only the requested fields of a race dict."""
+    if fields is None:
+        return race
+    return {field: race[field] for field in fields if field in race}
+
+
+def paginate(items, query):
+    """Slice items according to the query's page settings.
+
+    Returns:
+        tuple: (page items, pagination dict or None)
+    """
+    if query.page is None:
+        return items, None
+    start = (query.page - 1) * query.per_page
+    page_items = items[start:start + query.per_page]
+    return page_items, {
+        "page": query.page,
+        "per_page": query.per_page,
+        "total": len(items),
+        "pages": (len(items) + query.per_page - 1) // query.per_page
+    }
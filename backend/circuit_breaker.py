@@ -0,0 +1,127 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failures that open the breaker
+FAILURE_THRESHOLD = int(os.environ.get('UPSTREAM_FAILURE_THRESHOLD', '3'))
+
+# Seconds the breaker stays open before a single trial call is allowed
+RESET_TIMEOUT = float(os.environ.get('UPSTREAM_RESET_TIMEOUT', '300'))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the upstream while the breaker is open."""
+
+    def __init__(self, name, retry_at):
+        super().__init__(f"Upstream {name} unavailable (circuit open)")
+        self.retry_at = retry_at
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream for a while after repeated errors.
+
+    closed: calls go through; failures are counted.
+    open: calls fail immediately with CircuitOpenError until reset_timeout passes.
+    half_open: one trial call is let through; success closes the breaker,
+    failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, clock=time.time):
+        """Initialize the breaker.
+
+        Args:
+            name (str): Upstream name for logs and health reports.
+            failure_threshold (int): Consecutive failures that open the breaker.
+            reset_timeout (float): Seconds before a trial call is allowed.
+            clock (callable): Returns the current epoch time.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._last_error = None
+        self._last_success = None
+        self._last_failure = None
+
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+            Exception: Whatever func raises (after recording the failure).
+        """
+        with self._lock:
+            now = self.clock()
+            if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._trial_running = False
+            if self._state == OPEN or (self._state == HALF_OPEN and self._trial_running):
+                raise CircuitOpenError(self.name, (self._opened_at or now) + self.reset_timeout)
+            if self._state == HALF_OPEN:
+                self._trial_running = True
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        self._record_success()
+        return result
+
+    def _record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Upstream {self.name} recovered; closing circuit")
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+            self._last_success = self.clock()
+
+    def _record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            self._last_failure = self.clock()
+            self._trial_running = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Opening circuit for upstream {self.name} after "
+                                   f"{self._failures} failures: {error}")
+                self._state = OPEN
+                self._opened_at = self._last_failure
+
+    @property
+    def state(self):
+        """Current state (an open breaker past its timeout reports half_open)."""
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def snapshot(self):
+        """State and counters for health reports."""
+        state = self.state
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened_at": self._opened_at,
+                "retry_at": self._opened_at + self.reset_timeout if self._opened_at else None,
+                "last_error": self._last_error,
+                "last_success": self._last_success,
+                "last_failure": self._last_failure
+            }
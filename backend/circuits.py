@@ -0,0 +1,220 @@
+import os
+import logging
+import datetime
+import threading
+import unicodedata
+from collections import OrderedDict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from serialization import read_json_file
+
+logger = logging.getLogger(__name__)
+
+CIRCUITS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'circuits.json')
+
+# Number of (year, timezone) calendar conversions kept in memory
+LOCALIZED_CACHE_SIZE = 64
+
+
+def normalize_name(name):
+    """Lookup key: case-folded with accents and punctuation removed."""
+    decomposed = unicodedata.normalize('NFKD', name or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return "".join(char for char in stripped.casefold() if char.isalnum())
+
+
+def get_timezone(name):
+    """Resolve an IANA timezone name.
+
+    Raises:
+        ValueError: If the timezone is unknown.
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+class CircuitTable:
+    """Bundled circuit metadata (IANA timezone, coordinates) with O(1) lookup.
+
+    The table is precomputed in data/circuits.json and keyed by the FastF1
+    Location string; aliases and accent-free spellings resolve to the same
+    entry.
+    """
+
+    def __init__(self, path=CIRCUITS_FILE):
+        """Load the table and build the lookup index."""
+        self._by_key = {}
+        self._zones = {}
+        try:
+            circuits = read_json_file(path).get('circuits', {})
+        except Exception as e:
+            logger.error(f"Error loading circuit table {path}: {e}")
+            circuits = {}
+
+        for location, info in circuits.items():
+            entry = {
+                "name": info['circuit'],
+                "location": location,
+                "country": info.get('country', ""),
+                "timezone": info['timezone'],
+                "latitude": info.get('latitude'),
+                "longitude": info.get('longitude')
+            }
+            for key in [location] + info.get('aliases', []):
+                self._by_key[normalize_name(key)] = entry
+        logger.info(f"Loaded {len(circuits)} circuits from {path}")
+
+    def lookup(self, location):
+        """Find circuit metadata for a FastF1 location.
+
+        Returns:
+            dict: Circuit metadata, or None if the location is unknown.
+        """
+        return self._by_key.get(normalize_name(location))
+
+    def zone(self, location):
+        """Return the ZoneInfo of a location's circuit, or None."""
+        entry = self.lookup(location)
+        if entry is None:
+            return None
+        zone = self._zones.get(entry['timezone'])
+        if zone is None:
+            zone = ZoneInfo(entry['timezone'])
+            self._zones[entry['timezone']] = zone
+        return zone
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_circuit_table():
+    """Return the shared CircuitTable, loading it on first use."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = CircuitTable()
+    return _table
+
+
+def enrich_race(race, table=None):
+    """Attach circuit metadata and local session times to a race dict in place.
+
+    Args:
+        race (dict): A race in the process_calendar shape.
+        table (CircuitTable, optional): Defaults to the bundled table.
+
+    Returns:
+        dict: The same race.
+    """
+    table = table or get_circuit_table()
+    circuit = table.lookup(race.get('location'))
+    if circuit is None:
+        if race.get('location'):
+            logger.warning(f"No circuit metadata for location: {race.get('location')}")
+        return race
+
+    zone = table.zone(race.get('location'))
+    race['circuit'] = {
+        "name": circuit['name'],
+        "timezone": circuit['timezone'],
+        "latitude": circuit['latitude'],
+        "longitude": circuit['longitude']
+    }
+
+    local_sessions = {}
+    for session_key, session_date in (race.get('sessions') or {}).items():
+        if not session_date:
+            local_sessions[session_key] = None
+            continue
+        try:
+            parsed = datetime.datetime.fromisoformat(session_date.replace('Z', '+00:00'))
+        except ValueError:
+            local_sessions[session_key] = None
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        local_sessions[session_key] = parsed.astimezone(zone).isoformat()
+    race['local_sessions'] = local_sessions
+    return race
+
+
+def enrich_calendar(calendar_data, table=None):
+    """Enrich every race of a calendar dict in place."""
+    table = table or get_circuit_table()
+    for race in calendar_data.get('races', []):
+        enrich_race(race, table)
+    return calendar_data
+
+
+def _to_zone(epoch, zone):
+    """Format an epoch timestamp in a timezone."""
+    if epoch is None:
+        return None
+    return datetime.datetime.fromtimestamp(epoch, zone).isoformat()
+
+
+def localize_race(race_model, race_dict, zone):
+    """Copy a race dict with its date and sessions converted to a timezone.
+
+    Args:
+        race_model (Race): The race model (epoch timestamps).
+        race_dict (dict): The serialized race.
+        zone (ZoneInfo): Target timezone.
+
+    Returns:
+        dict: The converted copy.
+    """
+    localized = dict(race_dict)
+    localized['date'] = _to_zone(race_model.date, zone)
+    localized['sessions'] = {session.key: _to_zone(session.start, zone) for session in race_model.sessions}
+    localized['timezone'] = zone.key
+    return localized
+
+
+class LocalizedCalendarCache:
+    """Per-(year, timezone) cache of calendars converted for a viewer's timezone.
+
+    Entries are tied to the season version, so a status flip or schedule
+    change is picked up on the next read.
+    """
+
+    def __init__(self, max_size=LOCALIZED_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, season, tz_name):
+        """Return the season's calendar dict converted to tz_name.
+
+        Raises:
+            ValueError: If the timezone is unknown.
+        """
+        zone = get_timezone(tz_name)
+        key = (str(season.year), zone.key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == season.version:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        calendar = dict(season.to_dict())
+        calendar['races'] = [
+            localize_race(race, race_dict, zone)
+            for race, race_dict in zip(season.races, calendar['races'])
+        ]
+        calendar['timezone'] = zone.key
+
+        with self._lock:
+            self._entries[key] = (season.version, calendar)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return calendar
@@ -0,0 +1,103 @@
+import os
+import math
+import time
+import logging
+import datetime
+
+logger = logging.getLogger(__name__)
+
+# Range of instants parse_at accepts: 1900-01-01 to the end of 9999, so every one is a valid datetime
+MIN_AT = -2208988800
+MAX_AT = 253402300799
+
+
+def parse_at(value):
+    """Parse an instant given as an ISO 8601 timestamp or epoch seconds.
+
+    Naive timestamps are treated as UTC.
+
+    Args:
+        value (str): e.g. "2025-05-04T18:00:00Z" or "1746381600".
+
+    Returns:
+        float: The epoch.
+
+    Raises:
+        ValueError: If the value is neither, or not a finite instant between
+            MIN_AT and MAX_AT.
+    """
+    value = str(value).strip()
+    try:
+        epoch = float(value)
+    except ValueError:
+        try:
+            parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Invalid instant '{value}': expected ISO 8601 or epoch seconds")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        epoch = parsed.timestamp()
+    if not math.isfinite(epoch) or not MIN_AT <= epoch <= MAX_AT:
+        raise ValueError(f"Invalid instant '{value}': must be between 1900 and 9999")
+    return epoch
+
+
+def utc_datetime(epoch):
+    """Timezone-aware UTC datetime for an epoch."""
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc)
+
+
+class TimeTravelClock:
+    """A clock that starts at a chosen instant.
+
+    Like time.time it is called without arguments and returns the epoch, so
+    it can be passed wherever a clock callable is accepted. Unless frozen it
+    advances with the wall clock, which keeps the scheduler's timer working
+    in a replayed weekend.
+    """
+
+    def __init__(self, start, frozen=False, source=time.time):
+        """Initialize the clock.
+
+        Args:
+            start (float): Epoch the clock reads now.
+            frozen (bool): Keep reading start instead of advancing.
+            source (callable): Underlying wall clock.
+        """
+        self.frozen = frozen
+        self._source = source
+        self.set(start)
+
+    def __call__(self):
+        if self.frozen:
+            return self._start
+        return self._start + (self._source() - self._origin)
+
+    def set(self, epoch):
+        """Jump to epoch."""
+        self._start = epoch
+        self._origin = self._source()
+
+    def advance(self, seconds):
+        """Move the clock forward (or back, for negative seconds)."""
+        self.set(self() + seconds)
+
+
+def create_clock(environ=None):
+    """The application clock: the wall clock unless CLOCK_AT requests time travel.
+
+    CLOCK_AT takes an ISO 8601 timestamp or epoch seconds; CLOCK_FROZEN=1
+    keeps the clock at that instant instead of letting it run on.
+
+    Returns:
+        callable: Returns the current epoch.
+    """
+    environ = os.environ if environ is None else environ
+    at = environ.get('CLOCK_AT')
+    if not at:
+        return time.time
+    frozen = environ.get('CLOCK_FROZEN', '').lower() in ('1', 'true', 'yes')
+    clock = TimeTravelClock(parse_at(at), frozen=frozen)
+    logger.warning(f"Time travel: clock starts at {utc_datetime(clock()).isoformat()}"
+                   f"{' (frozen)' if frozen else ''}")
+    return clock
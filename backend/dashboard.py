@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from circuits import get_timezone
+from serialization import encode, CALENDAR_SCHEMA, NEXT_RACE_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# Sections of the dashboard response, in response order
+SECTIONS = ('next_race', 'calendar', 'standings', 'last_winner', 'conditions')
+
+# Number of rendered (section, year, tz) entries kept in memory
+DASHBOARD_CACHE_SIZE = 256
+
+
+def parse_sections(value):
+    """Parse a ?sections=next_race,calendar parameter.
+
+    Returns:
+        tuple: The requested sections in response order (all when value is empty).
+
+    Raises:
+        ValueError: If a section is unknown.
+    """
+    if not value:
+        return SECTIONS
+    requested = {name.strip().lower() for name in value.split(',') if name.strip()}
+    unknown = sorted(requested - set(SECTIONS))
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+    return tuple(name for name in SECTIONS if name in requested) or SECTIONS
+
+
+def parse_if_none_match(value):
+    """The set of entity tags in an If-None-Match header (weak prefixes removed)."""
+    if not value:
+        return frozenset()
+    tags = (tag.strip() for tag in value.split(','))
+    return frozenset(tag[2:] if tag.startswith('W/') else tag for tag in tags if tag)
+
+
+class Dashboard:
+    """Everything the dashboard's first paint needs, in one response.
+
+    Each section is rendered once per data version and kept with its own
+    ETag, so a request is a few dictionary lookups. Clients send the ETags
+    they hold in If-None-Match; matching sections come back as
+    {"etag", "not_modified": true} without data, and when every section
+    matches the whole response is a 304.
+    """
+
+    def __init__(self, calendar_fetcher, results_store=None, max_size=DASHBOARD_CACHE_SIZE, conditions=None):
+        """Initialize the dashboard.
+
+        Args:
+            calendar_fetcher (RaceCalendarFetcher): Source of calendars and the next race.
+            results_store (ResultsStore, optional): Source of standings and winners;
+                without it those sections are null.
+            max_size (int): Rendered sections kept in memory.
+            conditions (SessionConditions, optional): Source of the next race's
+                weather and track status; without it that section is null.
+        """
+        self.calendar_fetcher = calendar_fetcher
+        self.results_store = results_store
+        self.conditions = conditions
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _version(self, name, year, at=None):
+        """Version of the data a section is derived from, or None if it cannot be cached."""
+        if name == 'conditions':
+            if self.conditions is None:
+                return 0
+            calendar_version = self._version('next_race', year, at)
+            return (calendar_version, self.conditions.version) if calendar_version is not None else None
+        if name in ('next_race', 'calendar'):
+            if at is not None:
+                # Every instant in one status window gets the same answer
+                return self.calendar_fetcher.get_status_window(year, at)
+            season = self.calendar_fetcher.get_season(year)
+            return season.version if season is not None else None
+        return self.results_store.version if self.results_store is not None else 0
+
+    def _render(self, name, year, tz, at=None):
+        """Compute a section's data."""
+        fetcher = self.calendar_fetcher
+        if name == 'next_race':
+            next_race = fetcher.get_next_race(year, at=at)
+            if next_race and tz:
+                next_race = fetcher.localize_race_dict(year, next_race, tz)
+            return NEXT_RACE_SCHEMA.normalize(next_race) if next_race else None
+        if name == 'calendar':
+            if tz:
+                calendar_data = fetcher.get_localized_calendar(year, tz, at=at)
+            else:
+                calendar_data = fetcher.get_calendar(year, at=at)
+            if not calendar_data or 'error' in calendar_data:
+                raise RuntimeError((calendar_data or {}).get('error') or "No calendar data available")
+            return CALENDAR_SCHEMA.normalize(calendar_data)
+        if name == 'conditions':
+            if self.conditions is None:
+                return None
+            next_race = fetcher.get_next_race(year, at=at)
+            return self.conditions.summary(year, next_race['round']) if next_race else None
+        if self.results_store is None:
+            return None
+        if name == 'standings':
+            return self.results_store.standings(int(year))
+        return self.results_store.last_winner(int(year))
+
+    def section(self, name, year, tz=None, at=None):
+        """Return (etag, data) for one section, rendering only if its data changed.
+
+        Args:
+            name (str): One of SECTIONS.
+            year (str): The season.
+            tz (str, optional): IANA timezone for calendar dates.
+            at (float, optional): Time-travel instant (epoch).
+
+        Returns:
+            tuple: (etag, data)
+        """
+        version = self._version(name, str(year), at)
+        # Time-travel entries are kept per status window, next to the live one
+        key = (name, str(year), tz, version if at is not None else None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and version is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1], entry[2]
+
+        data = self._render(name, str(year), tz, at)
+        etag = f'"{name}-{hashlib.sha1(encode(data)).hexdigest()[:20]}"'
+        logger.info(f"Rendered dashboard section {key} (version {version})")
+
+        if version is not None:
+            with self._lock:
+                self._entries[key] = (version, etag, data)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return etag, data
+
+    def build(self, year, tz=None, sections=SECTIONS, if_none_match=None, at=None):
+        """Assemble the dashboard response.
+
+        A section that fails is reported with an error and no ETag, so the
+        other sections are still delivered.
+
+        Args:
+            year (str): The season.
+            tz (str, optional): IANA timezone for calendar dates.
+            sections (tuple): Sections to include.
+            if_none_match (str, optional): The request's If-None-Match header.
+            at (float, optional): Time-travel instant (epoch) for statuses and the next race.
+
+        Returns:
+            tuple: (etag, payload, not_modified) where not_modified is True
+            when the client already holds every section.
+
+        Raises:
+            ValueError: If the timezone is unknown.
+        """
+        if tz:
+            get_timezone(tz)
+        known = parse_if_none_match(if_none_match)
+
+        payload = {"year": str(year), "timezone": tz, "sections": {}}
+        etags = []
+        for name in sections:
+            try:
+                etag, data = self.section(name, year, tz, at)
+            except Exception as e:
+                logger.error(f"Error building dashboard section {name}: {e}", exc_info=True)
+                payload["sections"][name] = {"etag": None, "error": str(e)}
+                etags.append(f"{name}:error")
+                continue
+            etags.append(etag)
+            if etag in known:
+                payload["sections"][name] = {"etag": etag, "not_modified": True}
+            else:
+                payload["sections"][name] = {"etag": etag, "data": data}
+
+        combined = f'"{hashlib.sha1("|".join(etags + [tz or ""]).encode("utf-8")).hexdigest()[:20]}"'
+        payload["etag"] = combined
+        not_modified = combined in known or (
+            bool(sections) and all(section.get("not_modified") for section in payload["sections"].values()))
+        return combined, payload, not_modified
@@ -0,0 +1,196 @@
+import os
+import math
+import time
+import logging
+import threading
+
+from circuit_breaker import CLOSED, OPEN
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first background retry of a failed season; doubles per failure
+RETRY_BASE = float(os.environ.get('UPSTREAM_RETRY_BASE', '30'))
+
+# Longest wait between background retries
+RETRY_MAX = float(os.environ.get('UPSTREAM_RETRY_MAX', '1800'))
+
+FRESH = "fresh"
+STALE = "stale"
+UNAVAILABLE = "unavailable"
+
+
+class Freshness:
+    """How current the data behind a response is.
+
+    fresh: the latest upstream refresh succeeded (or none has failed yet).
+    stale: upstream is failing; the last known good calendar is served.
+    unavailable: upstream is failing and there is nothing to serve.
+    """
+
+    __slots__ = ('tier', 'age', 'retry_after', 'error')
+
+    def __init__(self, tier, age=None, retry_after=None, error=None):
+        self.tier = tier
+        self.age = age
+        self.retry_after = retry_after
+        self.error = error
+
+    @property
+    def stale(self):
+        return self.tier == STALE
+
+    def headers(self):
+        """X-Data-Age, X-Data-Stale and Retry-After for degraded responses (none when fresh)."""
+        if self.tier == FRESH:
+            return {}
+        headers = {'Retry-After': str(max(1, int(math.ceil(self.retry_after or 0))))}
+        if self.age is not None:
+            headers['X-Data-Age'] = str(int(self.age))
+        if self.tier == STALE:
+            headers['X-Data-Stale'] = 'true'
+        return headers
+
+    def mark(self, payload):
+        """A copy of a dict payload flagged stale: true with its age; other payloads unchanged."""
+        if self.tier != STALE or not isinstance(payload, dict):
+            return payload
+        return dict(payload, stale=True, age_seconds=int(self.age) if self.age is not None else None)
+
+    def to_dict(self):
+        return {
+            "tier": self.tier,
+            "age_seconds": int(self.age) if self.age is not None else None,
+            "retry_after": self.retry_after,
+            "error": self.error
+        }
+
+
+class DegradationPolicy:
+    """Decides when a season may be fetched from upstream and how stale it is.
+
+    Every refresh outcome is recorded per season. After a failure the
+    season is degraded: requests are answered from the last known good
+    calendar (or refused with Retry-After if there is none) and never
+    fetch inline. Instead one background retry is allowed per backoff
+    period, which doubles from RETRY_BASE up to RETRY_MAX and is never
+    shorter than the time the circuit breaker stays open.
+    """
+
+    def __init__(self, breaker, base=RETRY_BASE, maximum=RETRY_MAX, clock=time.time):
+        """Initialize the policy.
+
+        Args:
+            breaker (CircuitBreaker): Breaker guarding the upstream calls.
+            base (float): Seconds before the first retry.
+            maximum (float): Longest wait between retries.
+            clock (callable): Returns the current epoch.
+        """
+        self.breaker = breaker
+        self.base = base
+        self.maximum = maximum
+        self.clock = clock
+        self._years = {}
+        self._lock = threading.Lock()
+
+    def _state(self, year):
+        return self._years.setdefault(str(year), {
+            "failures": 0, "next_attempt": None, "last_success": None,
+            "last_error": None, "retrying": False
+        })
+
+    def record_success(self, year):
+        """A refresh of year succeeded: the season is fresh again."""
+        with self._lock:
+            state = self._state(year)
+            if state["failures"]:
+                logger.info(f"Upstream recovered for {year} after {state['failures']} failed refreshes")
+            state.update(failures=0, next_attempt=None, last_error=None, last_success=self.clock())
+
+    def record_failure(self, year, error):
+        """A refresh of year failed: back off before the next attempt.
+
+        Returns:
+            float: Seconds until the next attempt.
+        """
+        with self._lock:
+            state = self._state(year)
+            state["failures"] += 1
+            state["last_error"] = str(error)
+            delay = min(self.maximum, self.base * 2 ** (state["failures"] - 1))
+            state["next_attempt"] = self.clock() + delay
+            failures = state["failures"]
+        logger.warning(f"Refresh of {year} failed ({failures} in a row); next attempt in {delay:.0f}s")
+        return delay
+
+    def healthy(self, year):
+        """Whether year may be fetched inline: no failed refresh and the breaker closed."""
+        with self._lock:
+            state = self._years.get(str(year))
+            if state is not None and state["failures"]:
+                return False
+        return self.breaker.state == CLOSED
+
+    def retry_after(self, year):
+        """Seconds until year may be fetched again (at least 1)."""
+        now = self.clock()
+        waits = []
+        with self._lock:
+            state = self._years.get(str(year))
+            if state is not None and state["next_attempt"] is not None:
+                waits.append(state["next_attempt"] - now)
+        retry_at = self.breaker.snapshot()["retry_at"]
+        if self.breaker.state == OPEN and retry_at is not None:
+            waits.append(retry_at - now)
+        return max([1.0] + waits)
+
+    def claim_retry(self, year):
+        """Claim the single background retry of year if one is due.
+
+        Returns:
+            bool: True if the caller should retry now (and call release_retry after).
+        """
+        if self.breaker.state == OPEN:
+            return False
+        with self._lock:
+            state = self._state(year)
+            if state["retrying"]:
+                return False
+            if state["next_attempt"] is not None and self.clock() < state["next_attempt"]:
+                return False
+            state["retrying"] = True
+            return True
+
+    def release_retry(self, year):
+        with self._lock:
+            self._state(year)["retrying"] = False
+
+    def last_success(self, year):
+        """Epoch of the last successful refresh of year in this process, or None."""
+        with self._lock:
+            state = self._years.get(str(year))
+            return state["last_success"] if state is not None else None
+
+    def assess(self, year, available, age=None):
+        """The freshness tier of a season.
+
+        Args:
+            year (str): The season year.
+            available (bool): Whether a calendar for year is loaded.
+            age (float, optional): Seconds since that calendar was last known good.
+
+        Returns:
+            Freshness: The tier, age and retry hint.
+        """
+        if self.healthy(year):
+            return Freshness(FRESH if available else UNAVAILABLE, age,
+                             None if available else self.retry_after(year))
+        with self._lock:
+            error = (self._years.get(str(year)) or {}).get("last_error")
+        error = error or self.breaker.snapshot()["last_error"]
+        return Freshness(STALE if available else UNAVAILABLE, age, self.retry_after(year), error)
+
+    def snapshot(self):
+        """Per-season failure counts and next attempts for readiness reports."""
+        with self._lock:
+            return {year: {key: value for key, value in state.items() if key != "retrying"}
+                    for year, state in self._years.items()}
@@ -0,0 +1,132 @@
+"""Gunicorn production profile for the Flask app.
+
+Usage:
+    gunicorn --config gunicorn.conf.py app:app
+
+Everything is tunable from the environment:
+    PORT                        Port to bind (default 5000).
+    WEB_CONCURRENCY             Worker processes (default 2 x CPUs + 1, at most 8).
+    GUNICORN_WORKER_CLASS       gthread (default) or gevent. gevent needs the
+                                gevent package (in requirements.txt); startup
+                                fails if it is missing.
+    GUNICORN_THREADS            Threads per gthread worker (default 4).
+    GUNICORN_CONNECTIONS        Concurrent connections per gevent worker (default 200).
+    GUNICORN_PRELOAD            1 (default) imports and warms the app once in the
+                                master; 0 imports it in every worker.
+    WORKER_MAX_MEMORY_MB        Recycle a worker once its RSS exceeds this after a
+                                request (default 512; 0 disables).
+    GUNICORN_MAX_REQUESTS       Also recycle after this many requests (default 0, off).
+    GUNICORN_GRACEFUL_TIMEOUT   Seconds a stopping worker gets to finish requests
+                                and queued refreshes (default 30).
+    GUNICORN_TIMEOUT            Seconds before a silent worker is killed (default 60).
+
+With preloading, app.py loads the current season, its indexes and the
+FastF1/pandas imports before forking, and gc.freeze() keeps those objects
+out of the collector so the workers share the pages copy-on-write instead
+of each touching (and copying) them. Threads and SQLite connections do not
+survive a fork, so the master stops the scheduler timer and closes its
+results index connection before forking; every worker restarts the timer.
+"""
+import os
+import gc
+import sys
+import time
+import multiprocessing
+
+# Worker model
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    try:
+        from gevent import monkey
+    except ImportError:
+        # Serving with another worker class than the one asked for would go unnoticed
+        raise RuntimeError("GUNICORN_WORKER_CLASS=gevent but gevent is not installed; "
+                           "install it (pip install -r requirements.txt) or use gthread")
+    # Patch before the app (and its locks and threads) is imported by preload
+    monkey.patch_all()
+
+workers = int(os.environ.get('WEB_CONCURRENCY', min(2 * multiprocessing.cpu_count() + 1, 8)))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+worker_connections = int(os.environ.get('GUNICORN_CONNECTIONS', '200'))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Lifecycle
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# Workers above this resident size finish their current request and are replaced
+max_worker_memory_mb = int(os.environ.get('WORKER_MAX_MEMORY_MB', '512'))
+
+accesslog = '-'
+errorlog = '-'
+
+_frozen = False
+
+
+def _app_module():
+    """The imported app module, or None if it has not been loaded in this process."""
+    return sys.modules.get('app')
+
+
+def _rss_mb():
+    """Current resident set size of this process in MB."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        # Peak rather than current size where /proc is unavailable (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def pre_fork(server, worker):
+    """Master: make the preloaded app safe to fork and share."""
+    global _frozen
+    app = _app_module()
+    if app is None:
+        return
+    app.calendar_fetcher.scheduler.stop()
+    app.results_store.close()
+    if not _frozen:
+        gc.freeze()
+        _frozen = True
+        server.log.info(f"Preloaded app frozen for copy-on-write sharing ({gc.get_freeze_count()} objects)")
+
+
+def post_fork(server, worker):
+    """Worker: restart the timer thread that keeps statuses current."""
+    app = _app_module()
+    if app is not None:
+        app.calendar_fetcher.scheduler.start()
+
+
+def post_request(worker, req, environ, resp):
+    """Recycle the worker once it grows past the memory ceiling."""
+    if max_worker_memory_mb <= 0:
+        return
+    rss = _rss_mb()
+    if rss > max_worker_memory_mb:
+        worker.log.warning(f"Worker {worker.pid} uses {rss:.0f} MB (limit {max_worker_memory_mb} MB); recycling")
+        worker.alive = False
+
+
+def worker_exit(server, worker):
+    """Drain queued and running refreshes, then stop background threads."""
+    app = _app_module()
+    if app is None:
+        return
+    started = time.monotonic()
+    stats = app.refresh_jobs.stats()
+    pending = stats['queued'] + stats['running']
+    app.refresh_jobs.stop(timeout=graceful_timeout)
+    app.live_broadcaster.stop()
+    app.session_conditions.stop()
+    app.calendar_fetcher.scheduler.stop()
+    if pending:
+        worker.log.info(f"Worker {worker.pid} drained {pending} refresh jobs in {time.monotonic() - started:.1f}s")
@@ -0,0 +1,210 @@
+import hashlib
+import logging
+import datetime
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Number of rendered (year, filter) feeds kept in memory
+FEED_CACHE_SIZE = 128
+
+# Calendar clients poll feeds; tell them how long a response stays fresh
+FEED_MAX_AGE = 3600
+
+PRODUCT_ID = "-//F1 Dashboard//Race Calendar//EN"
+UID_DOMAIN = "f1dashboard"
+
+# Display names and typical durations (minutes) of the session keys written by process_calendar
+SESSION_LABELS = {
+    "practice1": "Practice 1",
+    "practice2": "Practice 2",
+    "practice3": "Practice 3",
+    "practice_1": "Practice 1",
+    "practice_2": "Practice 2",
+    "practice_3": "Practice 3",
+    "sprint_qualifying": "Sprint Qualifying",
+    "sprint_shootout": "Sprint Shootout",
+    "sprint": "Sprint",
+    "qualifying": "Qualifying",
+    "race": "Race",
+}
+SESSION_DURATIONS = {
+    "sprint_qualifying": 45,
+    "sprint_shootout": 45,
+    "sprint": 60,
+    "qualifying": 60,
+    "race": 120,
+}
+DEFAULT_SESSION_DURATION = 60
+
+
+def parse_session_filter(value):
+    """Parse a ?sessions=race,qualifying parameter.
+
+    Returns:
+        frozenset: The requested session keys, or None for all sessions.
+
+    Raises:
+        ValueError: If a session key is unknown.
+    """
+    if not value:
+        return None
+    sessions = frozenset(key.strip().lower() for key in value.split(',') if key.strip())
+    unknown = sorted(sessions - set(SESSION_LABELS))
+    if unknown:
+        raise ValueError(f"Unknown sessions: {', '.join(unknown)}")
+    return sessions or None
+
+
+def _escape(text):
+    """Escape a TEXT value (RFC 5545 section 3.3.11)."""
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Fold a content line at 75 octets (RFC 5545 section 3.1)."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte character
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode('utf-8'))
+    return "\r\n ".join(parts)
+
+
+def _utc(epoch):
+    """Format an epoch timestamp as an iCalendar UTC date-time."""
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _event_uid(season, race, session):
+    """Stable UID of a session's VEVENT.
+
+    Testing events all have round 0, so they are told apart by their date
+    (or name when undated); a season can have two tests with the same name.
+    """
+    if race.round:
+        event = race.round
+    elif race.date is not None:
+        event = f"0-{_utc(race.date)[:8]}"
+    else:
+        event = "0-" + "-".join(race.name.lower().split())
+    return f"{season.year}-{event}-{session.key}@{UID_DOMAIN}"
+
+
+def render_feed(season, races, sessions=None):
+    """Render races as an iCalendar document with one VEVENT per session.
+
+    DTSTAMP is taken from the season's last_updated value rather than the
+    clock, so rendering an unchanged season always yields the same bytes.
+
+    Args:
+        season (SeasonCalendar): The season the races belong to.
+        races (list): Race models to include.
+        sessions (frozenset, optional): Session keys to include; None for all.
+
+    Returns:
+        bytes: The UTF-8 encoded feed.
+    """
+    stamp_epoch = None
+    if season.last_updated:
+        try:
+            stamp_epoch = datetime.datetime.fromisoformat(season.last_updated.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    stamp = _utc(stamp_epoch) if stamp_epoch is not None else "19700101T000000Z"
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODUCT_ID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:Formula 1 {season.year}",
+    ]
+    for race in races:
+        circuit = (race.extra or {}).get('circuit') or {}
+        location = ", ".join(part for part in (circuit.get('name'), race.location, race.country) if part)
+        round_label = f"Round {race.round}" if race.round else "Testing"
+        for session in race.sessions:
+            if session.start is None or (sessions is not None and session.key not in sessions):
+                continue
+            label = SESSION_LABELS.get(session.key, session.key.replace('_', ' ').title())
+            duration = SESSION_DURATIONS.get(session.key, DEFAULT_SESSION_DURATION)
+            lines.extend([
+                "BEGIN:VEVENT",
+                f"UID:{_event_uid(season, race, session)}",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{_utc(session.start)}",
+                f"DTEND:{_utc(session.start + duration * 60)}",
+                f"SUMMARY:{_escape(f'{race.name} - {label}')}",
+                f"LOCATION:{_escape(location)}",
+                f"DESCRIPTION:{_escape(f'{season.year} {round_label}: {race.official_name or race.name}')}",
+            ])
+            if circuit.get('latitude') is not None and circuit.get('longitude') is not None:
+                lines.append(f"GEO:{circuit['latitude']};{circuit['longitude']}")
+            lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode('utf-8')
+
+
+class FeedCache:
+    """Rendered feeds keyed by (year, filter), tied to the season version.
+
+    Each entry stores the body and its ETag, so a poll for an unchanged
+    season is a dictionary lookup and a matching If-None-Match costs even
+    less.
+    """
+
+    def __init__(self, max_size=FEED_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, version, render):
+        """Return (etag, body) for key, rendering only if the version changed.
+
+        Args:
+            key (tuple): Cache key, e.g. (year, filter...).
+            version (int): Current season version.
+            render (callable): Produces the feed bytes on a miss.
+
+        Returns:
+            tuple: (etag, body)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1], entry[2]
+
+        body = render()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        logger.info(f"Rendered calendar feed {key} (version {version}, {len(body)} bytes)")
+
+        with self._lock:
+            self._entries[key] = (version, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return etag, body
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value matches etag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
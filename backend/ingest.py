@@ -0,0 +1,267 @@
+"""Backfill calendars and results for many seasons using a process pool.
+
+Examples:
+    # Rebuild the data directory for 2018-2025 with race results
+    python ingest.py --from-year 2018 --to-year 2025 --results
+
+    # Also ingest qualifying and sprint classifications, 8 processes,
+    # but never more than 3 concurrent upstream requests
+    python ingest.py --years 2023,2024 --results --sessions Q,S --workers 8 --max-concurrency 3
+
+    # Every season since 1950, with finished seasons packed into the archive
+    python ingest.py --from-year 1950 --to-year 2025 --archive --prune
+
+Work is checkpointed after every unit, so an interrupted run resumes where
+it stopped. Use --force to ignore the checkpoint.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from race_calendar_fetcher import DEFAULT_YEAR, RaceCalendarFetcher
+from calendar_archive import ARCHIVE_FILE, CalendarArchive, build as build_archive
+from results_fetcher import RACE, results_path, fetch_session_results, save_session_results
+from results_store import RESULTS_DB, ResultsStore
+from serialization import read_json_file, write_json_file
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Worker process state, set by _init_worker
+_upstream_slots = None
+_worker_dirs = None
+
+
+def _init_worker(upstream_slots, data_dir, cache_dir):
+    """Process pool initializer: share the upstream semaphore and directories."""
+    global _upstream_slots, _worker_dirs
+    _upstream_slots = upstream_slots
+    _worker_dirs = (data_dir, cache_dir)
+    logging.basicConfig(level=logging.WARNING)
+
+
+def _ingest_calendar(year):
+    """Worker: fetch and store one season's calendar."""
+    data_dir, cache_dir = _worker_dirs
+    fetcher = RaceCalendarFetcher(data_dir=data_dir, cache_dir=cache_dir)
+    with _upstream_slots:
+        calendar_data = fetcher.fetch_f1_calendar(year, force_refresh=True)
+    fetcher.scheduler.stop()
+
+    if 'error' in calendar_data:
+        raise RuntimeError(calendar_data['error'])
+    return len(calendar_data.get('races', []))
+
+
+def _ingest_results(year, round_number, identifier):
+    """Worker: fetch and store one session's results."""
+    data_dir, _ = _worker_dirs
+    with _upstream_slots:
+        payload = fetch_session_results(year, round_number, identifier)
+    save_session_results(data_dir, payload)
+    return len(payload['results'])
+
+
+class Checkpoint:
+    """Set of completed work units persisted atomically after every update."""
+
+    def __init__(self, path, reset=False):
+        self.path = path
+        self.completed = set()
+        self.failed = {}
+        if not reset and os.path.exists(path):
+            data = read_json_file(path)
+            self.completed = set(data.get('completed', []))
+            self.failed = data.get('failed', {})
+
+    def mark(self, unit, error=None):
+        """Record a unit as completed (or failed) and persist."""
+        if error is None:
+            self.completed.add(unit)
+            self.failed.pop(unit, None)
+        else:
+            self.failed[unit] = error
+        write_json_file(self.path, {
+            "updated": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "completed": sorted(self.completed),
+            "failed": self.failed
+        })
+
+
+class Progress:
+    """Progress and throughput reporting for a batch of units."""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.items = 0
+        self.started = time.monotonic()
+
+    def update(self, unit, items=0, error=None):
+        """Report one finished unit."""
+        self.done += 1
+        self.items += items
+        if error is not None:
+            self.failed += 1
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = (self.total - self.done) / rate if rate > 0 else 0.0
+        outcome = f"FAILED: {error}" if error is not None else f"{items} records"
+        print(f"[{self.label} {self.done}/{self.total}] {unit} {outcome} "
+              f"({rate * 60:.1f} units/min, ETA {remaining:.0f}s)", flush=True)
+
+    def summary(self):
+        """Print the batch summary."""
+        elapsed = time.monotonic() - self.started
+        print(f"{self.label}: {self.done - self.failed} ok, {self.failed} failed, "
+              f"{self.items} records in {elapsed:.1f}s", flush=True)
+
+
+def _run_batch(pool, label, units, submit, checkpoint):
+    """Run units on the pool, checkpointing and reporting as they finish."""
+    pending = [unit for unit in units if unit not in checkpoint.completed]
+    skipped = len(units) - len(pending)
+    if skipped:
+        print(f"{label}: skipping {skipped} units already in the checkpoint", flush=True)
+    if not pending:
+        return
+
+    progress = Progress(label, len(pending))
+    futures = {submit(unit): unit for unit in pending}
+    for future in as_completed(futures):
+        unit = futures[future]
+        try:
+            items = future.result()
+        except Exception as e:
+            checkpoint.mark(unit, error=str(e))
+            progress.update(unit, error=e)
+        else:
+            checkpoint.mark(unit)
+            progress.update(unit, items=items)
+    progress.summary()
+
+
+def completed_rounds(data_dir, year, now=None):
+    """Rounds of a stored season whose race has already taken place."""
+    path = os.path.join(data_dir, f'f1_calendar_{year}.json')
+    if os.path.exists(path):
+        calendar_data = read_json_file(path)
+    else:
+        calendar_data = CalendarArchive(os.path.join(data_dir, ARCHIVE_FILE)).read(year)
+    if not calendar_data:
+        return []
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+    rounds = []
+    for race in calendar_data.get('races', []):
+        if not race.get('round') or race.get('format') == 'testing' or not race.get('date'):
+            continue
+        race_date = datetime.datetime.fromisoformat(race['date'].replace('Z', '+00:00'))
+        if race_date.tzinfo is None:
+            race_date = race_date.replace(tzinfo=datetime.timezone.utc)
+        if race_date < now:
+            rounds.append((race['round'], race.get('format', '')))
+    return rounds
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Backfill F1 calendars and results.")
+    parser.add_argument('--years', help="Comma-separated seasons, e.g. 2023,2024")
+    parser.add_argument('--from-year', type=int, default=DEFAULT_YEAR)
+    parser.add_argument('--to-year', type=int)
+    parser.add_argument('--results', action='store_true', help="Also ingest race results")
+    parser.add_argument('--sessions', default='',
+                        help="Extra session results to ingest with --results, e.g. Q,S,SQ")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help="Number of worker processes")
+    parser.add_argument('--max-concurrency', type=int, default=4,
+                        help="Maximum concurrent upstream requests across all workers")
+    parser.add_argument('--data-dir', default=os.path.join(BACKEND_DIR, 'data'))
+    parser.add_argument('--cache-dir', default=os.path.join(BACKEND_DIR, 'cache'))
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <data-dir>/ingest_checkpoint.json)")
+    parser.add_argument('--force', action='store_true', help="Ignore the checkpoint and redo everything")
+    parser.add_argument('--archive', action='store_true',
+                        help="Pack finished seasons into the compressed calendar archive")
+    parser.add_argument('--prune', action='store_true',
+                        help="With --archive, delete the JSON calendars of archived seasons")
+    args = parser.parse_args(argv)
+
+    if args.years:
+        args.year_list = sorted({int(year) for year in args.years.split(',') if year.strip()})
+    else:
+        args.year_list = list(range(args.from_year, (args.to_year or args.from_year) + 1))
+    args.session_list = [RACE] + [s.strip().upper() for s in args.sessions.split(',') if s.strip()]
+    if args.checkpoint is None:
+        args.checkpoint = os.path.join(args.data_dir, 'ingest_checkpoint.json')
+    return args
+
+
+def main(argv=None):
+    """Run the backfill."""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    os.makedirs(args.data_dir, exist_ok=True)
+    os.makedirs(args.cache_dir, exist_ok=True)
+
+    checkpoint = Checkpoint(args.checkpoint, reset=args.force)
+    upstream_slots = multiprocessing.get_context().BoundedSemaphore(max(1, args.max_concurrency))
+    started = time.monotonic()
+    print(f"Ingesting {len(args.year_list)} seasons ({args.year_list[0]}-{args.year_list[-1]}) "
+          f"with {args.workers} workers, upstream concurrency {args.max_concurrency}", flush=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(upstream_slots, args.data_dir, args.cache_dir)) as pool:
+        # Archived seasons are final; they are never fetched again
+        archive = CalendarArchive(os.path.join(args.data_dir, ARCHIVE_FILE))
+        archived = [year for year in args.year_list if year in archive]
+        if archived:
+            print(f"calendars: skipping {len(archived)} archived seasons", flush=True)
+        calendar_units = [f"calendar:{year}" for year in args.year_list if year not in archived]
+        _run_batch(pool, "calendars", calendar_units,
+                   lambda unit: pool.submit(_ingest_calendar, int(unit.split(':')[1])), checkpoint)
+
+        if args.results:
+            result_units = []
+            for year in args.year_list:
+                for round_number, event_format in completed_rounds(args.data_dir, year):
+                    for identifier in args.session_list:
+                        if identifier in ('S', 'SQ') and 'sprint' not in str(event_format).lower():
+                            continue
+                        # Results already on disk count as done even without a checkpoint entry
+                        unit = f"results:{year}:{round_number}:{identifier}"
+                        if not args.force and os.path.exists(results_path(args.data_dir, year, round_number, identifier)):
+                            checkpoint.completed.add(unit)
+                        result_units.append(unit)
+
+            def submit_results(unit):
+                _, year, round_number, identifier = unit.split(':')
+                return pool.submit(_ingest_results, int(year), int(round_number), identifier)
+
+            _run_batch(pool, "results", result_units, submit_results, checkpoint)
+
+    if args.archive:
+        added = build_archive(args.data_dir, {str(year) for year in args.year_list}, prune=args.prune)
+        print(f"Archived {len(added)} finished seasons into {ARCHIVE_FILE}", flush=True)
+
+    # Bring the historical query index up to date with what was written
+    indexed = ResultsStore(os.path.join(args.data_dir, RESULTS_DB)).sync(args.data_dir)
+    print(f"Indexed {indexed} changed files into {RESULTS_DB}", flush=True)
+
+    elapsed = time.monotonic() - started
+    print(f"Done in {elapsed:.1f}s; {len(checkpoint.failed)} units failed "
+          f"(rerun to retry them, checkpoint: {args.checkpoint})", flush=True)
+    return 1 if checkpoint.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+import os
+import hmac
+import time
+import uuid
+import queue
+import logging
+import datetime
+import threading
+from collections import OrderedDict
+
+from results_fetcher import fetch_session_results, save_session_results
+
+logger = logging.getLogger(__name__)
+
+# Worker threads executing refresh jobs
+DEFAULT_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+
+# Finished jobs kept for the status endpoint
+MAX_FINISHED_JOBS = 500
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class Job:
+    """A unit of background work and its outcome."""
+
+    __slots__ = ('id', 'kind', 'params', 'status', 'created_at', 'started_at',
+                 'finished_at', 'result', 'error', 'requests')
+
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        # Number of enqueue calls folded into this job by deduplication
+        self.requests = 1
+
+    @property
+    def key(self):
+        """Deduplication key: identical kind and parameters."""
+        return (self.kind, tuple(sorted(self.params.items())))
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self):
+        """Serialize for the status endpoint."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "requests": self.requests,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobQueue:
+    """Deduplicating job queue executed by a small pool of worker threads.
+
+    Enqueueing a job identical to one that is still queued or running
+    returns the existing job instead of adding another, so repeated
+    refresh requests during a race weekend cost one upstream fetch.
+    """
+
+    def __init__(self, handlers, workers=DEFAULT_WORKERS):
+        """Initialize the queue.
+
+        Args:
+            handlers (dict): Job kind -> callable(**params) returning a
+                JSON-friendly result.
+            workers (int): Number of worker threads.
+        """
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"job-worker-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    def stop(self, timeout=None):
+        """Stop the workers after the jobs already queued have run.
+
+        Args:
+            timeout (float, optional): Seconds to wait for all workers in total.
+        """
+        with self._lock:
+            threads = list(self._threads)
+            self._threads = []
+        for _ in threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in threads:
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+    def enqueue(self, kind, **params):
+        """Queue a job, or return the identical job that is already pending.
+
+        Args:
+            kind (str): Job kind; must have a handler.
+            **params: Handler arguments.
+
+        Returns:
+            tuple: (Job, created) where created is False for a deduplicated request.
+
+        Raises:
+            ValueError: If the kind is unknown.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.start()
+
+        job = Job(kind, params)
+        with self._lock:
+            existing = self._active.get(job.key)
+            if existing is not None:
+                existing.requests += 1
+                return existing, False
+            self._active[job.key] = job
+            self._jobs[job.id] = job
+            self._trim()
+        self._queue.put(job)
+        logger.info(f"Queued job {job.id}: {kind} {params}")
+        return job, True
+
+    def get(self, job_id):
+        """Look up a job by id, or None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, limit=50):
+        """Most recent jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))[:limit]
+
+    def stats(self):
+        """Counts of jobs by status."""
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts["workers"] = self.workers
+        return counts
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS (lock held)."""
+        finished = len(self._jobs) - len(self._active)
+        if finished <= MAX_FINISHED_JOBS:
+            return
+        for job_id in list(self._jobs):
+            if finished <= MAX_FINISHED_JOBS:
+                break
+            if not self._jobs[job_id].active:
+                del self._jobs[job_id]
+                finished -= 1
+
+    def _run(self):
+        """Worker loop."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            job.status = RUNNING
+            job.started_at = _now()
+            try:
+                job.result = self.handlers[job.kind](**job.params)
+                job.status = SUCCEEDED
+                logger.info(f"Job {job.id} ({job.kind}) succeeded")
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+                logger.error(f"Job {job.id} ({job.kind}) failed: {e}", exc_info=True)
+            finally:
+                job.finished_at = _now()
+                with self._lock:
+                    self._active.pop(job.key, None)
+
+
+def create_refresh_queue(calendar_fetcher, workers=DEFAULT_WORKERS, results_store=None):
+    """Build the admin refresh queue for a fetcher.
+
+    Refreshed results are also indexed into results_store when one is given.
+
+    Job kinds:
+        calendar: year
+        round: year, round
+        results: year, round, session (R, Q, S or SQ)
+    """
+    def refresh_round(year, round):
+        return calendar_fetcher.refresh_round(year, round)
+
+    def refresh_results(year, round, session):
+        payload = fetch_session_results(year, round, session)
+        path = save_session_results(calendar_fetcher.data_dir, payload)
+        if results_store is not None:
+            results_store.import_payload(payload)
+        return {"year": int(year), "round": int(round), "session": session,
+                "results": len(payload['results']), "path": os.path.basename(path)}
+
+    return JobQueue({
+        "calendar": calendar_fetcher.refresh_calendar,
+        "round": refresh_round,
+        "results": refresh_results,
+    }, workers=workers)
+
+
+def admin_authorized(headers, token=None):
+    """Check the admin token sent as "Authorization: Bearer <token>" or X-Admin-Token.
+
+    Args:
+        headers (Mapping): Request headers.
+        token (str, optional): Expected token; defaults to ADMIN_TOKEN.
+
+    Returns:
+        bool: False when no token is configured, so admin routes stay closed by default.
+    """
+    token = token if token is not None else ADMIN_TOKEN
+    if not token:
+        return False
+    provided = headers.get('X-Admin-Token') or headers.get('x-admin-token') or ""
+    authorization = headers.get('Authorization') or headers.get('authorization') or ""
+    if authorization.startswith('Bearer '):
+        provided = authorization[len('Bearer '):]
+    return hmac.compare_digest(provided.encode('utf-8'), token.encode('utf-8'))
+
+
+def parse_refresh_request(params):
+    """Validate an /admin/refresh request into a job kind and parameters.
+
+    Args:
+        params (Mapping): Query string or JSON body. "target" is calendar,
+            round or results; year is required, round for round/results,
+            session (default R) for results.
+
+    Returns:
+        tuple: (kind, params dict)
+
+    Raises:
+        ValueError: If the request is malformed.
+    """
+    kind = (params.get('target') or 'calendar').lower()
+    if kind not in ('calendar', 'round', 'results'):
+        raise ValueError("target must be calendar, round or results")
+    try:
+        year = int(params.get('year'))
+        job_params = {"year": str(year)}
+        if kind in ('round', 'results'):
+            job_params["round"] = int(params.get('round'))
+    except (TypeError, ValueError):
+        raise ValueError("year (and round for round/results refreshes) must be integers")
+    if kind == 'results':
+        session = str(params.get('session') or 'R').upper()
+        if session not in ('R', 'Q', 'S', 'SQ'):
+            raise ValueError("session must be R, Q, S or SQ")
+        job_params["session"] = session
+    return kind, job_params
@@ -0,0 +1,350 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import fastf1
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# Number of session lap frames kept in memory (a race is ~1200 laps, well under 1 MB compact)
+MAX_CACHED_SESSIONS = 16
+
+# Seconds a failed session load is remembered, so repeated requests for a
+# session without laps (or while FastF1 fails) do not each reload it
+FAILED_LOAD_TTL = float(os.environ.get('LAP_FAILED_LOAD_TTL', '60'))
+
+# Failed loads remembered at most (oldest forgotten first)
+MAX_FAILED_LOADS = 256
+
+# Laps slower than this fraction of the driver's median are treated as outliers
+# (safety car, traffic, incidents) when fitting degradation
+PACE_OUTLIER_RATIO = 1.07
+
+# Columns kept from FastF1's Laps frame
+LAP_COLUMNS = ['Driver', 'Team', 'LapNumber', 'LapTime', 'Stint', 'Compound', 'TyreLife',
+               'Time', 'PitInTime', 'PitOutTime', 'IsAccurate']
+
+METRICS = ('fastest-laps', 'stints', 'degradation', 'gaps')
+
+
+def load_session_laps(year, round_number, identifier):
+    """Load one session's laps from FastF1 into a compact frame.
+
+    Only lap timing is loaded (no telemetry, weather or messages). Times are
+    converted to float seconds once here, so every aggregation afterwards
+    is plain NumPy arithmetic.
+
+    Returns:
+        DataFrame: One row per lap.
+    """
+    session = fastf1.get_session(int(year), int(round_number), identifier)
+    session.load(laps=True, telemetry=False, weather=False, messages=False)
+    laps = session.laps
+    if laps is None or laps.empty:
+        raise ValueError(f"No lap data available for {year} round {round_number} {identifier}")
+    frame = compact_laps(laps)
+    # Lets the cache manager attribute the session's cache directory to this load
+    frame.attrs['api_path'] = getattr(session, 'api_path', None)
+    return frame
+
+
+def compact_laps(laps):
+    """Reduce a FastF1 Laps frame to the columns and dtypes the analytics use."""
+    frame = pd.DataFrame(laps[[column for column in LAP_COLUMNS if column in laps.columns]])
+    for column in ('LapTime', 'Time'):
+        frame[column] = frame[column].dt.total_seconds()
+    frame['PitLap'] = frame['PitInTime'].notna() | frame['PitOutTime'].notna()
+    frame = frame.drop(columns=['PitInTime', 'PitOutTime'])
+    frame['Stint'] = frame['Stint'].fillna(0).astype(int)
+    frame['LapNumber'] = frame['LapNumber'].astype(int)
+    if 'IsAccurate' not in frame:
+        frame['IsAccurate'] = True
+    frame['IsAccurate'] = frame['IsAccurate'].fillna(False).astype(bool)
+    return frame.reset_index(drop=True)
+
+
+def _records(frame):
+    """DataFrame rows as dicts with NaN replaced by None and seconds rounded."""
+    frame = frame.round(3).astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient='records')
+
+
+def fastest_laps(frame):
+    """Each driver's fastest lap, quickest first."""
+    timed = frame[frame['LapTime'].notna()]
+    best = timed.loc[timed.groupby('Driver')['LapTime'].idxmin()]
+    best = best.sort_values('LapTime')
+    best = best.assign(GapToFastest=best['LapTime'] - best['LapTime'].min())
+    return _records(best[['Driver', 'Team', 'LapNumber', 'LapTime', 'GapToFastest', 'Compound', 'TyreLife']])
+
+
+def stint_summaries(frame):
+    """Per-driver stints: compound, lap range, lap count, mean and best pace."""
+    grouped = frame.groupby(['Driver', 'Stint'], sort=True)
+    stints = grouped.agg(
+        Compound=('Compound', 'first'),
+        StartLap=('LapNumber', 'min'),
+        EndLap=('LapNumber', 'max'),
+        Laps=('LapNumber', 'size'),
+        MeanLapTime=('LapTime', 'mean'),
+        BestLapTime=('LapTime', 'min'),
+    ).reset_index()
+    return _records(stints)
+
+
+def _clean_laps(frame):
+    """Representative racing laps: accurate, not in/out laps, not lap 1, no pace outliers."""
+    laps = frame[frame['IsAccurate'] & ~frame['PitLap'] & (frame['LapNumber'] > 1)
+                 & frame['LapTime'].notna() & frame['TyreLife'].notna()]
+    median = laps.groupby('Driver')['LapTime'].transform('median')
+    return laps[laps['LapTime'] <= median * PACE_OUTLIER_RATIO]
+
+
+def degradation(frame):
+    """Tyre degradation per stint: least-squares slope of lap time over tyre age.
+
+    The slope of each (driver, stint) group is computed from grouped sums
+    (n, sum x, sum y, sum xy, sum x^2) in one pass instead of fitting every
+    stint separately.
+
+    Returns:
+        list: One dict per stint with the slope in seconds per lap.
+    """
+    laps = _clean_laps(frame)
+    x = laps['TyreLife'].astype(float)
+    y = laps['LapTime']
+    sums = pd.DataFrame({
+        'Driver': laps['Driver'], 'Stint': laps['Stint'], 'Compound': laps['Compound'],
+        'x': x, 'y': y, 'xy': x * y, 'xx': x * x,
+    }).groupby(['Driver', 'Stint']).agg(
+        Compound=('Compound', 'first'), n=('x', 'size'),
+        x=('x', 'sum'), y=('y', 'sum'), xy=('xy', 'sum'), xx=('xx', 'sum'))
+
+    denominator = sums['n'] * sums['xx'] - sums['x'] ** 2
+    slope = (sums['n'] * sums['xy'] - sums['x'] * sums['y']) / denominator.replace(0, np.nan)
+    result = pd.DataFrame({
+        'Compound': sums['Compound'],
+        'Laps': sums['n'],
+        'DegradationPerLap': slope,
+        'Intercept': (sums['y'] - slope * sums['x']) / sums['n'],
+    }).reset_index()
+    # A slope needs at least three laps to mean anything
+    result = result[result['Laps'] >= 3]
+    return _records(result)
+
+
+def gap_to_leader(frame):
+    """Gap to the leader at the end of every lap, per driver.
+
+    Returns:
+        dict: Driver -> list of [lap number, gap in seconds].
+    """
+    timed = frame[frame['Time'].notna()][['Driver', 'LapNumber', 'Time']]
+    gaps = timed.assign(Gap=timed['Time'] - timed.groupby('LapNumber')['Time'].transform('min'))
+    gaps = gaps.sort_values(['Driver', 'LapNumber'])
+    result = {}
+    for driver, laps in gaps.groupby('Driver', sort=True):
+        result[driver] = np.column_stack((laps['LapNumber'].to_numpy(), laps['Gap'].round(3).to_numpy())).tolist()
+        for row in result[driver]:
+            row[0] = int(row[0])
+    return result
+
+
+AGGREGATES = {
+    'fastest-laps': fastest_laps,
+    'stints': stint_summaries,
+    'degradation': degradation,
+    'gaps': gap_to_leader,
+}
+
+
+class LapAnalytics:
+    """Lap frames cached per session, with aggregates memoized per session version.
+
+    A session's version is bumped whenever its laps are (re)loaded, so
+    memoized aggregates are never served for a stale frame. Loads go
+    through a circuit breaker, failed loads are remembered for
+    failed_load_ttl seconds, and the cache quota is enforced by a
+    background job rather than by the request that loaded the session.
+    """
+
+    def __init__(self, loader=load_session_laps, max_sessions=MAX_CACHED_SESSIONS, cache_manager=None,
+                 breaker=None, failed_load_ttl=FAILED_LOAD_TTL, clock=time.time):
+        """Initialize the cache.
+
+        Args:
+            loader (callable): (year, round, identifier) -> compact laps frame.
+            max_sessions (int): Number of session frames kept (LRU).
+            cache_manager (CacheManager, optional): Told about every session
+                load so the FastF1 cache stays under its quota.
+            breaker (CircuitBreaker, optional): Guards FastF1 loads; pass the
+                calendar fetcher's upstream breaker to share its state.
+            failed_load_ttl (float): Seconds a failed load is remembered.
+            clock (callable): Returns the current epoch time.
+        """
+        self.loader = loader
+        self.cache_manager = cache_manager
+        self.max_sessions = max_sessions
+        self.breaker = breaker or CircuitBreaker("fastf1-laps")
+        self.failed_load_ttl = failed_load_ttl
+        self.clock = clock
+        self._frames = OrderedDict()
+        self._aggregates = {}
+        self._versions = {}
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        # A burst of loads folds into one pending enforcement (see JobQueue)
+        self.maintenance = JobQueue({"enforce_cache": self._enforce_cache}, workers=1)
+
+    @contextmanager
+    def _session_lock(self, key):
+        """Hold the load lock of a session; it is dropped once nobody holds or waits for it."""
+        with self._lock:
+            entry = self._load_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._load_locks[key]
+
+    def _recent_failure(self, key):
+        """Raise the remembered failure of a session if it has not expired (lock held)."""
+        failure = self._failures.get(key)
+        if failure is None:
+            return
+        expires_at, missing, message = failure
+        if self.clock() >= expires_at:
+            del self._failures[key]
+            return
+        if missing:
+            raise ValueError(message)
+        raise RuntimeError(f"Loading laps for {key} failed recently: {message}")
+
+    def _load(self, key):
+        """Call the loader, returning (frame, None) or (None, ValueError) for a session without laps.
+
+        A session without laps is a valid answer from FastF1, so it is
+        returned rather than raised and does not count against the breaker.
+        """
+        try:
+            return self.loader(*key), None
+        except ValueError as e:
+            return None, e
+
+    def _enforce_cache(self):
+        """Background job: evict cached sessions until the FastF1 cache fits its quota."""
+        return {"evicted": len(self.cache_manager.enforce())}
+
+    def get_frame(self, year, round_number, identifier='R', reload=False):
+        """Return (version, laps frame) for a session, loading it on first use.
+
+        Raises:
+            ValueError: If the session has no laps (remembered for failed_load_ttl).
+            CircuitOpenError: If FastF1 loads are failing and the breaker is open.
+        """
+        key = (int(year), int(round_number), identifier)
+        if not reload:
+            with self._lock:
+                entry = self._frames.get(key)
+                if entry is not None:
+                    self._frames.move_to_end(key)
+                    return entry
+                self._recent_failure(key)
+
+        # One load per session at a time; other requests wait for it
+        with self._session_lock(key):
+            if not reload:
+                with self._lock:
+                    entry = self._frames.get(key)
+                    if entry is None:
+                        self._recent_failure(key)
+                if entry is not None:
+                    return entry
+            try:
+                frame, missing = self.breaker.call(self._load, key)
+            except CircuitOpenError:
+                # The breaker already answers fast until its retry time
+                raise
+            except Exception as e:
+                self._remember_failure(key, False, str(e))
+                raise
+            if missing is not None:
+                self._remember_failure(key, True, str(missing))
+                raise missing
+            with self._lock:
+                self._failures.pop(key, None)
+                version = self._versions.get(key, 0) + 1
+                self._versions[key] = version
+                # Aggregates of the previous version can no longer be served
+                self._aggregates = {k: v for k, v in self._aggregates.items() if k[0] != key}
+                entry = (version, frame)
+                self._frames[key] = entry
+                self._frames.move_to_end(key)
+                while len(self._frames) > self.max_sessions:
+                    evicted, _ = self._frames.popitem(last=False)
+                    self._aggregates = {k: v for k, v in self._aggregates.items() if k[0] != evicted}
+            logger.info(f"Loaded {len(frame)} laps for {key} (version {version})")
+            if self.cache_manager is not None:
+                if frame.attrs.get('api_path'):
+                    self.cache_manager.touch(frame.attrs['api_path'])
+                self.maintenance.enqueue("enforce_cache")
+            return entry
+
+    def _remember_failure(self, key, missing, message):
+        """Remember a failed load for failed_load_ttl seconds."""
+        with self._lock:
+            self._failures[key] = (self.clock() + self.failed_load_ttl, missing, message)
+            self._failures.move_to_end(key)
+            while len(self._failures) > MAX_FAILED_LOADS:
+                self._failures.popitem(last=False)
+        logger.warning(f"Could not load laps for {key}: {message}")
+
+    def aggregate(self, metric, year, round_number, identifier='R'):
+        """Compute (or return the memoized) aggregate for a session.
+
+        Args:
+            metric (str): One of METRICS.
+            year (int): Season.
+            round_number (int): Round.
+            identifier (str): Session identifier (R, Q, S, SQ, FP1...).
+
+        Returns:
+            dict: Session key, version and the aggregate data.
+
+        Raises:
+            ValueError: If the metric is unknown or the session has no laps.
+        """
+        if metric not in AGGREGATES:
+            raise ValueError(f"Unknown metric: {metric}. Expected one of {', '.join(METRICS)}")
+        identifier = identifier.upper()
+        key = (int(year), int(round_number), identifier)
+        version, frame = self.get_frame(*key)
+
+        memo_key = (key, version, metric)
+        with self._lock:
+            data = self._aggregates.get(memo_key)
+        if data is None:
+            data = AGGREGATES[metric](frame)
+            with self._lock:
+                self._aggregates[memo_key] = data
+        return {
+            "year": key[0],
+            "round": key[1],
+            "session": identifier,
+            "version": version,
+            "metric": metric,
+            "data": data
+        }
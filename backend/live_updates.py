@@ -0,0 +1,236 @@
+import json
+import queue
+import logging
+import threading
+
+from race_calendar_fetcher import DEFAULT_YEAR
+
+logger = logging.getLogger(__name__)
+
+# How long a subscriber may stay silent before we send a keep-alive comment
+KEEPALIVE_INTERVAL = 15
+
+# Maximum number of undelivered events buffered per subscriber
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class LiveStatusBroadcaster:
+    """Push race status changes to connected dashboards over Server-Sent Events.
+
+    The fetcher's session scheduler is the single server-side timer: every
+    time it applies a boundary (or a season is reloaded) the broadcaster
+    compares the precomputed state and fans out a diff to every subscriber
+    only when something changed: a race status flipped, the next race
+    changed, or a session started (went live) or ended.
+    """
+
+    def __init__(self, calendar_fetcher, year=DEFAULT_YEAR):
+        """Initialize the broadcaster.
+
+        Args:
+            calendar_fetcher (RaceCalendarFetcher): Source of calendar data.
+            year (int): Season to watch.
+        """
+        self.calendar_fetcher = calendar_fetcher
+        self.year = year
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._state = None
+        self._event_id = 0
+        self._attached = False
+
+    def start(self):
+        """Attach to the scheduler so boundaries trigger checks."""
+        with self._lock:
+            if self._attached:
+                return
+            self._attached = True
+        self.calendar_fetcher.scheduler.add_listener(self._on_scheduler_change)
+        logger.info("Live status broadcaster attached to session scheduler")
+
+    def stop(self):
+        """Disconnect all subscribers."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscriber in subscribers:
+            self._close_subscriber(subscriber)
+
+    def subscribe(self):
+        """Register a new subscriber.
+
+        Returns:
+            queue.Queue: Queue that receives (event_id, event_type, data) tuples.
+        """
+        # Make sure we have a baseline before the first client connects
+        if self._state is None:
+            self.check()
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            count = len(self._subscribers)
+        logger.info(f"Live status subscriber connected ({count} active)")
+        self.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a subscriber."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            count = len(self._subscribers)
+        logger.info(f"Live status subscriber disconnected ({count} active)")
+
+    def subscriber_count(self):
+        """Return the number of connected subscribers."""
+        with self._lock:
+            return len(self._subscribers)
+
+    def stream(self, subscriber):
+        """Yield Server-Sent Events for a subscriber.
+
+        The first event is a full snapshot so the client has a baseline;
+        after that only diffs are sent.
+
+        Args:
+            subscriber (queue.Queue): Queue returned by subscribe().
+
+        Yields:
+            str: SSE formatted chunks.
+        """
+        try:
+            yield self._format_event(self._event_id, "snapshot", self._public_state(self._state))
+            while True:
+                try:
+                    item = subscriber.get(timeout=KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    # Subscriber was dropped; the client will reconnect and resync
+                    break
+                event_id, event_type, data = item
+                yield self._format_event(event_id, event_type, data)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def check(self):
+        """Re-read the precomputed state and publish a diff if anything changed.
+
+        Returns:
+            dict: The published diff, or None if nothing changed.
+        """
+        try:
+            new_state = self._snapshot()
+        except Exception as e:
+            logger.error(f"Error building live status snapshot: {e}", exc_info=True)
+            return None
+
+        old_state = self._state
+        self._state = new_state
+        if old_state is None:
+            return None
+
+        diff = self._diff(old_state, new_state)
+        if diff:
+            self._publish("update", diff)
+        return diff
+
+    def _on_scheduler_change(self, year, reason):
+        """Scheduler listener: only the watched season matters."""
+        if str(year) == str(self.year):
+            self.check()
+
+    def _snapshot(self):
+        """Build the comparable state for the watched season."""
+        calendar_data = self.calendar_fetcher.get_calendar(str(self.year)) or {}
+
+        statuses = {}
+        started_sessions = set()
+        ended_sessions = set()
+        for race in calendar_data.get('races', []):
+            round_number = race.get('round')
+            statuses[round_number] = race.get('status')
+            for session_key, session_status in (race.get('session_status') or {}).items():
+                if session_status in ("live", "completed"):
+                    started_sessions.add((round_number, session_key))
+                if session_status == "completed":
+                    ended_sessions.add((round_number, session_key))
+
+        next_race = self.calendar_fetcher.get_next_race(self.year)
+        return {
+            "statuses": statuses,
+            "started_sessions": started_sessions,
+            "ended_sessions": ended_sessions,
+            "next_race": next_race,
+        }
+
+    def _diff(self, old_state, new_state):
+        """Compute the changes between two snapshots."""
+        diff = {}
+
+        changed_races = [
+            {"round": round_number, "status": status, "previous_status": old_state["statuses"].get(round_number)}
+            for round_number, status in new_state["statuses"].items()
+            if old_state["statuses"].get(round_number) != status
+        ]
+        if changed_races:
+            diff["races"] = changed_races
+
+        for name, label in (("started_sessions", "sessions_started"), ("ended_sessions", "sessions_ended")):
+            new_sessions = new_state[name] - old_state[name]
+            if new_sessions:
+                diff[label] = [
+                    {"round": round_number, "session": session_key}
+                    for round_number, session_key in sorted(new_sessions, key=lambda s: (s[0] is None, s[0] or 0, s[1]))
+                ]
+
+        old_next = old_state["next_race"] or {}
+        new_next = new_state["next_race"] or {}
+        if (old_next.get('round'), old_next.get('date')) != (new_next.get('round'), new_next.get('date')):
+            diff["next_race"] = new_state["next_race"]
+
+        return diff
+
+    def _publish(self, event_type, data):
+        """Fan an event out to every subscriber."""
+        with self._lock:
+            self._event_id += 1
+            event = (self._event_id, event_type, data)
+            subscribers = list(self._subscribers)
+
+        logger.info(f"Publishing live {event_type} event {event[0]} to {len(subscribers)} subscribers")
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Slow consumer: drop it rather than buffer without bound
+                logger.warning("Dropping slow live status subscriber")
+                with self._lock:
+                    self._subscribers.discard(subscriber)
+                self._close_subscriber(subscriber)
+
+    def _close_subscriber(self, subscriber):
+        """Wake a subscriber's stream so it terminates."""
+        while True:
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                break
+        subscriber.put_nowait(None)
+
+    def _public_state(self, state):
+        """Convert internal state into a JSON-friendly snapshot."""
+        if state is None:
+            return {"races": [], "next_race": None}
+        return {
+            "races": [
+                {"round": round_number, "status": status}
+                for round_number, status in state["statuses"].items()
+            ],
+            "next_race": state["next_race"],
+        }
+
+    @staticmethod
+    def _format_event(event_id, event_type, data):
+        """Format a single Server-Sent Event."""
+        return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,276 @@
+import os
+import sys
+import time
+import uuid
+import marshal
+import logging
+import datetime
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Off unless PROFILING_ENABLED is set; disabled, a request costs one attribute check
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+
+# Requests slower than this keep their profile
+THRESHOLD_MS = float(os.environ.get('PROFILING_THRESHOLD_MS', '250'))
+
+# Stack sampling interval
+INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', '5'))
+
+# Slow-request profiles kept (most recent first out)
+BUFFER_SIZE = int(os.environ.get('PROFILING_BUFFER', '20'))
+
+# Samples kept per request (a request running for minutes stops growing here)
+MAX_SAMPLES = 20000
+
+EXPORT_FORMATS = ('speedscope', 'pstats')
+
+
+class RequestProfile:
+    """Stack samples of one slow request.
+
+    Each sample is a tuple of (file, first line, function) frames from the
+    outermost call to the innermost, taken every interval_ms while the
+    request ran.
+    """
+
+    __slots__ = ('id', 'label', 'started_at', 'duration_ms', 'status', 'interval_ms', 'samples')
+
+    def __init__(self, label, started_at, duration_ms, status, interval_ms, samples):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = started_at
+        self.duration_ms = duration_ms
+        self.status = status
+        self.interval_ms = interval_ms
+        self.samples = samples
+
+    def summary(self, top=10):
+        """Metadata plus the functions that were on-CPU (innermost) most often."""
+        counts = {}
+        for stack in self.samples:
+            if stack:
+                counts[stack[-1]] = counts.get(stack[-1], 0) + 1
+        hottest = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": datetime.datetime.fromtimestamp(self.started_at, datetime.timezone.utc).isoformat(),
+            "duration_ms": round(self.duration_ms, 2),
+            "status": self.status,
+            "samples": len(self.samples),
+            "interval_ms": self.interval_ms,
+            "top_frames": [
+                {"function": name, "file": filename, "line": line, "samples": count}
+                for (filename, line, name), count in hottest
+            ]
+        }
+
+    def to_speedscope(self):
+        """The samples as a speedscope "sampled" profile (https://www.speedscope.app)."""
+        frames, positions = [], {}
+        samples = []
+        for stack in self.samples:
+            indexes = []
+            for frame in stack:
+                position = positions.get(frame)
+                if position is None:
+                    position = positions[frame] = len(frames)
+                    frames.append({"name": frame[2], "file": frame[0], "line": frame[1]})
+                indexes.append(position)
+            samples.append(indexes)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.label,
+            "exporter": "f1-dashboard profiling",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.label} ({self.duration_ms:.0f} ms)",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": self.interval_ms * len(samples),
+                "samples": samples,
+                "weights": [self.interval_ms] * len(samples)
+            }]
+        }
+
+    def to_pstats(self):
+        """The samples as a marshalled pstats file (load with pstats.Stats(path)).
+
+        Times are estimated from sample counts: a function's own time is
+        the samples it was innermost in, its cumulative time the samples it
+        appeared in, and its call count the number of those samples.
+        """
+        weight = self.interval_ms / 1000
+        stats = {}
+        for stack in self.samples:
+            seen = set()
+            for depth, frame in enumerate(stack):
+                entry = stats.setdefault(frame, [0, 0, 0.0, 0.0, {}])
+                innermost = depth == len(stack) - 1
+                if innermost:
+                    entry[2] += weight
+                if frame in seen:
+                    continue
+                seen.add(frame)
+                entry[0] += 1
+                entry[1] += 1
+                entry[3] += weight
+                if depth:
+                    caller = entry[4].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                    caller[0] += 1
+                    caller[1] += 1
+                    caller[2] += weight if innermost else 0.0
+                    caller[3] += weight
+        return marshal.dumps({
+            frame: (cc, nc, tt, ct, {caller: tuple(values) for caller, values in callers.items()})
+            for frame, (cc, nc, tt, ct, callers) in stats.items()
+        })
+
+
+class SlowRequestProfiler:
+    """Samples the stacks of in-flight requests and keeps the slow ones.
+
+    A single daemon thread wakes every interval, reads the current frame of
+    every thread that is serving a request (sys._current_frames) and
+    appends the stack to that request's samples. Requests that finish
+    under the threshold are dropped; slower ones go into a ring buffer of
+    the most recent BUFFER_SIZE profiles. Sampling never runs inside the
+    request threads, so the per-request cost is registering and
+    unregistering a thread id.
+
+    Only OS threads are visible to the sampler: gthread and sync workers
+    and the Netlify handler are covered, gevent greenlets are not.
+    """
+
+    def __init__(self, enabled=PROFILING_ENABLED, threshold_ms=THRESHOLD_MS,
+                 interval_ms=INTERVAL_MS, capacity=BUFFER_SIZE, clock=time.time):
+        """Initialize the profiler.
+
+        Args:
+            enabled (bool): Profile requests at all.
+            threshold_ms (float): Keep profiles of requests at least this slow.
+            interval_ms (float): Time between stack samples.
+            capacity (int): Profiles kept in the ring buffer.
+            clock (callable): Returns the current epoch.
+        """
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.clock = clock
+        self._profiles = deque(maxlen=max(1, capacity))
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._counters = {"profiled": 0, "kept": 0}
+
+    def start_request(self, label):
+        """Begin sampling the calling thread.
+
+        Returns:
+            tuple: Token for finish_request, or None when profiling is disabled.
+        """
+        if not self.enabled:
+            return None
+        self._ensure_sampler()
+        thread_id = threading.get_ident()
+        samples = []
+        with self._lock:
+            self._active[thread_id] = samples
+        return (thread_id, label, self.clock(), time.perf_counter(), samples)
+
+    def finish_request(self, token, status=None):
+        """Stop sampling and keep the profile if the request was slow.
+
+        Returns:
+            RequestProfile: The stored profile, or None.
+        """
+        if token is None:
+            return None
+        thread_id, label, started_at, started, samples = token
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            if self._active.get(thread_id) is samples:
+                del self._active[thread_id]
+            self._counters["profiled"] += 1
+            if duration_ms < self.threshold_ms:
+                return None
+            profile = RequestProfile(label, started_at, duration_ms, status, self.interval_ms, list(samples))
+            self._profiles.appendleft(profile)
+            self._counters["kept"] += 1
+        logger.warning(f"Slow request {label}: {duration_ms:.0f} ms, {len(profile.samples)} samples "
+                       f"(profile {profile.id})")
+        return profile
+
+    def profiles(self):
+        """Summaries of the stored profiles, most recent first."""
+        with self._lock:
+            profiles = list(self._profiles)
+        return [profile.summary() for profile in profiles]
+
+    def get(self, profile_id):
+        """A stored profile by id, or None."""
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def metrics(self):
+        """Settings and counters for admin and metrics endpoints."""
+        with self._lock:
+            return dict(self._counters, enabled=self.enabled, threshold_ms=self.threshold_ms,
+                        interval_ms=self.interval_ms, stored=len(self._profiles),
+                        capacity=self._profiles.maxlen, in_flight=len(self._active))
+
+    def export(self, profile, fmt):
+        """Serialize a profile for download.
+
+        Args:
+            profile (RequestProfile): The profile.
+            fmt (str): "speedscope" or "pstats".
+
+        Returns:
+            tuple: (body, mimetype, filename)
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if fmt == 'speedscope':
+            from serialization import dumps
+            return dumps(profile.to_speedscope()), 'application/json', f"profile-{profile.id}.speedscope.json"
+        if fmt == 'pstats':
+            return profile.to_pstats(), 'application/octet-stream', f"profile-{profile.id}.pstats"
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+
+    def _ensure_sampler(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+            self._thread.start()
+        logger.info(f"Request profiler sampling every {self.interval_ms} ms "
+                    f"(keeping requests over {self.threshold_ms} ms)")
+
+    def _sample_loop(self):
+        interval = self.interval_ms / 1000
+        while self.enabled:
+            time.sleep(interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                active = list(self._active.items())
+            frames = sys._current_frames()
+            for thread_id, samples in active:
+                frame = frames.get(thread_id)
+                if frame is None or len(samples) >= MAX_SAMPLES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                samples.append(tuple(stack))
@@ -1,11 +1,28 @@
 import os
-import json
+import time
+import bisect
+import hashlib
 import datetime
 import logging
+import threading
+from collections import OrderedDict
 import pandas as pd
 import fastf1
 from fastf1 import events
 
+from circuit_breaker import CircuitBreaker
+from degradation import DegradationPolicy, Freshness, FRESH
+from calendar_archive import ARCHIVE_FILE, CalendarArchive
+from clock import create_clock, utc_datetime
+from calendar_index import CalendarIndex, paginate, project
+from ics_export import FeedCache, render_feed
+from job_queue import JobQueue
+from circuits import LocalizedCalendarCache, enrich_calendar, enrich_race, get_circuit_table, get_timezone, localize_race
+from race_model import SeasonCalendar
+from schedule_diff import ChangeLog, diff_seasons, merge_season
+from serialization import encode, read_json_file, write_json_file, CALENDAR_SCHEMA
+from session_scheduler import SessionScheduler, evaluate_season, status_boundaries
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,19 +30,126 @@ logger = logging.getLogger(__name__)
 # Default year for calendar
 DEFAULT_YEAR = 2025
 
+# Seasons evaluated at other instants (?at=), one per (year, status window)
+SNAPSHOT_CACHE_SIZE = 64
+
+# Schedule columns that feed process_calendar; a refresh whose fingerprint over
+# them is unchanged skips processing, saving and cache invalidation
+FINGERPRINT_COLUMNS = (
+    'RoundNumber', 'Country', 'Location', 'EventName', 'OfficialEventName', 'EventDate', 'EventFormat',
+    'Session1', 'Session2', 'Session3', 'Session4', 'Session5',
+    'Session1Date', 'Session2Date', 'Session3Date', 'Session4Date', 'Session5Date',
+    'Session1DateUtc', 'Session2DateUtc', 'Session3DateUtc', 'Session4DateUtc', 'Session5DateUtc',
+)
+
+# Bump when process_calendar's output changes for the same input, so stored fingerprints stop matching
+FINGERPRINT_VERSION = 1
+
 # Configure FastF1 cache
 cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
 os.makedirs(cache_dir, exist_ok=True)
 fastf1.Cache.enable_cache(cache_dir)
 
+def determine_race_status(race_date, now):
+    """Classify a race as completed, current or future relative to now.
+    
+    Args:
+        race_date (datetime): The race start time. Naive values are treated as UTC.
+        now (datetime): Timezone-aware reference time.
+        
+    Returns:
+        str: One of "completed", "current" or "future".
+    """
+    if race_date is None:
+        return "future"
+    
+    # Ensure race_date is timezone-aware
+    if race_date.tzinfo is None:
+        # Convert naive datetime to UTC
+        race_date = race_date.replace(tzinfo=datetime.timezone.utc)
+    
+    if race_date < now:
+        return "completed"
+    elif race_date.astimezone(datetime.timezone.utc).date() == now.astimezone(datetime.timezone.utc).date():
+        return "current"
+    return "future"
+
+def schedule_fingerprint(schedule):
+    """Hash the columns of a FastF1 schedule that process_calendar reads.
+    
+    Args:
+        schedule (DataFrame): The raw schedule from fastf1.get_event_schedule.
+        
+    Returns:
+        str: Hex digest, or None if the schedule is not a DataFrame.
+    """
+    if not isinstance(schedule, pd.DataFrame):
+        return None
+    columns = [column for column in FINGERPRINT_COLUMNS if column in schedule.columns]
+    digest = hashlib.sha256(f"v{FINGERPRINT_VERSION}:{','.join(columns)}".encode('utf-8'))
+    for column in columns:
+        digest.update(pd.util.hash_pandas_object(schedule[column], index=False).values.tobytes())
+    return digest.hexdigest()
+
+def _age_seconds(timestamp, now=None):
+    """Whole seconds since an ISO 8601 timestamp (naive means UTC), or None if unparseable."""
+    if not timestamp:
+        return None
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    try:
+        updated = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if updated.tzinfo is None:
+        updated = updated.replace(tzinfo=datetime.timezone.utc)
+    return round((now - updated).total_seconds())
+
 class RaceCalendarFetcher:
     """Class to fetch and process F1 race calendar data"""
     
-    def __init__(self, data_dir="data", cache_dir="cache"):
-        """Initialize with the directory for storing data"""
+    def __init__(self, data_dir="data", cache_dir="cache", clock=None):
+        """Initialize with the directory for storing data.
+        
+        Args:
+            data_dir (str): Directory for calendar files.
+            cache_dir (str): FastF1 cache directory.
+            clock (callable, optional): Returns the current epoch; statuses,
+                the next race and demo mode all follow it. Defaults to the
+                wall clock, or the CLOCK_AT time-travel clock when set.
+        """
+        self.clock = clock or create_clock()
         self.data_dir = data_dir
+        # The season served by default; never switched, other seasons are passed explicitly
         self.year = DEFAULT_YEAR
-        self.calendar_file = os.path.join(self.data_dir, f'f1_calendar_{self.year}.json')
+        self.calendar_file = self._calendar_file(self.year)
+        # Finished seasons, decompressed one at a time on first request and never refreshed
+        self.archive = CalendarArchive(os.path.join(self.data_dir, ARCHIVE_FILE))
+        self._archived = set()
+        
+        # In-memory SeasonCalendar models keyed by year; statuses are kept current by the scheduler
+        self._calendars = {}
+        self._calendars_lock = threading.Lock()
+        self._indexes = {}
+        self._change_logs = {}
+        self._localized = LocalizedCalendarCache()
+        self._feeds = FeedCache()
+        self._boundaries = {}
+        self._snapshots = OrderedDict()
+        self._snapshots_lock = threading.Lock()
+        # Serializes upstream refreshes
+        self._refresh_lock = threading.RLock()
+        # Upstream schedule calls stop for a while after repeated failures
+        self.upstream = CircuitBreaker("fastf1")
+        # After a failed refresh, seasons are served stale and retried in the background with backoff
+        self.degradation = DegradationPolicy(self.upstream)
+        # Outcome of the latest upstream refresh per year, for readiness reports
+        self._last_refresh = {}
+        # Fingerprint of the schedule each stored calendar was built from
+        self._fingerprints = {}
+        self._refresh_decisions = {"skipped": 0, "unchanged": 0, "changed": 0, "stored": 0, "failed": 0}
+        self.scheduler = SessionScheduler(clock=self.clock)
+        # Seasons a multi-season query found missing, fetched one at a time in the background
+        self.backfill = JobQueue({"calendar": self._backfill_season}, workers=1)
         
         # Create data directory if it doesn't exist
         if not os.path.exists(data_dir):
@@ -39,87 +163,790 @@ class RaceCalendarFetcher:
         except Exception as e:
             logger.warning(f"Failed to enable FastF1 cache: {e}")
 
-    def get_calendar(self, year=DEFAULT_YEAR):
+    def get_calendar(self, year=DEFAULT_YEAR, at=None):
         """Get the F1 calendar for the specific year.
         
         Args:
             year (str): The year to fetch the calendar for.
+            at (float, optional): Report statuses as of this epoch instead of now.
             
         Returns:
             dict: Calendar data including race schedule.
         """
-        # Update the year if changed
-        if str(year) != str(self.year):
-            self.year = str(year)
-            self.calendar_file = os.path.join(self.data_dir, f'f1_calendar_{self.year}.json')
+        if at is not None:
+            snapshot = self._snapshot(year, at)
+            return snapshot["season"].to_dict() if snapshot else self.get_calendar(year)
+        
+        # Serve from memory when the scheduler is already tracking this year
+        season = self._calendars.get(str(year))
+        if season is not None:
+            return season.to_dict()
+        
+        # Archived seasons are final: load once and keep them in memory for good
+        if self.is_archived(year):
+            return self._load_archived(year)
+        
+        year = str(year)
+        calendar_file = self._calendar_file(year)
         
         # Check if we have cached data
-        if os.path.exists(self.calendar_file):
+        if os.path.exists(calendar_file):
             try:
-                with open(self.calendar_file, 'r') as f:
-                    calendar_data = json.load(f)
-                logger.info(f"Loaded cached calendar data for {self.year}")
-                return calendar_data
+                calendar_data = read_json_file(calendar_file)
+                logger.info(f"Loaded cached calendar data for {year}")
+                return self._remember_calendar(year, calendar_data)
             except Exception as e:
                 logger.error(f"Error loading cached data: {str(e)}")
         
-        # If no cached data or error loading it, fetch fresh data
-        return self.fetch_f1_calendar(force_refresh=True)
+        # Nothing stored: fetch inline only while upstream is healthy; otherwise a
+        # background retry (at most one per backoff period) fetches it
+        if not self.degradation.healthy(year):
+            self.schedule_retry(year)
+            return self._unavailable(year, f"Calendar for {year} is unavailable while upstream is failing")
+        return self.fetch_f1_calendar(year, force_refresh=True)
+    
+    def get_encoded_calendar(self, year=DEFAULT_YEAR, at=None):
+        """Get a season as compact JSON bytes, encoded once per season version.
+        
+        Args:
+            year (str): The season year.
+            at (float, optional): Report statuses as of this epoch instead of now.
+            
+        Returns:
+            bytes: The encoded calendar (or calendar error payload).
+        """
+        calendar_data = self.get_calendar(year, at=at)
+        season = self._snapshot(year, at)["season"] if at is not None else self._calendars.get(str(year))
+        if season is None or not calendar_data or 'error' in calendar_data:
+            return encode(calendar_data, CALENDAR_SCHEMA)
+        return season.encoded()
+    
+    def is_archived(self, year):
+        """Whether a season is in the archive (and therefore immutable)."""
+        if str(year) in self._archived:
+            return True
+        try:
+            return str(year) in self.archive
+        except Exception as e:
+            logger.error(f"Error reading calendar archive: {e}")
+            return False
+    
+    def _load_archived(self, year):
+        """Decompress an archived season into memory."""
+        try:
+            calendar_data = self.archive.read(year)
+        except Exception as e:
+            logger.error(f"Error reading archived season {year}: {e}")
+            return {"year": str(year), "races": [], "error": f"Archived season {year} is unreadable"}
+        logger.info(f"Loaded archived calendar for {year}")
+        self._archived.add(str(year))
+        return self._remember_calendar(year, calendar_data)
+    
+    def _unavailable(self, year, error):
+        """The empty calendar returned when nothing can be served, with a retry hint."""
+        return {"year": str(year), "races": [], "error": error, "retry_after": self.degradation.retry_after(year)}
+    
+    def freshness(self, year=DEFAULT_YEAR):
+        """How current the served calendar for a year is.
+        
+        Only in-memory state is read. When the season is degraded, this
+        also starts its background retry if the backoff has passed, so
+        traffic keeps recovery going without ever waiting on upstream.
+        
+        Args:
+            year (str): The season year.
+            
+        Returns:
+            Freshness: fresh, stale (last known good) or unavailable, with
+            the data age and a Retry-After hint.
+        """
+        season = self._calendars.get(str(year))
+        if season is not None and str(year) in self._archived:
+            # Final seasons do not depend on upstream at all
+            return Freshness(FRESH)
+        last_success = self.degradation.last_success(year)
+        if last_success is not None:
+            age = time.time() - last_success
+        else:
+            age = _age_seconds(season.last_updated) if season is not None else None
+        freshness = self.degradation.assess(year, season is not None and bool(season.races), age)
+        if freshness.tier != FRESH:
+            self.schedule_retry(year)
+        return freshness
+    
+    def schedule_retry(self, year):
+        """Refresh a degraded season on a background thread if its retry is due.
+        
+        Returns:
+            bool: True if a retry was started.
+        """
+        if not self.degradation.claim_retry(year):
+            return False
+        
+        def retry():
+            try:
+                self.refresh_calendar(year)
+            except Exception as e:
+                logger.warning(f"Background refresh of {year} failed: {e}")
+            finally:
+                self.degradation.release_retry(year)
+        
+        logger.info(f"Retrying refresh of {year} in the background")
+        threading.Thread(target=retry, name=f"calendar-retry-{year}", daemon=True).start()
+        return True
+    
+    def _remember_calendar(self, year, calendar_data):
+        """Keep a calendar in memory and hand its boundaries to the scheduler.
+        
+        Args:
+            year (str): The season year.
+            calendar_data (dict): The calendar to remember.
+            
+        Returns:
+            dict: The calendar serialized from the in-memory model, with
+            statuses brought up to date.
+        """
+        if not calendar_data or 'error' in calendar_data:
+            return calendar_data
+        
+        # Calendars stored before enrichment existed get circuit data on load
+        if any('circuit' not in race for race in calendar_data.get('races', [])):
+            enrich_calendar(calendar_data)
+        
+        season = SeasonCalendar.from_dict(calendar_data, year=str(year))
+        self._track_season(year, season)
+        return season.to_dict()
+    
+    def _track_season(self, year, season):
+        """Store a SeasonCalendar in memory and (re)schedule its boundaries."""
+        with self._calendars_lock:
+            self._calendars[str(year)] = season
+        self.scheduler.track(str(year), season)
+    
+    def _apply_refresh(self, year, calendar_data):
+        """Merge a freshly processed calendar into the stored season.
+        
+        The new schedule is diffed against the stored one round by round.
+        Nothing is rewritten when nothing changed; otherwise only the changed
+        rounds are replaced (so only their cached serializations are
+        invalidated), the file is saved and the changes are logged.
+        
+        Args:
+            year (str): The season year.
+            calendar_data (dict): Output of process_calendar.
+            
+        Returns:
+            dict: The stored calendar after the merge.
+        """
+        if not calendar_data or 'error' in calendar_data:
+            return calendar_data
+        
+        new_season = SeasonCalendar.from_dict(calendar_data, year=str(year))
+        old_season = self._calendars.get(str(year))
+        calendar_file = self._calendar_file(year)
+        if old_season is None and os.path.exists(calendar_file):
+            try:
+                old_season = SeasonCalendar.from_dict(read_json_file(calendar_file), year=str(year))
+            except Exception as e:
+                logger.warning(f"Could not load stored calendar for diffing: {e}")
+        
+        if old_season is None:
+            # First fetch of this season: nothing to diff against
+            self.save_calendar_data(new_season.to_dict(), year)
+            self._track_season(year, new_season)
+            return new_season.to_dict()
+        
+        changes = diff_seasons(old_season, new_season)
+        if not changes:
+            logger.info(f"Calendar for {year} unchanged; keeping stored data")
+            if self._calendars.get(str(year)) is not old_season:
+                self._track_season(year, old_season)
+            return old_season.to_dict()
+        
+        positions = merge_season(old_season, new_season, changes)
+        old_season.last_updated = new_season.last_updated
+        old_season.touch(positions)
+        logger.info(f"Calendar for {year} changed: {len(changes)} changes in rounds "
+                    f"{sorted({c['round'] for c in changes if c['round'] is not None})}")
+        
+        self.save_calendar_data(old_season.to_dict(), year)
+        self.get_change_log(year).append(changes)
+        self._track_season(year, old_season)
+        return old_season.to_dict()
+    
+    def get_change_log(self, year=DEFAULT_YEAR):
+        """Get the persistent schedule change log for a season.
+        
+        Returns:
+            ChangeLog: The season's change log.
+        """
+        change_log = self._change_logs.get(str(year))
+        if change_log is None:
+            change_log = ChangeLog(os.path.join(self.data_dir, f'f1_changes_{year}.json'))
+            self._change_logs[str(year)] = change_log
+        return change_log
 
-    def fetch_f1_calendar(self, force_refresh=False):
+    def get_season(self, year=DEFAULT_YEAR):
+        """Get the in-memory SeasonCalendar for a year, loading it if needed.
+        
+        Returns:
+            SeasonCalendar: The season, or None if no calendar is available.
+        """
+        season = self._calendars.get(str(year))
+        if season is None:
+            self.get_calendar(str(year))
+            season = self._calendars.get(str(year))
+        return season
+    
+    def get_stored_season(self, year):
+        """Get a season from memory, the archive or its stored file, never from upstream.
+        
+        Returns:
+            SeasonCalendar: The season, or None if it has never been stored.
+        """
+        season = self._calendars.get(str(year))
+        if season is not None:
+            return season
+        if self.is_archived(year):
+            self._load_archived(year)
+        else:
+            calendar_file = self._calendar_file(year)
+            if os.path.exists(calendar_file):
+                try:
+                    self._remember_calendar(str(year), read_json_file(calendar_file))
+                except Exception as e:
+                    logger.error(f"Error loading stored calendar for {year}: {e}")
+        return self._calendars.get(str(year))
+    
+    def _backfill_season(self, year):
+        """Backfill job: fetch a season that is not stored, unless upstream is failing."""
+        if self.get_stored_season(year) is not None:
+            return {"year": str(year), "skipped": "already stored"}
+        if not self.degradation.claim_retry(year):
+            return {"year": str(year), "skipped": "upstream is failing"}
+        try:
+            return self.refresh_calendar(year)
+        finally:
+            self.degradation.release_retry(year)
+    
+    def get_calendar_index(self, year=DEFAULT_YEAR):
+        """Get the secondary indexes for a season, rebuilding them when the season changed.
+        
+        Returns:
+            CalendarIndex: The indexes, or None if no calendar is available.
+        """
+        season = self.get_season(year)
+        if season is None:
+            return None
+        index = self._indexes.get(str(year))
+        if index is None or index.version != season.version:
+            index = CalendarIndex(season)
+            self._indexes[str(year)] = index
+            logger.info(f"Built calendar index for {year} (version {season.version})")
+        return index
+    
+    def get_status_window(self, year, at):
+        """Identify the status window an instant falls in.
+        
+        Statuses only change at the season's boundaries, so two instants
+        with the same window get identical responses and can share cache
+        entries. An instant exactly on a boundary is its own window, since
+        a race counts as current at its start time and completed after it.
+        
+        Args:
+            year (str): The season year.
+            at (float): The instant (epoch).
+            
+        Returns:
+            tuple: (season version, window start, window end) positions, or
+            None if no calendar is available.
+        """
+        season = self.get_season(year)
+        if season is None:
+            return None
+        cached = self._boundaries.get(str(year))
+        if cached is None or cached[0] != season.version:
+            cached = (season.version, status_boundaries(season))
+            self._boundaries[str(year)] = cached
+        boundaries = cached[1]
+        return (season.version, bisect.bisect_left(boundaries, at), bisect.bisect_right(boundaries, at))
+    
+    def _snapshot(self, year, at):
+        """The season with statuses and next race as of another instant.
+        
+        Snapshots are cached per status window (see get_status_window) and
+        carry their own localized-calendar cache and lazily built index.
+        
+        Returns:
+            dict: season, next_race, localized and index, or None if no
+            calendar is available.
+        """
+        window = self.get_status_window(year, at)
+        if window is None:
+            return None
+        key = (str(year),) + window
+        with self._snapshots_lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+                return snapshot
+        
+        season, next_race = evaluate_season(self.get_season(year), at)
+        snapshot = {
+            "season": season,
+            "next_race": next_race,
+            "localized": LocalizedCalendarCache(max_size=8),
+            "index": None
+        }
+        logger.info(f"Evaluated {year} calendar at {utc_datetime(at).isoformat()} (window {window[1]}-{window[2]})")
+        with self._snapshots_lock:
+            self._snapshots[key] = snapshot
+            while len(self._snapshots) > SNAPSHOT_CACHE_SIZE:
+                self._snapshots.popitem(last=False)
+        return snapshot
+    
+    def get_localized_calendar(self, year=DEFAULT_YEAR, tz=None, at=None):
+        """Get a season with every date converted to a viewer's timezone.
+        
+        Conversions are cached per (year, timezone) and reused until the
+        season changes.
+        
+        Args:
+            year (str): The season year.
+            tz (str): IANA timezone name, e.g. "Europe/London".
+            at (float, optional): Report statuses as of this epoch instead of now.
+            
+        Returns:
+            dict: The converted calendar, or the calendar error payload.
+            
+        Raises:
+            ValueError: If the timezone is unknown.
+        """
+        season, localized = self.get_season(year), self._localized
+        if at is not None and season is not None:
+            snapshot = self._snapshot(year, at)
+            season, localized = snapshot["season"], snapshot["localized"]
+        if season is None:
+            get_timezone(tz)
+            return self.get_calendar(str(year))
+        return localized.get(season, tz)
+    
+    def localize_race_dict(self, year, race_dict, tz):
+        """Convert a single race dict (e.g. the next race) to a timezone.
+        
+        Args:
+            year (str): The season year the race belongs to.
+            race_dict (dict): The serialized race.
+            tz (str): IANA timezone name.
+            
+        Returns:
+            dict: A converted copy, or race_dict unchanged if the race is not
+            part of the loaded season.
+            
+        Raises:
+            ValueError: If the timezone is unknown.
+        """
+        zone = get_timezone(tz)
+        season = self.get_season(year)
+        if season is None or race_dict is None:
+            return race_dict
+        for race in season.races:
+            if race.round == race_dict.get('round') and race.name == race_dict.get('name'):
+                return localize_race(race, race_dict, zone)
+        return race_dict
+    
+    def query_calendar(self, year, query, tz=None, at=None):
+        """Filter, project and paginate one season using its secondary indexes.
+        
+        Args:
+            year (str): The season year.
+            query (CalendarQuery): Parsed filters.
+            tz (str, optional): IANA timezone to convert dates to.
+            at (float, optional): Report (and filter by) statuses as of this epoch.
+            
+        Returns:
+            dict: Calendar-shaped result with the matching races, or the
+            calendar error payload if the season could not be loaded.
+        """
+        season = self.get_season(year)
+        if season is None:
+            return self.get_calendar(str(year))
+        
+        localized = self._localized
+        if at is not None:
+            snapshot = self._snapshot(year, at)
+            season, localized = snapshot["season"], snapshot["localized"]
+            if snapshot["index"] is None:
+                snapshot["index"] = CalendarIndex(season)
+            index = snapshot["index"]
+        else:
+            index = self.get_calendar_index(year)
+        
+        if tz:
+            races = localized.get(season, tz)['races']
+        else:
+            races = season.to_dict()['races']
+        positions = index.positions(query)
+        page_positions, pagination = paginate(positions, query)
+        
+        result = {
+            "year": season.year,
+            "last_updated": season.last_updated,
+            "total": len(positions),
+            "races": [project(races[position], query.fields) for position in page_positions]
+        }
+        if tz:
+            result["timezone"] = get_timezone(tz).key
+        if pagination:
+            result["pagination"] = pagination
+        return result
+    
+    def query_calendars(self, years, query):
+        """Filter, project and paginate races across several seasons.
+        
+        Only seasons held in memory, archived or stored are searched; the
+        request never waits on upstream. The others are reported in
+        missing_years and queued for a background fetch (one at a time).
+        
+        Args:
+            years (list): Season years, in order.
+            query (CalendarQuery): Parsed filters.
+            
+        Returns:
+            dict: Matching races (each tagged with its year) and pagination.
+        """
+        matches = []
+        missing = []
+        for year in years:
+            if self.get_stored_season(year) is None:
+                missing.append(year)
+                continue
+            index = self.get_calendar_index(year)
+            matches.extend((year, position) for position in index.positions(query))
+        for year in missing:
+            self.backfill.enqueue("calendar", year=str(year))
+        
+        page_matches, pagination = paginate(matches, query)
+        races = []
+        for year, position in page_matches:
+            race = project(self._calendars[year].to_dict()['races'][position], query.fields)
+            races.append(dict(race, year=year))
+        
+        result = {"years": years, "total": len(matches), "races": races}
+        if pagination:
+            result["pagination"] = pagination
+        if missing:
+            result["missing_years"] = missing
+        return result
+    
+    def get_calendar_feed(self, year=DEFAULT_YEAR, query=None, sessions=None):
+        """Get a season as an iCalendar feed, optionally filtered.
+        
+        Feeds are rendered from the cached season models and kept per
+        calendar version, so repeated polls only pay for a cache lookup.
+        
+        Args:
+            year (str): The season year.
+            query (CalendarQuery, optional): Race filters (fields and
+                pagination are ignored).
+            sessions (frozenset, optional): Session keys to include.
+            
+        Returns:
+            tuple: (etag, body bytes), or None if the season is unavailable.
+        """
+        season = self.get_season(year)
+        if season is None:
+            return None
+        
+        filters = None
+        if query is not None and query.has_filters:
+            filters = (query.status, query.format, query.is_sprint, query.country,
+                       query.date_from, query.date_to)
+        key = (str(year), filters, tuple(sorted(sessions)) if sessions else None)
+        
+        def render():
+            races = season.races
+            if filters is not None:
+                races = [races[position] for position in self.get_calendar_index(year).positions(query)]
+            return render_feed(season, races, sessions)
+        
+        return self._feeds.get(key, season.version, render)
+    
+    def get_calendar_changes(self, year=DEFAULT_YEAR, since=None):
+        """Get schedule changes recorded after a sequence number or timestamp.
+        
+        Args:
+            year (str): The season year.
+            since (int or str, optional): Last sequence number (or ISO timestamp) the client saw.
+            
+        Returns:
+            dict: The changes plus the current state of every touched round.
+            
+        Raises:
+            ValueError: If since is not a valid timestamp.
+        """
+        change_log = self.get_change_log(year)
+        changes = change_log.since(since)
+        
+        # Include the current state of every touched round so clients can patch in place
+        touched_rounds = {change['round'] for change in changes}
+        calendar_data = self.get_calendar(str(year)) or {}
+        races = [race for race in calendar_data.get('races', []) if race.get('round') in touched_rounds]
+        
+        return {
+            "year": str(year),
+            "latest": change_log.latest,
+            "resync_required": isinstance(since, int) and since < change_log.truncated_before - 1,
+            "changes": changes,
+            "races": races
+        }
+    
+    def fetch_f1_calendar(self, year=DEFAULT_YEAR, force_refresh=False):
         """Fetch the F1 calendar for the specified year.
         
         Args:
+            year (str): The season year.
             force_refresh (bool): If True, fetches new data even if a cached version exists.
             
         Returns:
             dict: Calendar data including race schedule and other metadata.
         """
+        year = str(year)
+        calendar_file = self._calendar_file(year)
+        
         # Check if we already have saved data and aren't forcing a refresh
-        if os.path.exists(self.calendar_file) and not force_refresh:
+        if os.path.exists(calendar_file) and not force_refresh:
             try:
-                with open(self.calendar_file, 'r') as f:
-                    calendar_data = json.load(f)
-                logger.info(f"Loaded cached calendar data for {self.year}")
-                return calendar_data
+                calendar_data = read_json_file(calendar_file)
+                logger.info(f"Loaded cached calendar data for {year}")
+                return self._remember_calendar(year, calendar_data)
             except Exception as e:
                 logger.warning(f"Error loading cached calendar data: {e}")
                 # Fall through to fetch new data
         
         try:
             # Fetch the calendar using FastF1
-            logger.info(f"Fetching F1 calendar for {self.year}")
-            schedule = fastf1.get_event_schedule(int(self.year))
+            logger.info(f"Fetching F1 calendar for {year}")
+            schedule = self.upstream.call(fastf1.get_event_schedule, int(year))
             
-            # Process the calendar into our desired format
-            calendar_data = self.process_calendar(schedule)
+            # Same schedule as the stored calendar: nothing to process, save or invalidate
+            fingerprint = schedule_fingerprint(schedule)
+            if fingerprint is not None and fingerprint == self._stored_fingerprint(year):
+                stored = self._calendars.get(year)
+                result = stored.to_dict() if stored is not None else None
+                if result is None and os.path.exists(calendar_file):
+                    result = self._remember_calendar(year, read_json_file(calendar_file))
+                if result is not None:
+                    logger.info(f"Schedule for {year} unchanged (fingerprint {fingerprint[:12]}); skipping processing")
+                    self._record_refresh(year, decision="skipped", fingerprint=fingerprint)
+                    return result
             
-            # Save the processed data
-            self.save_calendar_data(calendar_data)
+            # Process the calendar into our desired format
+            calendar_data = self.process_calendar(schedule, year)
             
-            return calendar_data
+            # Merge into the stored season, rewriting only what changed
+            previous = self.get_change_log(year).latest
+            first = year not in self._calendars and not os.path.exists(calendar_file)
+            result = self._apply_refresh(year, calendar_data)
+            error = result.get('error') if result else "No calendar data"
+            if error is None and fingerprint is not None:
+                self._store_fingerprint(year, fingerprint)
+            if first:
+                decision = "stored"
+            else:
+                decision = "changed" if self.get_change_log(year).latest != previous else "unchanged"
+            self._record_refresh(year, error, decision=decision, fingerprint=fingerprint)
+            return result
             
         except Exception as e:
             logger.error(f"Error fetching F1 calendar: {e}")
+            self._record_refresh(year, str(e))
             
             # If we have cached data, return that instead as fallback
-            if os.path.exists(self.calendar_file):
+            if os.path.exists(calendar_file):
                 try:
-                    with open(self.calendar_file, 'r') as f:
-                        calendar_data = json.load(f)
+                    calendar_data = read_json_file(calendar_file)
                     logger.info(f"Using older cached calendar data as fallback")
-                    return calendar_data
+                    return self._remember_calendar(year, calendar_data)
                 except Exception as fallback_e:
                     logger.error(f"Error loading fallback calendar data: {fallback_e}")
             
             # No fallback available, return empty data
-            return {"year": self.year, "races": [], "error": str(e)}
+            return self._unavailable(year, str(e))
+    
+    def refresh_calendar(self, year=DEFAULT_YEAR):
+        """Fetch a season from upstream and merge it into the stored calendar.
+        
+        Safe to call from background workers: refreshes are serialized so
+        each one's change log entries are the ones it reports.
+        
+        Args:
+            year (str): The season year.
+            
+        Returns:
+            dict: Summary with the race count and the changes recorded.
+            
+        Raises:
+            RuntimeError: If the upstream fetch failed.
+            ValueError: If the season is archived (archived seasons never change).
+        """
+        if self.is_archived(year):
+            raise ValueError(f"Season {year} is archived and immutable; it is not refreshed")
+        with self._refresh_lock:
+            change_log = self.get_change_log(year)
+            previous = change_log.latest
+            calendar_data = self.fetch_f1_calendar(year, force_refresh=True)
+        
+        if 'error' in calendar_data:
+            raise RuntimeError(calendar_data['error'])
+        changes = change_log.since(previous)
+        return {
+            "year": str(year),
+            "races": len(calendar_data.get('races', [])),
+            "last_updated": calendar_data.get('last_updated'),
+            "decision": self._last_refresh.get(str(year), {}).get("decision"),
+            "changes": changes
+        }
     
-    def process_calendar(self, schedule):
+    def refresh_round(self, year, round_number):
+        """Refresh a season and report the state of one round.
+        
+        The upstream schedule is per season, so the whole season is fetched;
+        the merge only rewrites rounds that actually changed.
+        
+        Args:
+            year (str): The season year.
+            round_number (int): The round to report on.
+            
+        Returns:
+            dict: The round's race and the changes recorded for it.
+        """
+        summary = self.refresh_calendar(year)
+        season = self.get_season(year)
+        race = None
+        if season is not None:
+            race = next((r.to_dict() for r in season.races if r.round == int(round_number)), None)
+        if race is None:
+            raise ValueError(f"Round {round_number} not found in the {year} calendar")
+        return {
+            "year": str(year),
+            "round": int(round_number),
+            "race": race,
+            "changes": [change for change in summary["changes"] if change.get("round") == int(round_number)]
+        }
+    
+    def _calendar_file(self, year):
+        return os.path.join(self.data_dir, f'f1_calendar_{year}.json')
+    
+    def _fingerprint_file(self, year):
+        return os.path.join(self.data_dir, f'f1_fingerprint_{year}.json')
+    
+    def _stored_fingerprint(self, year):
+        """Fingerprint of the schedule the stored calendar was built from, or None."""
+        if str(year) not in self._fingerprints:
+            fingerprint = None
+            path = self._fingerprint_file(year)
+            if os.path.exists(path) and os.path.exists(self._calendar_file(year)):
+                try:
+                    fingerprint = read_json_file(path).get('fingerprint')
+                except Exception as e:
+                    logger.warning(f"Error reading schedule fingerprint for {year}: {e}")
+            self._fingerprints[str(year)] = fingerprint
+        return self._fingerprints[str(year)]
+    
+    def _store_fingerprint(self, year, fingerprint):
+        """Remember (and persist) the fingerprint of the schedule just applied."""
+        self._fingerprints[str(year)] = fingerprint
+        try:
+            write_json_file(self._fingerprint_file(year), {
+                "year": str(year),
+                "fingerprint": fingerprint,
+                "version": FINGERPRINT_VERSION,
+                "stored_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
+            })
+        except Exception as e:
+            logger.error(f"Error saving schedule fingerprint for {year}: {e}")
+    
+    def _record_refresh(self, year, error=None, decision=None, fingerprint=None):
+        """Remember the outcome of an upstream refresh.
+        
+        Args:
+            year (str): The season year.
+            error (str, optional): Why the refresh failed.
+            decision (str, optional): skipped (fingerprint matched), unchanged
+                (processed, nothing differed), changed, or stored (first fetch).
+            fingerprint (str, optional): Fingerprint of the fetched schedule.
+        """
+        decision = "failed" if error is not None else decision
+        if error is not None:
+            self.degradation.record_failure(year, error)
+        else:
+            self.degradation.record_success(year)
+        if decision is not None:
+            self._refresh_decisions[decision] = self._refresh_decisions.get(decision, 0) + 1
+        self._last_refresh[str(year)] = {
+            "at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "ok": error is None,
+            "error": error,
+            "decision": decision,
+            "fingerprint": fingerprint
+        }
+    
+    def readiness(self, years=None):
+        """Report whether calendars are loaded and how fresh they are.
+        
+        Only in-memory state is read (no disk or network access), so
+        probes can call this as often as they like.
+        
+        Args:
+            years (list, optional): Years that must be loaded to be ready;
+                defaults to DEFAULT_YEAR.
+            
+        Returns:
+            dict: Readiness, per-year calendar age, last refresh outcomes,
+            in-memory cache tiers and the upstream circuit breaker.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        required = [str(year) for year in (years or [DEFAULT_YEAR])]
+        with self._calendars_lock:
+            seasons = dict(self._calendars)
+        
+        calendars = {}
+        for year, season in sorted(seasons.items()):
+            age = _age_seconds(season.last_updated, now)
+            calendars[year] = {
+                "races": len(season.races),
+                "last_updated": season.last_updated,
+                "age_seconds": age,
+                "version": season.version
+            }
+        
+        missing = [year for year in required if not calendars.get(year, {}).get("races")]
+        return {
+            "ready": not missing,
+            "missing_years": missing,
+            "calendars": calendars,
+            "last_refresh": dict(self._last_refresh),
+            "refresh_decisions": dict(self._refresh_decisions),
+            "tiers": {
+                "archive": self.archive.stats(),
+                "memory": {
+                    "calendars": len(seasons),
+                    "indexes": len(self._indexes),
+                    "localized_calendars": len(self._localized),
+                    "rendered_feeds": len(self._feeds)
+                }
+            },
+            "upstream": self.upstream.snapshot(),
+            "degradation": self.degradation.snapshot()
+        }
+    
+    def process_calendar(self, schedule, year=DEFAULT_YEAR):
         """Process the raw schedule into a structured calendar format.
         
         Args:
             schedule (DataFrame or dict): The raw schedule data from FastF1 or cached data.
+            year (str): The season the schedule belongs to.
             
         Returns:
             dict: Processed calendar data.
@@ -132,20 +959,20 @@ class RaceCalendarFetcher:
         # Check if schedule is a DataFrame (from FastF1 API)
         if not isinstance(schedule, pd.DataFrame):
             logger.error(f"Invalid schedule format: expected DataFrame or processed dict, got {type(schedule)}")
-            return {"year": self.year, "races": [], "error": "Invalid schedule format"}
+            return {"year": str(year), "races": [], "error": "Invalid schedule format"}
         
         # Check if DataFrame is empty (using pandas DataFrame.empty attribute)
         try:
             if hasattr(schedule, 'empty') and schedule.empty:
-                logger.warning(f"Empty schedule received for year {self.year}")
-                return {"year": self.year, "races": [], "error": "Empty schedule"}
+                logger.warning(f"Empty schedule received for year {year}")
+                return {"year": str(year), "races": [], "error": "Empty schedule"}
         except Exception as e:
             logger.warning(f"Error checking if schedule is empty: {e}")
             # Continue processing as best we can
         
         # Current date for determining past/future races
-        now = datetime.datetime.now(datetime.timezone.utc)
-        logger.info(f"Processing calendar for {self.year} at {now.isoformat()}")
+        now = utc_datetime(self.clock())
+        logger.info(f"Processing calendar for {year} at {now.isoformat()}")
         
         races = []
         
@@ -163,33 +990,28 @@ class RaceCalendarFetcher:
                     is_sprint = True
                     logger.info(f"Sprint weekend detected: {event['EventName']} - Format: {event_format}")
                 
+                # Naive local times are resolved with the circuit's timezone
+                circuit_zone = None
+                if 'Location' in event and not pd.isna(event['Location']):
+                    circuit_zone = get_circuit_table().zone(event['Location'])
+                
                 # Extract race date
                 race_date = None
                 if 'Session5Date' in event and not pd.isna(event['Session5Date']):
                     # For sprint weekends, race is typically Session5
-                    race_date = event['Session5Date']
+                    race_date = self._event_timestamp(event, 'Session5Date', circuit_zone)
                 elif 'Session4Date' in event and not pd.isna(event['Session4Date']):
                     # For conventional weekends, might be Session4
-                    race_date = event['Session4Date']
+                    race_date = self._event_timestamp(event, 'Session4Date', circuit_zone)
                 elif 'EventDate' in event and not pd.isna(event['EventDate']):
                     # Fallback to EventDate
-                    race_date = event['EventDate']
+                    race_date = self._event_timestamp(event, 'EventDate', circuit_zone)
                 
                 # Convert race_date to standard format if it exists
                 race_date_str = race_date.isoformat() if race_date is not None else None
                 
                 # Determine race status (past, current, future)
-                status = "future"
-                if race_date is not None:
-                    # Ensure race_date is timezone-aware
-                    if race_date.tzinfo is None:
-                        # Convert naive datetime to UTC
-                        race_date = race_date.replace(tzinfo=datetime.timezone.utc)
-                    
-                    if race_date < now:
-                        status = "completed"
-                    elif race_date.date() == now.date():
-                        status = "current"
+                status = determine_race_status(race_date, now)
                 
                 # Create session dates dictionary
                 session_dates = {}
@@ -218,10 +1040,8 @@ class RaceCalendarFetcher:
                 # Extract session dates
                 for session_key, date_field in session_mappings:
                     if date_field in event and not pd.isna(event[date_field]):
-                        session_date = event[date_field]
                         # Ensure session_date is timezone-aware before isoformat
-                        if session_date.tzinfo is None:
-                            session_date = session_date.replace(tzinfo=datetime.timezone.utc)
+                        session_date = self._event_timestamp(event, date_field, circuit_zone)
                         session_dates[session_key] = session_date.isoformat()
                     else:
                         session_dates[session_key] = None
@@ -244,6 +1064,9 @@ class RaceCalendarFetcher:
                     "sessions": session_dates
                 }
                 
+                # Attach circuit timezone, coordinates and local session times
+                enrich_race(race)
+                
                 races.append(race)
                 logger.info(f"Processed race: {race['name']} - Round {race['round']}")
                 
@@ -254,104 +1077,97 @@ class RaceCalendarFetcher:
         # Sort races by round number
         races.sort(key=lambda x: x["round"] if x["round"] is not None else 999)
         
-        logger.info(f"Processed {len(races)} races for {self.year}")
+        logger.info(f"Processed {len(races)} races for {year}")
         
         return {
-            "year": self.year,
+            "year": str(year),
             "last_updated": datetime.datetime.now(datetime.timezone.utc).isoformat(),
             "races": races
         }
     
-    def save_calendar_data(self, calendar_data):
+    def _event_timestamp(self, event, date_field, circuit_zone):
+        """Read a schedule timestamp as a timezone-aware value.
+        
+        Aware values are returned unchanged. Naive values use the matching
+        ...Utc column when FastF1 provides one, otherwise they are treated as
+        circuit-local time, and only as UTC when the circuit is unknown.
+        
+        Args:
+            event (Series): A schedule row.
+            date_field (str): Column to read.
+            circuit_zone (ZoneInfo): The circuit's timezone, or None.
+            
+        Returns:
+            Timestamp: The timezone-aware value.
+        """
+        value = pd.Timestamp(event[date_field])
+        if value.tzinfo is not None:
+            return value
+        
+        utc_field = f"{date_field}Utc"
+        if utc_field in event and not pd.isna(event[utc_field]):
+            utc_value = pd.Timestamp(event[utc_field])
+            return utc_value if utc_value.tzinfo is not None else utc_value.tz_localize('UTC')
+        
+        if circuit_zone is not None:
+            try:
+                return value.tz_localize(circuit_zone.key)
+            except Exception as e:
+                logger.warning(f"Could not localize {date_field} to {circuit_zone.key}: {e}")
+        return value.tz_localize('UTC')
+    
+    def save_calendar_data(self, calendar_data, year=DEFAULT_YEAR):
         """Save calendar data to JSON.
         
+        The file holds the same compact bytes encode() produces for the
+        calendar response, not an indented copy.
+        
         Args:
             calendar_data (dict): The processed calendar data to save.
+            year (str): The season, which names the file.
         """
+        calendar_file = self._calendar_file(year)
         try:
             # Ensure data directory exists
             if not os.path.exists(self.data_dir):
                 os.makedirs(self.data_dir)
                 
-            with open(self.calendar_file, 'w') as f:
-                json.dump(calendar_data, f, indent=2)
-            logger.info(f"Calendar data saved to {self.calendar_file}")
+            write_json_file(calendar_file, calendar_data, schema=CALENDAR_SCHEMA, indent=False)
+            logger.info(f"Calendar data saved to {calendar_file}")
         except Exception as e:
             logger.error(f"Error saving calendar data: {e}")
     
-    def get_next_race(self, year=DEFAULT_YEAR):
-        """Get the next race from the calendar"""
+    def get_next_race(self, year=DEFAULT_YEAR, at=None):
+        """Get the next race from the calendar.
+        
+        The answer is precomputed by the scheduler whenever a race start
+        passes, so no dates are compared here. Once every race is in the
+        past (by the fetcher's clock) a demo copy of the first race is
+        returned with demo_mode set.
+        
+        Args:
+            year (str): The season year.
+            at (float, optional): Answer as of this epoch instead of now.
+        """
         try:
             calendar_data = self.get_calendar(year)
             
             if not calendar_data or 'races' not in calendar_data or not calendar_data['races']:
                 logger.warning(f"No races found in calendar for {year}")
                 return None
-                
-            # Current date for comparison
-            now = datetime.datetime.now(datetime.timezone.utc)
-            logger.info(f"Current date for next race check: {now.isoformat()}")
-            
-            # For testing/demo purposes: if all races are in the past, pretend first race is in the future
-            all_in_past = True
-            
-            # Find upcoming races
-            upcoming_races = []
-            for race in calendar_data['races']:
-                if 'date' not in race or not race['date']:
-                    logger.warning(f"Race missing date: {race.get('name', 'Unknown')}")
-                    continue
-                    
-                race_date = self._parse_date(race['date'])
-                if not race_date:
-                    logger.warning(f"Could not parse race date: {race['date']} for {race.get('name', 'Unknown')}")
-                    continue
-                
-                # Ensure race_date is timezone-aware for comparison
-                if race_date.tzinfo is None:
-                    race_date = race_date.replace(tzinfo=datetime.timezone.utc)
-                    logger.info(f"Converting naive datetime to timezone-aware for {race.get('name')}: {race_date.isoformat()}")
-                
-                try:
-                    if race_date > now:
-                        all_in_past = False
-                        upcoming_races.append(race)
-                        logger.info(f"Found upcoming race: {race['name']} on {race['date']}")
-                except TypeError as e:
-                    logger.error(f"Datetime comparison error for {race.get('name')}: {e}")
-                    logger.error(f"Race date: {race_date} (tzinfo: {race_date.tzinfo}), Now: {now} (tzinfo: {now.tzinfo})")
-                    # Try to fix it and compare again
-                    try:
-                        race_date = race_date.replace(tzinfo=datetime.timezone.utc)
-                        if race_date > now:
-                            all_in_past = False
-                            upcoming_races.append(race)
-                            logger.info(f"After fixing timezone: Found upcoming race: {race['name']} on {race['date']}")
-                    except Exception as fix_error:
-                        logger.error(f"Failed to fix timezone for comparison: {fix_error}")
-            
-            # If no upcoming races but we have races, return the first race for demo purposes
-            if not upcoming_races and all_in_past and calendar_data['races']:
-                # For demo/testing, pretend the first race is upcoming
-                demo_race = calendar_data['races'][0].copy()  # Create a copy to avoid modifying original
-                demo_race['status'] = 'future'  # Override status
-                demo_race['demo_mode'] = True   # Add demo mode flag
-                logger.info(f"No upcoming races found, using first race as demo: {demo_race['name']}")
-                return demo_race
-                
-            if not upcoming_races:
+            
+            if at is not None:
+                next_race = self._snapshot(year, at)["next_race"]
+            else:
+                next_race = self.scheduler.next_race(str(year))
+            if not next_race:
                 logger.warning(f"No upcoming races found for {year}")
                 return None
-                
-            # Sort by date (earliest first)
-            try:
-                upcoming_races.sort(key=lambda x: self._parse_date(x['date']) or datetime.datetime.max.replace(tzinfo=datetime.timezone.utc))
-            except Exception as sort_error:
-                logger.error(f"Error sorting upcoming races: {sort_error}")
-                # If sorting fails, just take the first one we found
-                
-            next_race = upcoming_races[0]
-            logger.info(f"Next race: {next_race['name']} on {next_race['date']}")
+            
+            if next_race.get('demo_mode'):
+                logger.info(f"No upcoming races found, using first race as demo: {next_race['name']}")
+            else:
+                logger.info(f"Next race: {next_race['name']} on {next_race['date']}")
             
             return next_race
             
@@ -370,16 +1186,25 @@ class RaceCalendarFetcher:
             logger.error(f"Error parsing date {date_str}: {str(e)}")
             return None
     
-    def get_race_by_round(self, round_number):
+    def get_race_by_round(self, round_number, year=DEFAULT_YEAR, tz=None, at=None):
         """Get a race by its round number.
         
         Args:
             round_number (int): The round number of the race.
+            year (str): The season year.
+            tz (str, optional): IANA timezone to convert dates to.
+            at (float, optional): Report the status as of this epoch instead of now.
             
         Returns:
             dict: Race information or None if not found.
+            
+        Raises:
+            ValueError: If the timezone is unknown.
         """
-        calendar_data = self.get_calendar()
+        if tz:
+            calendar_data = self.get_localized_calendar(year, tz, at=at)
+        else:
+            calendar_data = self.get_calendar(year, at=at)
         
         if not calendar_data or 'races' not in calendar_data:
             return None
@@ -398,8 +1223,7 @@ class RaceCalendarFetcher:
             logger.info(f"Checking for cached calendar data in {calendar_file}")
             
             if os.path.exists(calendar_file):
-                with open(calendar_file, 'r') as f:
-                    calendar_data = json.load(f)
+                calendar_data = read_json_file(calendar_file)
                 logger.info(f"Loaded cached calendar data for {self.year}")
                 return calendar_data
             else:
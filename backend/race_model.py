@@ -0,0 +1,239 @@
+import logging
+import datetime
+
+from serialization import encode, CALENDAR_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# Keys written by process_calendar, in output order
+RACE_FIELDS = ('round', 'country', 'location', 'name', 'official_name', 'date',
+               'status', 'is_sprint', 'format', 'sessions')
+
+
+def parse_timestamp(value):
+    """Parse an ISO date string into an epoch timestamp and UTC offset.
+
+    Args:
+        value (str or datetime): The value to parse.
+
+    Returns:
+        tuple: (epoch seconds, offset in minutes or None for naive values),
+        or (None, None) if the value is empty or cannot be parsed.
+    """
+    if not value:
+        return None, None
+    try:
+        if isinstance(value, str):
+            value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if value.tzinfo is None:
+            # Naive values are treated as UTC wall time
+            return value.replace(tzinfo=datetime.timezone.utc).timestamp(), None
+        offset = value.utcoffset()
+        return value.timestamp(), int(offset.total_seconds() // 60)
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.error(f"Error parsing date {value}: {e}")
+        return None, None
+
+
+def format_timestamp(epoch, offset):
+    """Format an epoch timestamp back into an ISO string.
+
+    Args:
+        epoch (float): Seconds since the epoch.
+        offset (int): UTC offset in minutes, or None to emit a naive value.
+
+    Returns:
+        str: The ISO formatted date, or None if epoch is None.
+    """
+    if epoch is None:
+        return None
+    if offset is None:
+        return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).replace(tzinfo=None).isoformat()
+    tz = datetime.timezone(datetime.timedelta(minutes=offset))
+    return datetime.datetime.fromtimestamp(epoch, tz).isoformat()
+
+
+class Session:
+    """A single session of a race weekend with a native epoch start time."""
+
+    __slots__ = ('key', 'start', 'offset', 'status')
+
+    def __init__(self, key, start, offset=None, status=None):
+        self.key = key
+        self.start = start
+        self.offset = offset
+        self.status = status
+
+    @property
+    def start_iso(self):
+        """The session start as an ISO string (API shape)."""
+        return format_timestamp(self.start, self.offset)
+
+
+class Race:
+    """Compact race record; converted to the JSON dict shape only at the API edge."""
+
+    __slots__ = ('round', 'country', 'location', 'name', 'official_name', 'date',
+                 'date_offset', 'status', 'is_sprint', 'format', 'sessions', 'extra')
+
+    def __init__(self, round=None, country="", location="", name="", official_name="",
+                 date=None, date_offset=None, status="future", is_sprint=False,
+                 format="", sessions=(), extra=None):
+        self.round = round
+        self.country = country
+        self.location = location
+        self.name = name
+        self.official_name = official_name
+        self.date = date
+        self.date_offset = date_offset
+        self.status = status
+        self.is_sprint = is_sprint
+        self.format = format
+        self.sessions = sessions
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Race from the dict shape produced by process_calendar.
+
+        Args:
+            data (dict): A race dict. Unknown keys are preserved in extra.
+
+        Returns:
+            Race: The parsed race.
+        """
+        date, date_offset = parse_timestamp(data.get('date'))
+        session_status = data.get('session_status') or {}
+        sessions = []
+        for key, value in (data.get('sessions') or {}).items():
+            start, offset = parse_timestamp(value)
+            sessions.append(Session(key, start, offset, session_status.get(key)))
+
+        extra = {
+            key: value for key, value in data.items()
+            if key not in RACE_FIELDS and key != 'session_status'
+        }
+        return cls(
+            round=data.get('round'),
+            country=data.get('country', ""),
+            location=data.get('location', ""),
+            name=data.get('name', ""),
+            official_name=data.get('official_name', ""),
+            date=date,
+            date_offset=date_offset,
+            status=data.get('status', "future"),
+            is_sprint=bool(data.get('is_sprint', False)),
+            format=data.get('format', ""),
+            sessions=tuple(sessions),
+            extra=extra or None
+        )
+
+    def to_dict(self):
+        """Serialize to the existing JSON shape."""
+        race = {
+            "round": self.round,
+            "country": self.country,
+            "location": self.location,
+            "name": self.name,
+            "official_name": self.official_name,
+            "date": format_timestamp(self.date, self.date_offset),
+            "status": self.status,
+            "is_sprint": self.is_sprint,
+            "format": self.format,
+            "sessions": {session.key: session.start_iso for session in self.sessions}
+        }
+        session_status = {
+            session.key: session.status for session in self.sessions if session.status is not None
+        }
+        if session_status:
+            race["session_status"] = session_status
+        if self.extra:
+            race.update(self.extra)
+        return race
+
+
+class SeasonCalendar:
+    """All races of a season plus a version counter bumped on every change.
+
+    Serialized race dicts are cached individually and only the races marked
+    by touch() are rebuilt, so repeated API reads of an unchanged season
+    cost nothing and a change to one round does not re-serialize the rest.
+    The encoded JSON of the whole season is kept the same way.
+    """
+
+    __slots__ = ('year', 'last_updated', 'races', 'version', 'extra', '_dict', '_race_dicts', '_encoded')
+
+    def __init__(self, year, races, last_updated=None, extra=None):
+        self.year = year
+        self.last_updated = last_updated
+        self.races = races
+        self.version = 1
+        self.extra = extra
+        self._dict = None
+        self._race_dicts = None
+        self._encoded = None
+
+    @classmethod
+    def from_dict(cls, data, year=None):
+        """Build a SeasonCalendar from the calendar dict shape.
+
+        Args:
+            data (dict): Calendar dict with a 'races' list.
+            year (str, optional): Season year if the dict does not carry one.
+
+        Returns:
+            SeasonCalendar: The parsed season.
+        """
+        extra = {
+            key: value for key, value in data.items()
+            if key not in ('year', 'last_updated', 'races')
+        }
+        return cls(
+            year=data.get('year', year),
+            races=[Race.from_dict(race) for race in data.get('races', [])],
+            last_updated=data.get('last_updated'),
+            extra=extra or None
+        )
+
+    def touch(self, positions=None):
+        """Record a change so cached serializations are rebuilt.
+
+        Args:
+            positions (iterable, optional): Indexes of the races that changed.
+                None invalidates every race (e.g. after rounds were added or removed).
+        """
+        self.version += 1
+        self._dict = None
+        self._encoded = None
+        if positions is None:
+            self._race_dicts = None
+        elif self._race_dicts is not None:
+            for position in positions:
+                self._race_dicts[position] = None
+
+    def to_dict(self):
+        """Serialize to the existing calendar JSON shape (cached per version)."""
+        if self._dict is None:
+            if self._race_dicts is None or len(self._race_dicts) != len(self.races):
+                self._race_dicts = [None] * len(self.races)
+            race_dicts = self._race_dicts
+            for position, cached in enumerate(race_dicts):
+                if cached is None:
+                    race_dicts[position] = self.races[position].to_dict()
+
+            calendar = {}
+            if self.year is not None:
+                calendar["year"] = self.year
+            if self.last_updated is not None:
+                calendar["last_updated"] = self.last_updated
+            calendar["races"] = list(race_dicts)
+            if self.extra:
+                calendar.update(self.extra)
+            self._dict = calendar
+        return self._dict
+
+    def encoded(self):
+        """The season as compact JSON bytes, normalized and encoded once per version."""
+        if self._encoded is None:
+            self._encoded = encode(self.to_dict(), CALENDAR_SCHEMA)
+        return self._encoded
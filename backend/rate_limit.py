@@ -0,0 +1,336 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Redis is only needed for the shared multi-worker backend
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Default budgets: (tokens added per second, bucket capacity)
+DEFAULT_RATE = float(os.environ.get('RATE_LIMIT_RATE', '5'))
+DEFAULT_BURST = int(os.environ.get('RATE_LIMIT_BURST', '60'))
+REFRESH_RATE = float(os.environ.get('RATE_LIMIT_REFRESH_RATE', str(1 / 300)))
+REFRESH_BURST = int(os.environ.get('RATE_LIMIT_REFRESH_BURST', '2'))
+
+# Idle buckets are dropped after this many seconds (a full bucket carries no state)
+BUCKET_IDLE_TTL = 3600
+
+# Number of rejections per client kept for the metrics report
+TOP_REJECTED_CLIENTS = 10
+
+# Clients whose rejections are counted at most; the least recently rejected are forgotten
+MAX_REJECTED_CLIENTS = 1000
+
+# API keys that get their own budget (comma separated); any other X-API-Key is ignored
+API_KEYS = frozenset(key.strip() for key in os.environ.get('RATE_LIMIT_API_KEYS', '').split(',') if key.strip())
+
+
+class RateLimitPolicy:
+    """A named token-bucket budget."""
+
+    __slots__ = ('name', 'rate', 'burst')
+
+    def __init__(self, name, rate, burst):
+        """Initialize the policy.
+
+        Args:
+            name (str): Policy name, used as part of the bucket key.
+            rate (float): Tokens added per second.
+            burst (int): Bucket capacity (maximum burst size).
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+
+
+DEFAULT_POLICIES = {
+    "default": RateLimitPolicy("default", DEFAULT_RATE, DEFAULT_BURST),
+    # Forced refreshes hit the upstream, so they get a much smaller budget
+    "refresh": RateLimitPolicy("refresh", REFRESH_RATE, REFRESH_BURST),
+}
+
+
+class RateLimitDecision:
+    """Outcome of a rate limit check, with the values for the response headers."""
+
+    __slots__ = ('allowed', 'limit', 'remaining', 'retry_after')
+
+    def __init__(self, allowed, limit, remaining, retry_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+    def headers(self):
+        """X-RateLimit-* (and Retry-After when rejected) response headers."""
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(max(1, int(self.retry_after + 0.999)))
+        return headers
+
+
+def _refill(tokens, updated, now, policy):
+    """Tokens in a bucket after refilling from updated to now."""
+    return min(policy.burst, tokens + (now - updated) * policy.rate)
+
+
+class InMemoryBucketStore:
+    """Token buckets held in this process.
+
+    Correct for a single worker (or the Netlify function, where every
+    instance is its own process); multi-worker deployments should use a
+    shared store so a client cannot multiply its budget by the worker count.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def consume(self, key, policy, cost=1, now=None):
+        """Take cost tokens from a bucket.
+
+        Args:
+            key (str): Bucket key.
+            policy (RateLimitPolicy): The budget to apply.
+            cost (int): Tokens to take.
+            now (float, optional): Monotonic time, for tests.
+
+        Returns:
+            tuple: (allowed, remaining tokens, seconds until cost tokens are available)
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (policy.burst, now))
+            tokens = _refill(tokens, updated, now, policy)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if now - self._last_sweep > BUCKET_IDLE_TTL:
+                self._sweep(now)
+        retry_after = 0.0 if allowed else (cost - tokens) / policy.rate
+        return allowed, int(tokens), retry_after
+
+    def _sweep(self, now):
+        """Drop buckets idle for longer than BUCKET_IDLE_TTL (lock held)."""
+        self._last_sweep = now
+        stale = [key for key, (_, updated) in self._buckets.items() if now - updated > BUCKET_IDLE_TTL]
+        for key in stale:
+            del self._buckets[key]
+
+    def size(self):
+        """Number of tracked buckets."""
+        with self._lock:
+            return len(self._buckets)
+
+
+# Atomic refill-and-take; KEYS[1] = bucket, ARGV = rate, burst, cost, now
+_REDIS_CONSUME = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through Redis.
+
+    The refill-and-take runs as one Lua script, so concurrent workers never
+    lose updates. Wall-clock time is used because monotonic clocks are not
+    comparable across processes.
+    """
+
+    name = "redis"
+
+    def __init__(self, url, prefix="f1dashboard:ratelimit:"):
+        """Connect to Redis.
+
+        Args:
+            url (str): Redis URL, e.g. redis://localhost:6379/0.
+            prefix (str): Key prefix for the buckets.
+
+        Raises:
+            RuntimeError: If the redis package is not installed.
+        """
+        if redis is None:
+            raise RuntimeError("The redis package is required for the redis rate limit store")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(_REDIS_CONSUME)
+
+    def consume(self, key, policy, cost=1, now=None):
+        """Take cost tokens from a shared bucket (see InMemoryBucketStore.consume)."""
+        now = time.time() if now is None else now
+        allowed, tokens = self._consume(
+            keys=[self.prefix + key],
+            args=[policy.rate, policy.burst, cost, now, BUCKET_IDLE_TTL])
+        tokens = float(tokens)
+        retry_after = 0.0 if allowed else (cost - tokens) / policy.rate
+        return bool(allowed), int(tokens), retry_after
+
+    def size(self):
+        """Number of tracked buckets (not counted for Redis)."""
+        return None
+
+
+def create_store(url=None):
+    """Create the bucket store named by url (or RATE_LIMIT_STORAGE).
+
+    "memory" (the default) keeps buckets in-process; a redis:// URL shares
+    them between workers. If Redis cannot be used the in-memory store is
+    returned and an error is logged, so the API keeps serving.
+    """
+    url = url or os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        try:
+            return RedisBucketStore(url)
+        except Exception as e:
+            logger.error(f"Could not use rate limit store {url}, falling back to memory: {e}")
+    return InMemoryBucketStore()
+
+
+def _digest(value):
+    """Short one-way digest, so keys and addresses are not stored or reported as-is."""
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+
+def client_identity(headers, remote_addr, api_keys=None):
+    """Identify the client a request is charged to.
+
+    A configured X-API-Key wins, so dashboards behind a shared NAT can be
+    given their own budget; unknown keys are ignored (otherwise any client
+    could mint fresh budgets) and the remote address is used.
+
+    Args:
+        headers (Mapping): Request headers (case-insensitive lookups not assumed).
+        remote_addr (str): The peer address.
+        api_keys (Collection, optional): Accepted keys; defaults to API_KEYS.
+
+    Returns:
+        str: The bucket identity; keys are digested.
+    """
+    api_keys = API_KEYS if api_keys is None else api_keys
+    api_key = headers.get('X-API-Key') or headers.get('x-api-key')
+    if api_key and api_key in api_keys:
+        return f"key:{_digest(api_key)}"
+    return f"ip:{remote_addr or 'unknown'}"
+
+
+def redact_identity(client):
+    """Client identity safe to publish: addresses are digested like keys."""
+    if client.startswith('ip:'):
+        return f"ip:{_digest(client[len('ip:'):])}"
+    return client
+
+
+class RateLimiter:
+    """Per-client token-bucket rate limiting with named policies and counters."""
+
+    def __init__(self, store=None, policies=None, enabled=None):
+        """Initialize the limiter.
+
+        Args:
+            store: Bucket store; defaults to create_store().
+            policies (dict): Policy name -> RateLimitPolicy.
+            enabled (bool, optional): Defaults to RATE_LIMIT_ENABLED (on).
+        """
+        self.store = store or create_store()
+        self.policies = dict(policies or DEFAULT_POLICIES)
+        if enabled is None:
+            enabled = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._allowed = {name: 0 for name in self.policies}
+        self._rejected = {name: 0 for name in self.policies}
+        # LRU: a flood of distinct (possibly spoofed) identities cannot grow it without bound
+        self._rejected_clients = OrderedDict()
+
+    def check(self, client, policy_name="default", cost=1):
+        """Charge a request to a client's bucket for a policy.
+
+        Args:
+            client (str): Identity from client_identity.
+            policy_name (str): Name of the policy to apply.
+            cost (int): Tokens the request costs.
+
+        Returns:
+            RateLimitDecision: Whether to serve the request.
+        """
+        policy = self.policies[policy_name]
+        if not self.enabled:
+            return RateLimitDecision(True, policy.burst, policy.burst, 0.0)
+
+        try:
+            allowed, remaining, retry_after = self.store.consume(f"{policy.name}:{client}", policy, cost)
+        except Exception as e:
+            # A broken shared store must not take the API down with it
+            logger.error(f"Rate limit store error, allowing request: {e}")
+            return RateLimitDecision(True, policy.burst, policy.burst, 0.0)
+
+        with self._lock:
+            if allowed:
+                self._allowed[policy_name] = self._allowed.get(policy_name, 0) + 1
+            else:
+                self._rejected[policy_name] = self._rejected.get(policy_name, 0) + 1
+                self._rejected_clients[client] = self._rejected_clients.get(client, 0) + 1
+                self._rejected_clients.move_to_end(client)
+                while len(self._rejected_clients) > MAX_REJECTED_CLIENTS:
+                    self._rejected_clients.popitem(last=False)
+        if not allowed:
+            logger.warning(f"Rate limit exceeded for {client} on {policy_name} (retry in {retry_after:.1f}s)")
+        return RateLimitDecision(allowed, policy.burst, remaining, retry_after)
+
+    def metrics(self):
+        """Snapshot of limiter configuration, state and counters."""
+        with self._lock:
+            top_clients = sorted(self._rejected_clients.items(), key=lambda item: item[1], reverse=True)
+            return {
+                "enabled": self.enabled,
+                "store": self.store.name,
+                "buckets": self.store.size(),
+                "policies": {
+                    name: {
+                        "rate": policy.rate,
+                        "burst": policy.burst,
+                        "allowed": self._allowed.get(name, 0),
+                        "rejected": self._rejected.get(name, 0)
+                    }
+                    for name, policy in self.policies.items()
+                },
+                "top_rejected_clients": {redact_identity(client): count
+                                         for client, count in top_clients[:TOP_REJECTED_CLIENTS]}
+            }
+
+
+def limit(policy_name):
+    """Decorator assigning a rate limit policy to a Flask view (default: "default")."""
+    def decorator(view):
+        view.rate_limit_policy = policy_name
+        return view
+    return decorator
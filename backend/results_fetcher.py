@@ -0,0 +1,119 @@
+import os
+import math
+import logging
+
+from serialization import read_json_file, write_json_file
+
+logger = logging.getLogger(__name__)
+
+# Session identifiers understood by fastf1.get_session
+RACE = 'R'
+QUALIFYING = 'Q'
+SPRINT = 'S'
+SPRINT_QUALIFYING = 'SQ'
+
+# Result columns we keep, mapped to our JSON keys
+RESULT_FIELDS = [
+    ('DriverNumber', 'driver_number'),
+    ('Abbreviation', 'driver_code'),
+    ('FullName', 'driver_name'),
+    ('TeamName', 'team'),
+    ('Position', 'position'),
+    ('ClassifiedPosition', 'classified_position'),
+    ('GridPosition', 'grid_position'),
+    ('Points', 'points'),
+    ('Status', 'status'),
+    ('Time', 'time'),
+]
+
+
+def results_path(data_dir, year, round_number, identifier=RACE):
+    """Path of the stored results for one session."""
+    return os.path.join(data_dir, 'results', str(year), f"{int(round_number):02d}_{identifier}.json")
+
+
+def _clean(value):
+    """Convert pandas/numpy scalars into JSON-friendly values."""
+    if value is None:
+        return None
+    if hasattr(value, 'total_seconds'):
+        # Timedelta (or NaT, whose total_seconds is NaN)
+        seconds = value.total_seconds()
+        return None if math.isnan(seconds) else round(seconds, 3)
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def results_to_records(results):
+    """Convert a FastF1 results DataFrame into a list of dicts.
+
+    Args:
+        results (DataFrame): session.results
+
+    Returns:
+        list: One dict per driver, in finishing order.
+    """
+    records = []
+    for _, row in results.iterrows():
+        record = {}
+        for column, key in RESULT_FIELDS:
+            record[key] = _clean(row[column]) if column in row else None
+        records.append(record)
+    return records
+
+
+def fetch_session_results(year, round_number, identifier=RACE):
+    """Load one session's classification from FastF1.
+
+    Only the results table is loaded (no laps, telemetry, weather or
+    messages), which keeps backfills cheap.
+
+    Returns:
+        dict: Session metadata and result records.
+    """
+    import fastf1
+
+    session = fastf1.get_session(int(year), int(round_number), identifier)
+    session.load(laps=False, telemetry=False, weather=False, messages=False)
+    if session.results is None or session.results.empty:
+        raise ValueError(f"No results available for {year} round {round_number} {identifier}")
+
+    return {
+        "year": int(year),
+        "round": int(round_number),
+        "session": identifier,
+        "event_name": str(session.event['EventName']),
+        "location": str(session.event['Location']),
+        "country": str(session.event['Country']),
+        "date": session.date.isoformat() if session.date is not None else None,
+        "results": results_to_records(session.results)
+    }
+
+
+def save_session_results(data_dir, payload):
+    """Atomically write session results into the data store.
+
+    Returns:
+        str: The written path.
+    """
+    path = results_path(data_dir, payload['year'], payload['round'], payload['session'])
+    write_json_file(path, payload)
+    return path
+
+
+def load_session_results(data_dir, year, round_number, identifier=RACE):
+    """Read stored session results, or None if they have not been ingested."""
+    path = results_path(data_dir, year, round_number, identifier)
+    if not os.path.exists(path):
+        return None
+    try:
+        return read_json_file(path)
+    except Exception as e:
+        logger.error(f"Error loading results from {path}: {e}")
+        return None
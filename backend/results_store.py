@@ -0,0 +1,354 @@
+import os
+import glob
+import sqlite3
+import logging
+import threading
+
+from circuits import get_circuit_table, normalize_name
+from calendar_archive import ARCHIVE_FILE, CalendarArchive
+from serialization import read_json_file
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DB = 'results.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    year INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    name TEXT,
+    location TEXT,
+    country TEXT,
+    circuit TEXT,
+    circuit_key TEXT,
+    date TEXT,
+    PRIMARY KEY (year, round)
+);
+CREATE TABLE IF NOT EXISTS results (
+    year INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    driver_code TEXT NOT NULL,
+    driver_name TEXT,
+    driver_number TEXT,
+    team TEXT,
+    position INTEGER,
+    grid_position INTEGER,
+    points REAL,
+    status TEXT,
+    PRIMARY KEY (year, round, session, driver_code)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+-- Head-to-head: both sides are looked up by driver and answered from the index alone
+CREATE INDEX IF NOT EXISTS results_by_driver
+    ON results (driver_code, session, year, round, position, points, status, team);
+-- Winners: position-1 rows per session with the columns the query returns
+CREATE INDEX IF NOT EXISTS results_by_finish
+    ON results (session, position, year, round, driver_code, driver_name, team);
+CREATE INDEX IF NOT EXISTS events_by_circuit
+    ON events (circuit_key, year, round, name);
+"""
+
+def _int_or_none(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsStore:
+    """SQLite index over stored calendars and session results.
+
+    The JSON files written by the calendar fetcher and results_fetcher stay
+    the source of truth; sync() imports files that are new or changed since
+    the last sync, so the index can always be rebuilt from the data
+    directory.
+    """
+
+    def __init__(self, path):
+        """Open (and create if needed) the database.
+
+        Args:
+            path (str): SQLite database file.
+        """
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # Bumped on every import so readers can cache derived answers
+        self.version = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        """One connection per thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close this thread's connection (it is reopened on next use)."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def sync(self, data_dir):
+        """Import new or modified calendar, archive, results and winners files.
+
+        Args:
+            data_dir (str): The data directory (calendars and results/<year>/).
+
+        Returns:
+            int: Number of files imported.
+        """
+        paths = sorted(glob.glob(os.path.join(data_dir, 'f1_calendar_*.json')))
+        if os.path.exists(os.path.join(data_dir, ARCHIVE_FILE)):
+            paths.append(os.path.join(data_dir, ARCHIVE_FILE))
+        paths += sorted(glob.glob(os.path.join(data_dir, 'results', '*', '*.json')))
+        winners_path = os.path.join(os.path.dirname(os.path.abspath(data_dir)), 'winners_cache.json')
+        if os.path.exists(winners_path):
+            paths.append(winners_path)
+
+        connection = self._connection()
+        known = dict(connection.execute('SELECT path, mtime FROM sources').fetchall())
+        imported = 0
+        with self._write_lock, connection:
+            for path in paths:
+                mtime = os.path.getmtime(path)
+                if known.get(path) == mtime:
+                    continue
+                try:
+                    name = os.path.basename(path)
+                    if name == ARCHIVE_FILE:
+                        archive = CalendarArchive(path)
+                        for year in archive.years():
+                            self._import_calendar(connection, archive.read(year), year)
+                    elif name.startswith('f1_calendar_'):
+                        self._import_calendar(connection, read_json_file(path), name[len('f1_calendar_'):-len('.json')])
+                    elif name == 'winners_cache.json':
+                        self._import_winners(connection, read_json_file(path))
+                    else:
+                        self._import_results(connection, read_json_file(path))
+                except Exception as e:
+                    logger.error(f"Error indexing {path}: {e}")
+                    continue
+                connection.execute('INSERT OR REPLACE INTO sources (path, mtime) VALUES (?, ?)', (path, mtime))
+                imported += 1
+        if imported:
+            self.version += 1
+            logger.info(f"Indexed {imported} files into {self.path}")
+        return imported
+
+    def import_payload(self, payload):
+        """Index one results payload (as returned by fetch_session_results)."""
+        connection = self._connection()
+        with self._write_lock, connection:
+            self._import_results(connection, payload)
+        self.version += 1
+
+    def _import_calendar(self, connection, calendar_data, year):
+        table = get_circuit_table()
+        rows = []
+        for race in calendar_data.get('races', []):
+            round_number = _int_or_none(race.get('round'))
+            if not round_number:
+                continue
+            circuit = race.get('circuit') or table.lookup(race.get('location')) or {}
+            circuit_name = circuit.get('name') or race.get('location')
+            rows.append((int(calendar_data.get('year') or year), round_number, race.get('name'),
+                         race.get('location'), race.get('country'), circuit_name,
+                         normalize_name(circuit_name), race.get('date')))
+        connection.executemany('INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def _import_results(self, connection, payload):
+        year, round_number, session = int(payload['year']), int(payload['round']), payload['session']
+        if payload.get('location'):
+            # Results carry their own event details; fill in events the calendar has not provided
+            circuit = get_circuit_table().lookup(payload['location']) or {}
+            circuit_name = circuit.get('name') or payload['location']
+            connection.execute(
+                'INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (year, round_number, payload.get('event_name'), payload['location'],
+                 payload.get('country'), circuit_name, normalize_name(circuit_name), payload.get('date')))
+        connection.execute('DELETE FROM results WHERE year = ? AND round = ? AND session = ?',
+                           (year, round_number, session))
+        connection.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+            (year, round_number, session, result.get('driver_code') or str(result.get('driver_number')),
+             result.get('driver_name'), str(result.get('driver_number') or ''), result.get('team'),
+             _int_or_none(result.get('position')), _int_or_none(result.get('grid_position')),
+             result.get('points'), result.get('status'))
+            for result in payload.get('results', [])
+        ])
+
+    def _import_winners(self, connection, winners):
+        """Legacy "<year>_<round>" winners; never overrides full race results."""
+        rows = []
+        for key, winner in winners.items():
+            year, _, round_number = key.partition('_')
+            if not (year.isdigit() and round_number.isdigit()) or not winner.get('driver_code'):
+                continue
+            rows.append((int(year), int(round_number), 'R', winner['driver_code'],
+                         winner.get('driver_name'), '', winner.get('team'), 1, None, None, None))
+        for row in rows:
+            exists = connection.execute(
+                'SELECT 1 FROM results WHERE year = ? AND round = ? AND session = ? AND position = 1',
+                row[:3]).fetchone()
+            if not exists:
+                connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+
+    def head_to_head(self, driver_a, driver_b, session='R', from_year=None, to_year=None):
+        """Compare two drivers in every session both were classified in.
+
+        Args:
+            driver_a (str): Three-letter driver code.
+            driver_b (str): Three-letter driver code.
+            session (str): Session identifier.
+            from_year (int, optional): First season.
+            to_year (int, optional): Last season.
+
+        Returns:
+            dict: Per-season and total finishing, points, wins and podium counts.
+        """
+        driver_a, driver_b = driver_a.upper(), driver_b.upper()
+        rows = self._connection().execute("""
+            SELECT a.year AS year,
+                   COUNT(*) AS meetings,
+                   SUM(a.position < b.position) AS a_ahead,
+                   SUM(b.position < a.position) AS b_ahead,
+                   SUM(COALESCE(a.points, 0)) AS a_points,
+                   SUM(COALESCE(b.points, 0)) AS b_points,
+                   SUM(a.position = 1) AS a_wins,
+                   SUM(b.position = 1) AS b_wins,
+                   SUM(a.position <= 3) AS a_podiums,
+                   SUM(b.position <= 3) AS b_podiums
+            FROM results AS a
+            JOIN results AS b
+              ON b.driver_code = ? AND b.session = a.session AND b.year = a.year AND b.round = a.round
+            WHERE a.driver_code = ? AND a.session = ? AND a.year BETWEEN ? AND ?
+              AND a.position IS NOT NULL AND b.position IS NOT NULL
+            GROUP BY a.year
+            ORDER BY a.year
+        """, (driver_b, driver_a, session.upper(), from_year or 0, to_year or 9999)).fetchall()
+
+        seasons = [dict(row) for row in rows]
+        totals = {key: 0 for key in ('meetings', 'a_ahead', 'b_ahead', 'a_points', 'b_points',
+                                      'a_wins', 'b_wins', 'a_podiums', 'b_podiums')}
+        for season in seasons:
+            for key in totals:
+                totals[key] += season[key] or 0
+        return {"drivers": [driver_a, driver_b], "session": session.upper(),
+                "seasons": seasons, "totals": totals}
+
+    def winners(self, circuit=None, since=None, until=None, session='R'):
+        """Winners of a session, optionally at one circuit and within a year range.
+
+        Args:
+            circuit (str, optional): Circuit name, location or alias.
+            since (int, optional): First season.
+            until (int, optional): Last season.
+            session (str): Session identifier.
+
+        Returns:
+            list: One dict per event, oldest first.
+        """
+        query = """
+            SELECT e.year, e.round, e.name, e.circuit, r.driver_code, r.driver_name, r.team
+            FROM results AS r
+            JOIN events AS e ON e.year = r.year AND e.round = r.round
+            WHERE r.session = ? AND r.position = 1 AND r.year BETWEEN ? AND ?
+        """
+        params = [session.upper(), since or 0, until or 9999]
+        if circuit:
+            entry = get_circuit_table().lookup(circuit)
+            query += " AND e.circuit_key = ?"
+            params.append(normalize_name(entry['name'] if entry else circuit))
+        query += " ORDER BY r.year, r.round"
+        return [dict(row) for row in self._connection().execute(query, params).fetchall()]
+
+    def standings(self, year):
+        """Championship standings from the stored race and sprint results.
+
+        Args:
+            year (int): The season.
+
+        Returns:
+            dict: drivers and constructors, each ordered by points then wins.
+        """
+        connection = self._connection()
+        # With a single MAX() aggregate, SQLite takes team from the driver's latest round
+        drivers = connection.execute("""
+            SELECT driver_code, driver_name, team, MAX(round) AS last_round,
+                   SUM(COALESCE(points, 0)) AS points,
+                   SUM(session = 'R' AND position = 1) AS wins
+            FROM results
+            WHERE year = ? AND session IN ('R', 'S')
+            GROUP BY driver_code
+            ORDER BY points DESC, wins DESC, driver_code
+        """, (year,)).fetchall()
+        constructors = connection.execute("""
+            SELECT team, SUM(COALESCE(points, 0)) AS points,
+                   SUM(session = 'R' AND position = 1) AS wins
+            FROM results
+            WHERE year = ? AND session IN ('R', 'S') AND team IS NOT NULL
+            GROUP BY team
+            ORDER BY points DESC, wins DESC, team
+        """, (year,)).fetchall()
+
+        def ranked(rows, keys):
+            return [dict(position=position, **{key: row[key] for key in keys})
+                    for position, row in enumerate(rows, start=1)]
+
+        return {
+            "year": int(year),
+            "drivers": ranked(drivers, ('driver_code', 'driver_name', 'team', 'points', 'wins')),
+            "constructors": ranked(constructors, ('team', 'points', 'wins'))
+        }
+
+    def last_winner(self, year=None):
+        """Winner of the most recent stored race, up to and including a season.
+
+        Args:
+            year (int, optional): Latest season to consider.
+
+        Returns:
+            dict: The event and winner, or None if no race result is stored.
+        """
+        row = self._connection().execute("""
+            SELECT r.year, r.round, e.name, e.circuit, r.driver_code, r.driver_name, r.team
+            FROM results AS r
+            LEFT JOIN events AS e ON e.year = r.year AND e.round = r.round
+            WHERE r.session = 'R' AND r.position = 1 AND r.year <= ?
+            ORDER BY r.year DESC, r.round DESC
+            LIMIT 1
+        """, (year or 9999,)).fetchone()
+        return dict(row) if row is not None else None
+
+
+def parse_history_args(args):
+    """Validate the optional year bounds and session of a history query.
+
+    Returns:
+        dict: from_year, to_year (ints or None) and session.
+
+    Raises:
+        ValueError: If a year is not an integer or the session is unknown.
+    """
+    bounds = {}
+    for key in ('from_year', 'to_year'):
+        value = args.get(key) or (args.get('since') if key == 'from_year' else None)
+        try:
+            bounds[key] = int(value) if value else None
+        except ValueError:
+            raise ValueError(f"{key} must be an integer")
+    session = (args.get('session') or 'R').upper()
+    if session not in ('R', 'Q', 'S', 'SQ'):
+        raise ValueError("session must be R, Q, S or SQ")
+    bounds['session'] = session
+    return bounds
@@ -0,0 +1,214 @@
+import os
+import logging
+import datetime
+import threading
+
+from race_model import format_timestamp
+from serialization import read_json_file, write_json_file
+
+logger = logging.getLogger(__name__)
+
+# Number of change entries kept per season
+MAX_CHANGE_LOG_ENTRIES = 1000
+
+# Race attributes compared field by field (status is derived by the scheduler)
+DETAIL_FIELDS = ('name', 'official_name', 'country', 'location')
+
+
+def _race_keys(races):
+    """Key races by round; testing events (round 0 or None) by name and occurrence.
+
+    Seasons can hold several tests, all numbered 0 and sometimes sharing a
+    name, so each one is told apart by how many same-named tests precede it.
+    """
+    keys = []
+    seen = {}
+    for race in races:
+        if race.round:
+            keys.append(race.round)
+        else:
+            occurrence = seen.get(race.name, 0)
+            seen[race.name] = occurrence + 1
+            keys.append(("test", race.name, occurrence))
+    return keys
+
+
+def diff_races(old, new):
+    """Compare two versions of the same round.
+
+    Args:
+        old (Race): The stored race.
+        new (Race): The freshly fetched race.
+
+    Returns:
+        list: Change entries (without sequence numbers).
+    """
+    changes = []
+    round_number = new.round
+
+    if (old.format, old.is_sprint) != (new.format, new.is_sprint):
+        changes.append({"round": round_number, "type": "format_changed",
+                        "old": old.format, "new": new.format})
+
+    if old.date != new.date:
+        changes.append({"round": round_number, "type": "date_moved",
+                        "old": format_timestamp(old.date, old.date_offset),
+                        "new": format_timestamp(new.date, new.date_offset)})
+
+    for field in DETAIL_FIELDS:
+        if getattr(old, field) != getattr(new, field):
+            changes.append({"round": round_number, "type": "details_changed", "field": field,
+                            "old": getattr(old, field), "new": getattr(new, field)})
+
+    old_sessions = {session.key: session for session in old.sessions}
+    new_sessions = {session.key: session for session in new.sessions}
+    for key, session in new_sessions.items():
+        previous = old_sessions.get(key)
+        if previous is None or previous.start is None:
+            if session.start is not None:
+                changes.append({"round": round_number, "type": "session_added",
+                                "session": key, "new": session.start_iso})
+        elif session.start is None:
+            changes.append({"round": round_number, "type": "session_removed",
+                            "session": key, "old": previous.start_iso})
+        elif previous.start != session.start:
+            changes.append({"round": round_number, "type": "session_moved", "session": key,
+                            "old": previous.start_iso, "new": session.start_iso})
+    for key, previous in old_sessions.items():
+        if key not in new_sessions and previous.start is not None:
+            changes.append({"round": round_number, "type": "session_removed",
+                            "session": key, "old": previous.start_iso})
+
+    return changes
+
+
+def diff_seasons(old_season, new_season):
+    """Diff a stored season against a freshly fetched one, round by round.
+
+    Args:
+        old_season (SeasonCalendar): The stored season.
+        new_season (SeasonCalendar): The fetched season.
+
+    Returns:
+        list: Change entries ordered by round.
+    """
+    old_races = dict(zip(_race_keys(old_season.races), old_season.races))
+    new_races = dict(zip(_race_keys(new_season.races), new_season.races))
+
+    changes = []
+    for key, race in new_races.items():
+        previous = old_races.get(key)
+        if previous is None:
+            changes.append({"round": race.round, "type": "added", "name": race.name})
+        else:
+            changes.extend(diff_races(previous, race))
+    for key, previous in old_races.items():
+        if key not in new_races:
+            changes.append({"round": previous.round, "type": "cancelled", "name": previous.name})
+
+    changes.sort(key=lambda change: (change["round"] is None, change["round"] or 0))
+    return changes
+
+
+def merge_season(old_season, new_season, changes):
+    """Apply a diff to the stored season, replacing only the changed rounds.
+
+    Args:
+        old_season (SeasonCalendar): The stored season, updated in place.
+        new_season (SeasonCalendar): The fetched season.
+        changes (list): Output of diff_seasons.
+
+    Returns:
+        list: Positions of replaced races, or None if rounds were added or
+        removed (every position shifted).
+    """
+    if any(change["type"] in ("added", "cancelled") for change in changes):
+        old_season.races = new_season.races
+        return None
+
+    if not changes:
+        return []
+    new_races = dict(zip(_race_keys(new_season.races), new_season.races))
+    positions = []
+    for position, key in enumerate(_race_keys(old_season.races)):
+        # Testing events share round 0, so compare each race rather than trusting the round
+        if diff_races(old_season.races[position], new_races[key]):
+            old_season.races[position] = new_races[key]
+            positions.append(position)
+    return positions
+
+
+class ChangeLog:
+    """Persistent, sequence-numbered log of schedule changes for one season."""
+
+    def __init__(self, path):
+        """Load the log from path if it exists.
+
+        Args:
+            path (str): JSON file backing the log.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = []
+        self.latest = 0
+        if os.path.exists(path):
+            try:
+                data = read_json_file(path)
+                self.entries = data.get('changes', [])
+                self.latest = data.get('latest', 0)
+            except Exception as e:
+                logger.error(f"Error loading change log {path}: {e}")
+
+    def append(self, changes):
+        """Record a batch of changes from one refresh.
+
+        Args:
+            changes (list): Change entries from diff_seasons.
+
+        Returns:
+            int: The latest sequence number.
+        """
+        if not changes:
+            return self.latest
+
+        recorded_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        with self._lock:
+            for change in changes:
+                self.latest += 1
+                self.entries.append(dict(change, seq=self.latest, recorded_at=recorded_at))
+            self.entries = self.entries[-MAX_CHANGE_LOG_ENTRIES:]
+            try:
+                write_json_file(self.path, {"latest": self.latest, "changes": self.entries})
+            except Exception as e:
+                logger.error(f"Error saving change log {self.path}: {e}")
+        return self.latest
+
+    def since(self, since=None):
+        """Return entries newer than a sequence number or ISO timestamp.
+
+        Args:
+            since (int or str, optional): Last sequence number (or timestamp) the client saw.
+
+        Returns:
+            list: Matching entries in order.
+        """
+        with self._lock:
+            entries = list(self.entries)
+        if since is None:
+            return entries
+        if isinstance(since, int):
+            return [entry for entry in entries if entry['seq'] > since]
+
+        since_time = datetime.datetime.fromisoformat(since.replace('Z', '+00:00'))
+        if since_time.tzinfo is None:
+            since_time = since_time.replace(tzinfo=datetime.timezone.utc)
+        return [
+            entry for entry in entries
+            if datetime.datetime.fromisoformat(entry['recorded_at']) > since_time
+        ]
+
+    @property
+    def truncated_before(self):
+        """Sequence number of the oldest retained entry (older ones were dropped)."""
+        with self._lock:
+            return self.entries[0]['seq'] if self.entries else self.latest + 1
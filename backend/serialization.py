@@ -0,0 +1,200 @@
+import os
+import json
+import math
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Use orjson when it is installed, otherwise fall back to the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+class Schema:
+    """Typed description of a JSON payload.
+
+    Normalizing a payload through its schema puts the declared fields first,
+    in declared order, with consistent types. Both encoders then see exactly
+    the same structure, so the Flask, Netlify and persistence output match
+    (see dumps for the one float spelling difference). Unknown keys are passed through after
+    the declared ones.
+    """
+
+    def __init__(self, name, fields):
+        """Initialize the schema.
+
+        Args:
+            name (str): Schema name used in log messages.
+            fields (list): (key, type) pairs. The type is one of str, int,
+                bool, dict, list, a Schema, or ("map", Schema) / ("list", Schema).
+        """
+        self.name = name
+        self.fields = fields
+        self._keys = frozenset(key for key, _ in fields)
+
+    def normalize(self, payload):
+        """Return a copy of payload ordered and coerced according to the schema."""
+        if not isinstance(payload, dict):
+            return payload
+
+        normalized = {}
+        for key, field_type in self.fields:
+            if key in payload:
+                normalized[key] = self._coerce(payload[key], field_type)
+        for key, value in payload.items():
+            if key not in self._keys:
+                normalized[key] = value
+        return normalized
+
+    def _coerce(self, value, field_type):
+        """Coerce a single value; None is always allowed."""
+        if value is None or type(value) is field_type:
+            return value
+        if isinstance(field_type, Schema):
+            return field_type.normalize(value)
+        if isinstance(field_type, tuple):
+            container, item_schema = field_type
+            if container == "list":
+                return [item_schema.normalize(item) for item in value]
+            return {key: item_schema.normalize(item) for key, item in value.items()}
+        if field_type is bool:
+            return bool(value)
+        if field_type is int:
+            return int(value)
+        if field_type is str:
+            return str(value)
+        return value
+
+
+RACE_SCHEMA = Schema("race", [
+    ("round", int),
+    ("country", str),
+    ("location", str),
+    ("name", str),
+    ("official_name", str),
+    ("date", str),
+    ("status", str),
+    ("is_sprint", bool),
+    ("format", str),
+    ("sessions", dict),
+    ("session_status", dict),
+    ("circuit", dict),
+    ("local_sessions", dict),
+    ("timezone", str),
+])
+
+NEXT_RACE_SCHEMA = Schema("next_race", RACE_SCHEMA.fields + [
+    ("demo_mode", bool),
+    ("demo_notice", str),
+])
+
+CALENDAR_SCHEMA = Schema("calendar", [
+    ("year", str),
+    ("last_updated", str),
+    ("timezone", str),
+    ("races", ("list", RACE_SCHEMA)),
+])
+
+
+def _finite(obj):
+    """A copy of obj with NaN and infinite floats replaced by None (as orjson writes them)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def dumps(obj, indent=False):
+    """Encode obj to UTF-8 JSON bytes.
+
+    Both backends use compact separators by default, or two-space
+    indentation with indent=True, and write NaN and infinities as null.
+    The one difference left is the spelling of floats in exponent notation
+    (orjson writes 1e16 and 1e-7, the stdlib 1e+16 and 1e-07); they decode
+    to the same values.
+
+    Args:
+        obj: The object to encode.
+        indent (bool): Pretty-print with two-space indentation.
+
+    Returns:
+        bytes: The encoded JSON.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError as e:
+            # Types orjson does not know (or out-of-range ints) go through the stdlib
+            logger.debug(f"orjson could not encode payload, using stdlib: {e}")
+
+    obj = _finite(obj)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, allow_nan=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+
+def loads(data):
+    """Decode JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode(payload, schema=None, indent=False):
+    """Encode a response payload, normalizing it through a schema first.
+
+    Args:
+        payload: The payload to encode.
+        schema (Schema, optional): Schema describing the payload.
+        indent (bool): Pretty-print with two-space indentation.
+
+    Returns:
+        bytes: The encoded JSON.
+    """
+    if schema is not None:
+        payload = schema.normalize(payload)
+    return dumps(payload, indent=indent)
+
+
+def write_json_file(path, obj, schema=None, indent=True):
+    """Atomically write obj as JSON (indented by default) to path.
+
+    The data is written to a temporary file in the same directory and then
+    renamed over the destination, so readers never see a partial file.
+
+    Args:
+        path (str): Destination file.
+        obj: The object to write.
+        schema (Schema, optional): Schema describing the object.
+        indent (bool): Pretty-print; pass False to write the exact bytes
+            encode() returns for API responses.
+    """
+    data = encode(obj, schema=schema, indent=indent)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_json_file(path):
+    """Read and decode a JSON file."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -0,0 +1,450 @@
+import os
+import math
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+
+from job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# Calendar session keys and the FastF1 identifiers they load as (process_calendar
+# writes practice1..3; both spellings are accepted, as in ics_export.SESSION_LABELS)
+SESSION_IDENTIFIERS = {
+    'practice1': 'FP1',
+    'practice2': 'FP2',
+    'practice3': 'FP3',
+    'practice_1': 'FP1',
+    'practice_2': 'FP2',
+    'practice_3': 'FP3',
+    'sprint_qualifying': 'SQ',
+    'sprint_shootout': 'SS',
+    'sprint': 'S',
+    'qualifying': 'Q',
+    'race': 'R',
+}
+
+# FastF1 identifiers in weekend order
+SESSION_ORDER = list(dict.fromkeys(SESSION_IDENTIFIERS.values()))
+
+# Seconds between polls of the sessions that are on (or just finished)
+POLL_INTERVAL = float(os.environ.get('CONDITIONS_POLL_INTERVAL', '60'))
+
+# A session is polled from shortly before its start until its data has settled
+SESSION_WINDOW_BEFORE = 30 * 60
+SESSION_WINDOW_AFTER = 4 * 3600
+
+# Sessions whose series are kept in memory (LRU)
+MAX_CACHED_SESSIONS = 32
+
+# Weather columns kept from FastF1's weather_data, mapped to our keys
+WEATHER_FIELDS = [
+    ('AirTemp', 'air_temp'),
+    ('TrackTemp', 'track_temp'),
+    ('Humidity', 'humidity'),
+    ('Pressure', 'pressure'),
+    ('WindSpeed', 'wind_speed'),
+    ('WindDirection', 'wind_direction'),
+    ('Rainfall', 'rainfall'),
+]
+WEATHER_KEYS = [key for _, key in WEATHER_FIELDS]
+
+
+def _epochs(t0, times):
+    """Session-relative timedeltas as whole epoch seconds."""
+    return [None if math.isnan(seconds) else int(t0 + seconds) for seconds in times.dt.total_seconds()]
+
+
+def _column(values):
+    """A weather column as JSON-friendly values (NaN becomes None, floats keep one decimal)."""
+    column = []
+    for value in values.tolist():
+        if isinstance(value, float):
+            value = None if math.isnan(value) else round(value, 1)
+        column.append(value)
+    return column
+
+
+def _session_zero(date, status):
+    """Epoch of session time zero.
+
+    Session times count from the start of the timing feed, not from the
+    session start. The first "Started" status gives the session time of
+    the start, which happened at the scheduled date; without one, time zero
+    is taken as the scheduled date.
+
+    Args:
+        date (Timestamp): Scheduled session start (naive means UTC).
+        status (dict): Output of fastf1.api.session_status_data.
+    """
+    start = date.tz_localize('UTC').timestamp() if date.tzinfo is None else date.timestamp()
+    for t, value in zip(status.get('Time') or [], status.get('Status') or []):
+        if value == 'Started' and t is not None:
+            return start - t.total_seconds()
+    return start
+
+
+def load_session_side_data(year, round_number, identifier):
+    """Load one session's weather and track status from FastF1.
+
+    Only the session status, weather and track status feeds are requested
+    (no laps, telemetry, results or driver info), so a poll costs three
+    small livetiming requests.
+
+    Returns:
+        dict: {"weather": {"t": [...], "air_temp": [...], ...},
+        "track_status": [{"t", "status", "message"}, ...]} with t in epoch seconds.
+    """
+    import fastf1
+    import pandas as pd
+    from fastf1 import api
+
+    session = fastf1.get_session(int(year), int(round_number), identifier)
+    t0 = _session_zero(session.date, api.session_status_data(session.api_path))
+
+    weather = {"t": []}
+    weather.update({key: [] for key in WEATHER_KEYS})
+    frame = pd.DataFrame(api.weather_data(session.api_path))
+    if not frame.empty:
+        weather["t"] = _epochs(t0, frame['Time'])
+        for column, key in WEATHER_FIELDS:
+            weather[key] = _column(frame[column]) if column in frame else [None] * len(frame)
+
+    track_status = []
+    frame = pd.DataFrame(api.track_status_data(session.api_path))
+    if not frame.empty:
+        for t, status, message in zip(_epochs(t0, frame['Time']), frame['Status'], frame['Message']):
+            track_status.append({"t": t, "status": str(status), "message": str(message)})
+    return {"weather": weather, "track_status": track_status}
+
+
+class SessionSeries:
+    """Compact time series of one session: weather columns and track status changes.
+
+    Weather is stored column-wise (one list per measurement, aligned with
+    the "t" list of epoch seconds); track status is the list of changes.
+    Both only grow: a refresh appends the rows newer than the last one held.
+    """
+
+    __slots__ = ('year', 'round', 'session', 'weather', 'track_status', 'version', 'updated_at')
+
+    def __init__(self, year, round_number, session):
+        self.year = int(year)
+        self.round = int(round_number)
+        self.session = session
+        self.weather = {"t": []}
+        self.weather.update({key: [] for key in WEATHER_KEYS})
+        self.track_status = []
+        self.version = 0
+        self.updated_at = None
+
+    def extend(self, side_data, now):
+        """Append the rows of a fresh load that are newer than what is held.
+
+        Returns:
+            int: Number of rows appended.
+        """
+        appended = 0
+        weather = side_data.get("weather") or {}
+        times = weather.get("t") or []
+        last = self.weather["t"][-1] if self.weather["t"] else None
+        for position, t in enumerate(times):
+            if t is None or (last is not None and t <= last):
+                continue
+            self.weather["t"].append(t)
+            for key in WEATHER_KEYS:
+                values = weather.get(key) or []
+                self.weather[key].append(values[position] if position < len(values) else None)
+            last = t
+            appended += 1
+
+        last = self.track_status[-1]["t"] if self.track_status else None
+        for change in side_data.get("track_status") or []:
+            if change["t"] is None or (last is not None and change["t"] <= last):
+                continue
+            self.track_status.append(change)
+            last = change["t"]
+            appended += 1
+
+        self.updated_at = now
+        if appended:
+            self.version += 1
+        return appended
+
+    def weather_since(self, since=None):
+        """Weather columns for rows after since (epoch), or all rows."""
+        start = 0 if since is None else bisect.bisect_right(self.weather["t"], since)
+        return {key: values[start:] for key, values in self.weather.items()}
+
+    def track_status_since(self, since=None):
+        """Track status changes after since (epoch), or all of them."""
+        if since is None:
+            return list(self.track_status)
+        return [change for change in self.track_status if change["t"] > since]
+
+    def latest(self):
+        """The most recent weather reading and track status, or None for each."""
+        weather = None
+        if self.weather["t"]:
+            weather = {key: values[-1] for key, values in self.weather.items()}
+        return {
+            "session": self.session,
+            "weather": weather,
+            "track_status": self.track_status[-1] if self.track_status else None
+        }
+
+    def header(self):
+        """Session, version and the newest row time (pass it back as since)."""
+        times = []
+        if self.weather["t"]:
+            times.append(self.weather["t"][-1])
+        if self.track_status:
+            times.append(self.track_status[-1]["t"])
+        return {
+            "session": self.session,
+            "version": self.version,
+            "updated_at": self.updated_at,
+            "latest": max(times) if times else None
+        }
+
+
+class SessionConditions:
+    """Weather and track status of the current weekend, served from memory.
+
+    A background thread polls the sessions that are on or recently ended
+    (by the fetcher's clock, so time travel replays a weekend) and appends
+    what is new to each session's series. Only weekends of the tracked
+    season are served. Requests only read those series and the stored
+    calendar; a weekend that is not held yet is queued for a single load
+    worker and the request is told to come back.
+    """
+
+    def __init__(self, calendar_fetcher, loader=load_session_side_data, year=None,
+                 poll_interval=POLL_INTERVAL, max_sessions=MAX_CACHED_SESSIONS):
+        """Initialize the store.
+
+        Args:
+            calendar_fetcher (RaceCalendarFetcher): Source of session start times and the clock.
+            loader (callable): (year, round, identifier) -> side data dict.
+            year (int, optional): Season to poll and serve; defaults to the fetcher's season.
+            poll_interval (float): Seconds between polls.
+            max_sessions (int): Session series kept in memory (LRU).
+        """
+        self.calendar_fetcher = calendar_fetcher
+        self.loader = loader
+        self.year = int(year if year is not None else calendar_fetcher.year)
+        self.poll_interval = poll_interval
+        self.max_sessions = max_sessions
+        self.version = 0
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = set()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        # Weekends requested but not held, loaded one at a time
+        self._loads = JobQueue({"weekend": self._load}, workers=1)
+
+    def start(self):
+        """Start the polling thread if it is not already running."""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="session-conditions", daemon=True)
+            self._thread.start()
+        logger.info(f"Session conditions polling every {self.poll_interval:.0f}s")
+
+    def stop(self):
+        """Stop the polling thread."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._loads.stop(timeout=5)
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling session conditions: {e}", exc_info=True)
+            with self._condition:
+                if not self._stopped:
+                    self._condition.wait(timeout=self.poll_interval)
+                if self._stopped:
+                    return
+
+    def active_sessions(self, now=None):
+        """(year, round, identifier) of the sessions inside their polling window."""
+        now = self.calendar_fetcher.clock() if now is None else now
+        season = self.calendar_fetcher.get_stored_season(str(self.year))
+        if season is None:
+            return []
+        active = []
+        for race in season.races:
+            for session in race.sessions:
+                identifier = SESSION_IDENTIFIERS.get(session.key)
+                if identifier is None or session.start is None:
+                    continue
+                if session.start - SESSION_WINDOW_BEFORE <= now <= session.start + SESSION_WINDOW_AFTER:
+                    active.append((int(self.year), race.round, identifier))
+        return active
+
+    def poll(self, now=None):
+        """Refresh every active session.
+
+        Returns:
+            int: Rows appended across sessions.
+        """
+        appended = 0
+        for key in self.active_sessions(now):
+            try:
+                appended += self.refresh(*key)
+            except Exception as e:
+                logger.warning(f"Could not load conditions for {key}: {e}")
+        return appended
+
+    def refresh(self, year, round_number, identifier):
+        """Load one session's side data and append what is new.
+
+        Returns:
+            int: Rows appended.
+        """
+        side_data = self.loader(year, round_number, identifier)
+        key = (int(year), int(round_number), identifier)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = SessionSeries(*key)
+            self._series.move_to_end(key)
+            appended = series.extend(side_data, self.calendar_fetcher.clock())
+            if appended:
+                self.version += 1
+            while len(self._series) > self.max_sessions:
+                self._series.popitem(last=False)
+        if appended:
+            logger.info(f"Appended {appended} condition rows for {key} (version {series.version})")
+        return appended
+
+    def _weekend(self, year, round_number, session=None):
+        """Series held for a weekend (optionally one session), in session order."""
+        order = SESSION_ORDER
+        with self._lock:
+            held = [series for key, series in self._series.items()
+                    if key[0] == int(year) and key[1] == int(round_number)
+                    and (session is None or key[2] == session)]
+        return sorted(held, key=lambda series: order.index(series.session) if series.session in order else len(order))
+
+    def _race(self, year, round_number):
+        """A round of the tracked season from the stored calendar, or None."""
+        if int(year) != self.year:
+            return None
+        season = self.calendar_fetcher.get_stored_season(str(self.year))
+        if season is None:
+            return None
+        return next((race for race in season.races if race.round == int(round_number)), None)
+
+    def _load(self, year, round_number, identifiers):
+        """Load job: fetch the sessions of a weekend."""
+        key = (int(year), int(round_number))
+        try:
+            for identifier in identifiers:
+                try:
+                    self.refresh(year, round_number, identifier)
+                except Exception as e:
+                    logger.warning(f"Could not load conditions for {year} round {round_number} {identifier}: {e}")
+        finally:
+            with self._lock:
+                self._loading.discard(key)
+        return {"year": int(year), "round": int(round_number), "sessions": list(identifiers)}
+
+    def _load_weekend(self, race, session=None):
+        """Queue a load of a weekend's started sessions (once at a time).
+
+        Returns:
+            bool: True if a load was queued.
+        """
+        identifiers = (session,) if session else tuple(
+            SESSION_IDENTIFIERS[item.key] for item in race.sessions
+            if item.key in SESSION_IDENTIFIERS and item.start is not None
+            and item.start <= self.calendar_fetcher.clock())
+        if not identifiers:
+            return False
+        key = (self.year, race.round)
+        with self._lock:
+            if key in self._loading:
+                return False
+            self._loading.add(key)
+        self._loads.enqueue("weekend", year=self.year, round_number=race.round, identifiers=identifiers)
+        return True
+
+    def _query(self, kind, year, round_number, session=None, since=None):
+        session = session.upper() if session else None
+        if session is not None and session not in SESSION_ORDER:
+            raise ValueError(f"Unknown session {session}; expected one of {', '.join(SESSION_ORDER)}")
+        race = self._race(year, round_number)
+        if race is None:
+            return None
+        self.start()
+        held = self._weekend(year, round_number, session)
+        if not held:
+            self._load_weekend(race, session)
+            with self._lock:
+                loading = (int(year), int(round_number)) in self._loading
+            return {"year": int(year), "round": int(round_number), "loading": loading, "sessions": {}}
+        with self._lock:
+            sessions = {}
+            for series in held:
+                entry = series.header()
+                if kind == 'weather':
+                    entry["weather"] = series.weather_since(since)
+                else:
+                    entry["track_status"] = series.track_status_since(since)
+                sessions[series.session] = entry
+        return {"year": int(year), "round": int(round_number), "loading": False, "sessions": sessions}
+
+    def weather(self, year, round_number, session=None, since=None):
+        """Weather series of a weekend from memory.
+
+        Args:
+            year (int): Season.
+            round_number (int): Round.
+            session (str, optional): Only this session (FP1, Q, R...).
+            since (float, optional): Only rows after this epoch, for incremental polling.
+
+        Returns:
+            dict: Per-session series; "loading" is True (and "sessions"
+            empty) while a weekend that was not held is being loaded. None
+            if the round is not part of the tracked season.
+
+        Raises:
+            ValueError: If the session is unknown.
+        """
+        return self._query('weather', year, round_number, session, since)
+
+    def track_status(self, year, round_number, session=None, since=None):
+        """Track status changes of a weekend from memory (see weather for the arguments)."""
+        return self._query('track_status', year, round_number, session, since)
+
+    def summary(self, year, round_number):
+        """Latest reading of the weekend's most recent session with data, or None."""
+        held = self._weekend(year, round_number)
+        with self._lock:
+            for series in reversed(held):
+                latest = series.latest()
+                if latest["weather"] or latest["track_status"]:
+                    return latest
+        return None
+
+    def stats(self):
+        """Held sessions and polling state for metrics."""
+        with self._lock:
+            return {
+                "sessions": len(self._series),
+                "version": self.version,
+                "loading": len(self._loading),
+                "polling": self._thread is not None and self._thread.is_alive()
+            }
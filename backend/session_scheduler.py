@@ -0,0 +1,325 @@
+import heapq
+import logging
+import threading
+import time
+
+from race_model import SeasonCalendar
+from ics_export import DEFAULT_SESSION_DURATION, SESSION_DURATIONS
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long the timer sleeps between checks (guards against clock jumps)
+MAX_SLEEP_SECONDS = 3600
+
+# Boundary kinds pushed onto the heap
+RACE_DAY = "race_day"
+RACE_START = "race_start"
+SESSION_START = "session_start"
+SESSION_END = "session_end"
+
+
+def utc_day_start(epoch):
+    """Return the epoch of midnight UTC on the day containing epoch."""
+    return epoch - (epoch % 86400)
+
+
+def session_end(session):
+    """Epoch a session is expected to end: its start plus the typical duration of its kind."""
+    return session.start + SESSION_DURATIONS.get(session.key, DEFAULT_SESSION_DURATION) * 60
+
+
+def status_boundaries(season):
+    """Sorted epochs at which a race or session status of the season can change.
+
+    Every instant between two consecutive boundaries sees the same statuses
+    and the same next race, so the boundaries split time into windows that
+    time-dependent responses can be cached by.
+    """
+    boundaries = set()
+    for race in season.races:
+        if race.date is not None:
+            boundaries.add(race.date)
+            boundaries.add(utc_day_start(race.date))
+        for session in race.sessions:
+            if session.start is not None:
+                boundaries.add(session.start)
+                boundaries.add(session_end(session))
+    return sorted(boundaries)
+
+
+def evaluate_season(season, now):
+    """Statuses and next race of a season as they are (or were) at another instant.
+
+    The season is copied and tracked by a scratch scheduler without a timer
+    thread, so the live season and scheduler are not affected.
+
+    Args:
+        season (SeasonCalendar): The season (not modified).
+        now (float): The instant (epoch).
+
+    Returns:
+        tuple: (SeasonCalendar copy with statuses at now, next race dict or None)
+    """
+    scratch = SeasonCalendar.from_dict(season.to_dict(), year=season.year)
+    scheduler = SessionScheduler(clock=lambda: now, autostart=False)
+    scheduler.track(season.year, scratch)
+    return scratch, scheduler.next_race(season.year)
+
+
+class SessionScheduler:
+    """Keep race and session status current using a min-heap of boundaries.
+
+    Every session start and end time for the tracked seasons is pushed
+    onto a heap. A single timer thread sleeps until the earliest boundary,
+    then updates the cached SeasonCalendar in place and bumps its version,
+    so request handlers only read precomputed state and never compare dates
+    themselves.
+
+    A session is "future" before its start, "live" from its start and
+    "completed" from its end (start plus SESSION_DURATIONS of its kind).
+    """
+
+    def __init__(self, clock=time.time, autostart=True):
+        """Initialize an empty scheduler.
+
+        Args:
+            clock (callable): Returns the current epoch (see clock.create_clock).
+            autostart (bool): Start the timer thread when a season is tracked;
+                scratch schedulers that only evaluate one instant leave it off.
+        """
+        self.clock = clock
+        self.autostart = autostart
+        self._heap = []
+        self._sequence = 0
+        self._calendars = {}
+        self._generations = {}
+        self._race_order = {}
+        self._next_races = {}
+        self._listeners = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def track(self, year, season, now=None):
+        """Start (or restart) tracking the boundaries of a season.
+
+        Statuses in the season are brought up to date immediately and the
+        remaining future boundaries are queued.
+
+        Args:
+            year (str): The season year.
+            season (SeasonCalendar): The season, updated in place.
+            now (float, optional): Reference epoch, defaults to the clock.
+        """
+        year = str(year)
+        if now is None:
+            now = self.clock()
+
+        with self._condition:
+            generation = self._generations.get(year, 0) + 1
+            self._generations[year] = generation
+            self._calendars[year] = season
+
+            order = []
+            changed = []
+            boundaries = 0
+            for index, race in enumerate(season.races):
+                previous = (race.status, tuple(session.status for session in race.sessions))
+                race_epoch = race.date
+                if race_epoch is None:
+                    race.status = "future"
+                else:
+                    order.append((race_epoch, index))
+                    day_start = utc_day_start(race_epoch)
+                    if race_epoch < now:
+                        race.status = "completed"
+                    elif day_start <= now:
+                        race.status = "current"
+                        self._push(race_epoch, year, generation, index, RACE_START, None)
+                        boundaries += 1
+                    else:
+                        race.status = "future"
+                        self._push(day_start, year, generation, index, RACE_DAY, None)
+                        self._push(race_epoch, year, generation, index, RACE_START, None)
+                        boundaries += 2
+
+                for session_index, session in enumerate(race.sessions):
+                    if session.start is None:
+                        session.status = None
+                        continue
+                    end = session_end(session)
+                    if end <= now:
+                        session.status = "completed"
+                    elif session.start <= now:
+                        session.status = "live"
+                        self._push(end, year, generation, index, SESSION_END, session_index)
+                        boundaries += 1
+                    else:
+                        session.status = "future"
+                        self._push(session.start, year, generation, index, SESSION_START, session_index)
+                        self._push(end, year, generation, index, SESSION_END, session_index)
+                        boundaries += 2
+
+                if previous != (race.status, tuple(session.status for session in race.sessions)):
+                    changed.append(index)
+
+            if changed:
+                season.touch(changed)
+            order.sort()
+            self._race_order[year] = order
+            self._next_races[year] = self._compute_next_race(year, now)
+            self._condition.notify_all()
+
+        logger.info(f"Scheduler tracking {year}: {boundaries} pending boundaries")
+        self._notify(year, "reload")
+        if self.autostart:
+            self.start()
+
+    def untrack(self, year):
+        """Stop tracking a season."""
+        year = str(year)
+        with self._condition:
+            self._generations[year] = self._generations.get(year, 0) + 1
+            self._calendars.pop(year, None)
+            self._race_order.pop(year, None)
+            self._next_races.pop(year, None)
+
+    def next_race(self, year):
+        """Return the precomputed next race for a season.
+
+        Args:
+            year (str): The season year.
+
+        Returns:
+            dict: The next race, a demo copy of round 1 if every race is in
+            the past, or None if the season is not tracked or has no races.
+        """
+        with self._condition:
+            year = str(year)
+            index = self._next_races.get(year)
+            if index is None:
+                return None
+            races = self._calendars[year].to_dict()['races']
+            if index >= 0:
+                return races[index]
+
+        # For demo/testing, pretend the first race is upcoming
+        demo_race = races[0].copy()
+        demo_race['status'] = 'future'
+        demo_race['demo_mode'] = True
+        return demo_race
+
+    def add_listener(self, callback):
+        """Register callback(year, reason) to be called after state changes."""
+        self._listeners.append(callback)
+
+    def next_boundary(self):
+        """Return the epoch of the earliest pending boundary, or None."""
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def advance(self, now=None):
+        """Apply every boundary that is due.
+
+        Args:
+            now (float, optional): Reference epoch, defaults to the clock.
+
+        Returns:
+            int: Number of boundaries applied.
+        """
+        if now is None:
+            now = self.clock()
+
+        applied = 0
+        changed = {}
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                epoch, _, year, generation, index, kind, session_index = heapq.heappop(self._heap)
+                if self._generations.get(year) != generation:
+                    continue
+                race = self._calendars[year].races[index]
+                if kind == RACE_DAY:
+                    race.status = "current"
+                elif kind == RACE_START:
+                    race.status = "completed"
+                elif kind == SESSION_START:
+                    race.sessions[session_index].status = "live"
+                else:
+                    race.sessions[session_index].status = "completed"
+                logger.info(f"Boundary passed: {race.name} {kind}")
+                applied += 1
+                changed.setdefault(year, set()).add(index)
+
+            for year, positions in changed.items():
+                self._calendars[year].touch(positions)
+                self._next_races[year] = self._compute_next_race(year, now)
+
+        for year in changed:
+            self._notify(year, "boundary")
+        return applied
+
+    def start(self):
+        """Start the timer thread if it is not already running."""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="session-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the timer thread."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        """Timer loop: sleep until the earliest boundary, then apply it."""
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                self._discard_stale()
+                if self._heap:
+                    delay = min(max(self._heap[0][0] - self.clock(), 0), MAX_SLEEP_SECONDS)
+                else:
+                    delay = MAX_SLEEP_SECONDS
+                if delay > 0:
+                    self._condition.wait(timeout=delay)
+                if self._stopped:
+                    return
+            try:
+                self.advance()
+            except Exception as e:
+                logger.error(f"Error applying scheduled boundaries: {e}", exc_info=True)
+
+    def _push(self, epoch, year, generation, index, kind, session_index):
+        """Push a boundary onto the heap (caller holds the lock)."""
+        self._sequence += 1
+        heapq.heappush(self._heap, (epoch, self._sequence, year, generation, index, kind, session_index))
+
+    def _discard_stale(self):
+        """Drop boundaries left over from a previous generation (caller holds the lock)."""
+        while self._heap and self._generations.get(self._heap[0][2]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+
+    def _compute_next_race(self, year, now):
+        """Find the index of the next race (-1 for demo mode, None if no races).
+
+        Caller holds the lock.
+        """
+        for race_epoch, index in self._race_order.get(year, []):
+            if race_epoch > now:
+                return index
+        return -1 if self._calendars[year].races else None
+
+    def _notify(self, year, reason):
+        """Call listeners outside the lock."""
+        for callback in list(self._listeners):
+            try:
+                callback(year, reason)
+            except Exception as e:
+                logger.error(f"Scheduler listener failed: {e}", exc_info=True)
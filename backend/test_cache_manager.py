@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from cache_manager import USAGE_FILE, CacheManager
+
+
+def make_session(cache_dir, year, event, session, size, mtime):
+    """Create a synthetic FastF1 session directory with one file of the given size."""
+    path = os.path.join(cache_dir, str(year), event, session)
+    os.makedirs(path, exist_ok=True)
+    data_file = os.path.join(path, 'timing_data.ff1pkl')
+    with open(data_file, 'wb') as f:
+        f.write(b'x' * size)
+    os.utime(data_file, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache = tmp_path / 'cache'
+    cache.mkdir()
+    make_session(str(cache), 2022, '2022-03-20_Bahrain_Grand_Prix', '2022-03-20_Race', 400, 1000)
+    make_session(str(cache), 2022, '2022-03-27_Saudi_Arabian_Grand_Prix', '2022-03-27_Race', 300, 2000)
+    make_session(str(cache), 2023, '2023-03-05_Bahrain_Grand_Prix', '2023-03-05_Race', 200, 3000)
+    make_session(str(cache), 2025, '2025-03-16_Australian_Grand_Prix', '2025-03-16_Race', 500, 500)
+    (cache / 'fastf1_http_cache.sqlite').write_bytes(b'y' * 100)
+    return str(cache)
+
+
+def test_scan_reports_usage_per_season(cache_dir):
+    manager = CacheManager(cache_dir, quota_bytes=10_000, pinned_years=[2025], clock=lambda: 5000)
+    sessions = manager.scan()
+
+    usage = manager.usage()
+    assert len(sessions) == 4
+    assert usage["by_season"] == {"2022": 700, "2023": 200, "2025": 500}
+    assert usage["other_bytes"] == 100
+    assert usage["total_bytes"] == 1500
+
+
+def test_enforce_evicts_least_recently_used_first(cache_dir):
+    manager = CacheManager(cache_dir, quota_bytes=1000, pinned_years=[2025], clock=lambda: 5000)
+    evicted = manager.enforce()
+
+    # 1500 bytes over a 1000 quota: the oldest unpinned session (400) and the next (300) go
+    assert evicted == [
+        "2022/2022-03-20_Bahrain_Grand_Prix/2022-03-20_Race",
+        "2022/2022-03-27_Saudi_Arabian_Grand_Prix/2022-03-27_Race",
+    ]
+    assert manager.usage()["total_bytes"] == 800
+    # Emptied event and year directories are removed
+    assert not os.path.exists(os.path.join(cache_dir, '2022'))
+
+
+def test_pinned_season_is_never_evicted(cache_dir):
+    manager = CacheManager(cache_dir, quota_bytes=100, pinned_years=[2025], clock=lambda: 5000)
+    manager.enforce()
+
+    assert os.path.isdir(os.path.join(cache_dir, '2025', '2025-03-16_Australian_Grand_Prix', '2025-03-16_Race'))
+    assert manager.usage()["by_season"] == {"2025": 500}
+
+
+def test_touch_protects_recently_used_session(cache_dir):
+    manager = CacheManager(cache_dir, quota_bytes=1200, pinned_years=[2025], clock=lambda: 9000)
+    manager.touch('/static/2022/2022-03-20_Bahrain_Grand_Prix/2022-03-20_Race/')
+    evicted = manager.enforce()
+
+    assert evicted == ["2022/2022-03-27_Saudi_Arabian_Grand_Prix/2022-03-27_Race"]
+    assert os.path.exists(os.path.join(cache_dir, USAGE_FILE))
+
+    # Usage survives a restart
+    reloaded = CacheManager(cache_dir, quota_bytes=1200, pinned_years=[2025], clock=lambda: 9000)
+    keys = {session.key: session.last_used for session in reloaded.scan()}
+    assert keys["2022/2022-03-20_Bahrain_Grand_Prix/2022-03-20_Race"] == 9000
+
+
+def test_under_quota_evicts_nothing(cache_dir):
+    manager = CacheManager(cache_dir, quota_bytes=10_000, pinned_years=[], clock=lambda: 5000)
+
+    assert manager.enforce() == []
+    assert manager.usage()["sessions"] == 4
+
+
+def test_usage_before_scan_does_not_touch_disk(tmp_path):
+    manager = CacheManager(str(tmp_path / 'missing'), quota_bytes=10, pinned_years=[])
+
+    assert manager.usage()["scanned_at"] is None
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from calendar_archive import (ARCHIVE_FILE, ArchiveError, CalendarArchive, build, season_is_final,
+                              write_archive)
+from serialization import write_json_file
+
+NOW = 1767225600  # 2026-01-01T00:00:00Z
+
+
+def make_calendar(year, races=3):
+    return {
+        "year": str(year),
+        "last_updated": f"{year}-12-31T00:00:00+00:00",
+        "races": [
+            {"round": number, "name": f"Grand Prix {number}", "date": f"{year}-0{number}-10T14:00:00+00:00",
+             "status": "completed", "sessions": {"race": f"{year}-0{number}-10T14:00:00+00:00"}}
+            for number in range(1, races + 1)
+        ]
+    }
+
+
+def test_only_finished_seasons_are_final():
+    assert season_is_final(make_calendar(1950), NOW)
+    assert not season_is_final(make_calendar(2026), NOW)
+    assert not season_is_final({"year": "1950", "races": []}, NOW)
+
+
+def test_seasons_are_read_back_individually(tmp_path):
+    path = str(tmp_path / ARCHIVE_FILE)
+    assert write_archive(path, {"1950": make_calendar(1950), "1951": make_calendar(1951, races=5)}, NOW) == \
+        ["1950", "1951"]
+
+    archive = CalendarArchive(path)
+    assert archive.years() == ["1950", "1951"]
+    assert "1951" in archive and "2025" not in archive
+    assert archive.stats()["reads"] == 0
+    assert archive.read("1951") == make_calendar(1951, races=5)
+    assert archive.read("2025") is None
+    assert archive.stats()["reads"] == 1
+
+
+def test_archived_seasons_are_never_replaced(tmp_path):
+    path = str(tmp_path / ARCHIVE_FILE)
+    write_archive(path, {"1950": make_calendar(1950)}, NOW)
+    changed = make_calendar(1950, races=1)
+
+    assert write_archive(path, {"1950": changed, "1952": make_calendar(1952)}, NOW) == ["1952"]
+    archive = CalendarArchive(path)
+    assert archive.read("1950") == make_calendar(1950)
+    assert archive.read("1952") == make_calendar(1952)
+
+    with pytest.raises(ValueError):
+        write_archive(path, {"2026": make_calendar(2026)}, NOW)
+
+
+def test_reader_picks_up_a_rebuilt_archive(tmp_path):
+    path = str(tmp_path / ARCHIVE_FILE)
+    write_archive(path, {"1950": make_calendar(1950)}, NOW)
+    archive = CalendarArchive(path)
+    assert archive.years() == ["1950"]
+
+    write_archive(path, {"1951": make_calendar(1951)}, NOW)
+    assert archive.years() == ["1950", "1951"]
+
+
+def test_corrupt_season_is_detected(tmp_path):
+    path = str(tmp_path / ARCHIVE_FILE)
+    write_archive(path, {"1950": make_calendar(1950)}, NOW)
+    archive = CalendarArchive(path)
+    offset = archive.index()["1950"]["offset"]
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.write(b'\x00\x00\x00\x00')
+    with pytest.raises(ArchiveError):
+        CalendarArchive(path).read("1950")
+
+
+def test_build_archives_finished_json_calendars(tmp_path):
+    data_dir = str(tmp_path)
+    for year in (1950, 1951, 2026):
+        write_json_file(os.path.join(data_dir, f'f1_calendar_{year}.json'), make_calendar(year))
+
+    assert build(data_dir, prune=True, now=NOW) == ["1950", "1951"]
+    assert sorted(os.listdir(data_dir)) == ['f1_calendar_2026.json', ARCHIVE_FILE]
+    assert CalendarArchive(os.path.join(data_dir, ARCHIVE_FILE)).read("1950") == make_calendar(1950)
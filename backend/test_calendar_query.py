@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+pytest.importorskip("fastf1")
+
+from calendar_index import CalendarQuery
+from race_calendar_fetcher import RaceCalendarFetcher
+from serialization import write_json_file
+
+NOW = 1744556400  # 2025-04-13T15:00:00Z
+
+
+def make_calendar(year):
+    return {"year": str(year), "races": [
+        {"round": 1, "name": "Bahrain Grand Prix", "date": f"{year}-04-13T15:00:00+00:00",
+         "sessions": {"race": f"{year}-04-13T15:00:00+00:00"}}]}
+
+
+def test_query_serves_stored_seasons_and_backfills_the_rest(tmp_path):
+    data_dir = str(tmp_path / "data")
+    fetcher = RaceCalendarFetcher(data_dir=data_dir, cache_dir=str(tmp_path / "cache"), clock=lambda: NOW)
+    write_json_file(os.path.join(data_dir, 'f1_calendar_2024.json'), make_calendar(2024))
+    refreshed = []
+
+    def refresh_calendar(year):
+        refreshed.append(year)
+        write_json_file(os.path.join(data_dir, f'f1_calendar_{year}.json'), make_calendar(year))
+        return {"year": year}
+
+    fetcher.refresh_calendar = refresh_calendar
+
+    result = fetcher.query_calendars(["2023", "2024"], CalendarQuery())
+    assert result["total"] == 1
+    assert result["races"][0]["year"] == "2024"
+    assert result["missing_years"] == ["2023"]
+
+    fetcher.query_calendars(["2023"], CalendarQuery())
+    fetcher.backfill.stop(timeout=5)
+    assert refreshed == ["2023"]
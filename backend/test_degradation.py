@@ -0,0 +1,79 @@
+from circuit_breaker import CircuitBreaker
+from degradation import DegradationPolicy, FRESH, STALE, UNAVAILABLE
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_policy(clock, failure_threshold=3, reset_timeout=300):
+    breaker = CircuitBreaker("fastf1", failure_threshold=failure_threshold,
+                             reset_timeout=reset_timeout, clock=clock)
+    return breaker, DegradationPolicy(breaker, base=30, maximum=120, clock=clock)
+
+
+def test_failed_refresh_serves_last_known_good_as_stale():
+    clock = FakeClock()
+    _, policy = make_policy(clock)
+    assert policy.assess("2025", available=True, age=60).tier == FRESH
+
+    policy.record_failure("2025", "upstream timeout")
+    freshness = policy.assess("2025", available=True, age=60)
+    assert freshness.tier == STALE
+    assert freshness.error == "upstream timeout"
+    assert freshness.headers() == {'Retry-After': '30', 'X-Data-Age': '60', 'X-Data-Stale': 'true'}
+    assert freshness.mark({"round": 5}) == {"round": 5, "stale": True, "age_seconds": 60}
+
+    assert policy.assess("2025", available=False).tier == UNAVAILABLE
+    assert policy.assess("2024", available=True).tier == FRESH
+
+
+def test_retries_back_off_and_are_claimed_once():
+    clock = FakeClock()
+    _, policy = make_policy(clock)
+
+    assert policy.record_failure("2025", "down") == 30
+    assert not policy.claim_retry("2025")
+
+    clock.now += 30
+    assert policy.claim_retry("2025")
+    assert not policy.claim_retry("2025")
+    policy.release_retry("2025")
+
+    assert policy.record_failure("2025", "down") == 60
+    assert policy.record_failure("2025", "down") == 120
+    assert policy.record_failure("2025", "down") == 120
+    assert policy.retry_after("2025") == 120
+
+    policy.record_success("2025")
+    assert policy.healthy("2025")
+    assert policy.last_success("2025") == clock.now
+
+
+def test_open_breaker_degrades_every_season_until_it_can_retry():
+    clock = FakeClock()
+    breaker, policy = make_policy(clock, failure_threshold=1, reset_timeout=300)
+    try:
+        breaker.call(lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+
+    assert not policy.healthy("2024")
+    assert policy.assess("2024", available=True).tier == STALE
+    assert policy.retry_after("2024") == 300
+    assert not policy.claim_retry("2024")
+
+    clock.now += 300
+    assert policy.claim_retry("2024")
+
+
+def test_fresh_responses_are_unchanged():
+    _, policy = make_policy(FakeClock())
+    freshness = policy.assess("2025", available=True, age=10)
+    payload = {"round": 1}
+    assert freshness.headers() == {}
+    assert freshness.mark(payload) is payload
@@ -0,0 +1,34 @@
+import re
+
+from ics_export import render_feed
+from race_model import SeasonCalendar
+
+SEASON = SeasonCalendar.from_dict({"year": "2025", "last_updated": "2025-01-01T00:00:00+00:00", "races": [
+    {"round": 0, "name": "Pre-Season Testing", "date": "2025-02-26T07:00:00+00:00",
+     "sessions": {"practice1": "2025-02-26T07:00:00+00:00", "practice2": "2025-02-27T07:00:00+00:00"}},
+    {"round": 0, "name": "Pre-Season Testing", "date": "2025-03-05T07:00:00+00:00",
+     "sessions": {"practice1": "2025-03-05T07:00:00+00:00", "practice2": "2025-03-06T07:00:00+00:00"}},
+    {"round": 1, "name": "Australian Grand Prix", "date": "2025-03-16T04:00:00+00:00",
+     "sessions": {"qualifying": "2025-03-15T05:00:00+00:00", "race": "2025-03-16T04:00:00+00:00"}},
+]})
+
+
+def uids(feed):
+    return re.findall(r'^UID:(.*)\r$', feed.decode('utf-8'), flags=re.MULTILINE)
+
+
+def test_every_session_has_a_unique_uid():
+    found = uids(render_feed(SEASON, SEASON.races))
+    assert len(found) == 6
+    assert len(set(found)) == len(found)
+    # Race weekends keep the UIDs subscribers already have
+    assert '2025-1-race@f1dashboard' in found
+
+
+def test_testing_events_are_told_apart_by_date():
+    found = uids(render_feed(SEASON, SEASON.races, frozenset({"practice1"})))
+    assert found == ['2025-0-20250226-practice1@f1dashboard', '2025-0-20250305-practice1@f1dashboard']
+
+
+def test_rendering_is_deterministic():
+    assert render_feed(SEASON, SEASON.races) == render_feed(SEASON, SEASON.races)
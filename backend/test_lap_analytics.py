@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('fastf1')
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from lap_analytics import LapAnalytics, degradation, fastest_laps, gap_to_leader, stint_summaries
+
+
+def lap(driver, number, lap_time, elapsed, stint=1, tyre_life=None, compound='MEDIUM', pit=False):
+    return {"Driver": driver, "Team": "Team " + driver, "LapNumber": number, "LapTime": lap_time,
+            "Stint": stint, "Compound": compound, "TyreLife": float(tyre_life if tyre_life is not None else number),
+            "Time": elapsed, "PitLap": pit, "IsAccurate": True}
+
+
+def make_frame():
+    """Two drivers over five laps; VER degrades 0.1 s per lap, HAM pits after lap 3."""
+    rows = []
+    elapsed = 0.0
+    for number in range(1, 6):
+        elapsed += 90.0 + 0.1 * number
+        rows.append(lap('VER', number, 90.0 + 0.1 * number, elapsed))
+    elapsed = 0.0
+    for number, lap_time in enumerate([91.0, 91.5, 110.0, 89.5, 89.9], start=1):
+        elapsed += lap_time
+        stint = 1 if number <= 3 else 2
+        rows.append(lap('HAM', number, lap_time, elapsed, stint=stint, tyre_life=number if stint == 1 else number - 3,
+                        compound='SOFT' if stint == 1 else 'HARD', pit=number in (3, 4)))
+    return pd.DataFrame(rows)
+
+
+def test_fastest_laps_are_ordered_with_gaps():
+    best = fastest_laps(make_frame())
+    assert [(row['Driver'], row['LapNumber'], row['LapTime']) for row in best] == [('HAM', 4, 89.5), ('VER', 1, 90.1)]
+    assert best[1]['GapToFastest'] == 0.6
+
+
+def test_stints_are_summarized_per_driver():
+    stints = stint_summaries(make_frame())
+    ham = [row for row in stints if row['Driver'] == 'HAM']
+    assert [(row['Stint'], row['Compound'], row['StartLap'], row['EndLap'], row['Laps']) for row in ham] == \
+        [(1, 'SOFT', 1, 3, 3), (2, 'HARD', 4, 5, 2)]
+    assert ham[0]['BestLapTime'] == 91.0
+
+
+def test_degradation_is_the_slope_of_clean_laps():
+    rows = degradation(make_frame())
+    # Lap 1 is excluded, which leaves VER four clean laps; HAM has fewer than three per stint
+    assert [row['Driver'] for row in rows] == ['VER']
+    assert rows[0]['DegradationPerLap'] == pytest.approx(0.1)
+    assert rows[0]['Laps'] == 4
+
+
+def test_gaps_are_measured_to_the_lap_leader():
+    gaps = gap_to_leader(make_frame())
+    assert gaps['VER'][0] == [1, 0.0]
+    assert gaps['HAM'][0] == [1, 0.9]
+    assert all(isinstance(number, int) for number, _ in gaps['HAM'])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sessions_without_laps_are_remembered_briefly():
+    calls = []
+
+    def loader(year, round_number, identifier):
+        calls.append((year, round_number, identifier))
+        raise ValueError("No lap data available")
+
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    analytics = LapAnalytics(loader=loader, breaker=breaker, failed_load_ttl=60, clock=clock)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            analytics.get_frame(2030, 1, 'R')
+    assert len(calls) == 1
+    # A session without laps is an answer, not an upstream failure
+    assert breaker.state == 'closed'
+
+    clock.now += 61
+    with pytest.raises(ValueError):
+        analytics.get_frame(2030, 1, 'R')
+    assert len(calls) == 2
+
+
+def test_upstream_failures_open_the_breaker():
+    calls = []
+
+    def loader(year, round_number, identifier):
+        calls.append(round_number)
+        raise ConnectionError("FastF1 is down")
+
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    analytics = LapAnalytics(loader=loader, breaker=breaker)
+    for round_number in (1, 2):
+        with pytest.raises(ConnectionError):
+            analytics.get_frame(2025, round_number, 'R')
+    with pytest.raises(CircuitOpenError):
+        analytics.get_frame(2025, 3, 'R')
+    assert calls == [1, 2]
+
+
+def test_load_locks_are_dropped_after_loading():
+    analytics = LapAnalytics(loader=lambda *key: make_frame())
+    threads = [threading.Thread(target=analytics.get_frame, args=(2025, round_number % 3, 'R'))
+               for round_number in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert analytics._load_locks == {}
+    assert len(analytics._frames) == 3
+
+
+def test_cache_quota_is_enforced_off_the_request_path():
+    release = threading.Event()
+    enforced = threading.Event()
+
+    class SlowCacheManager:
+        def touch(self, path):
+            pass
+
+        def enforce(self):
+            release.wait(5)
+            enforced.set()
+            return []
+
+    analytics = LapAnalytics(loader=lambda *key: make_frame(), cache_manager=SlowCacheManager())
+    try:
+        version, frame = analytics.get_frame(2025, 1, 'R')
+        assert version == 1 and not enforced.is_set()
+        release.set()
+        assert enforced.wait(5)
+    finally:
+        release.set()
+        analytics.maintenance.stop(timeout=5)
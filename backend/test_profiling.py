@@ -0,0 +1,71 @@
+import json
+import time
+import pstats
+
+from profiling import RequestProfile, SlowRequestProfiler
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def make_profile():
+    handler = ("app.py", 10, "get_next_race")
+    compute = ("fetcher.py", 20, "compute")
+    encode = ("serialization.py", 30, "encode")
+    samples = [(handler, compute), (handler, compute), (handler, encode), (handler,)]
+    return RequestProfile("GET /next-race", 0, 40.0, 200, 10.0, samples)
+
+
+def test_disabled_profiler_does_nothing():
+    profiler = SlowRequestProfiler(enabled=False)
+    token = profiler.start_request("GET /next-race")
+    assert token is None
+    assert profiler.finish_request(token) is None
+    assert profiler._thread is None
+    assert profiler.metrics()["profiled"] == 0
+
+
+def test_only_slow_requests_are_kept():
+    profiler = SlowRequestProfiler(enabled=True, threshold_ms=30, interval_ms=1, capacity=2)
+
+    assert profiler.finish_request(profiler.start_request("GET /health/live")) is None
+
+    slow = []
+    for number in range(3):
+        token = profiler.start_request(f"GET /next-race?n={number}")
+        busy_wait(0.05)
+        slow.append(profiler.finish_request(token, 200))
+
+    assert all(profile is not None for profile in slow)
+    assert [summary["label"] for summary in profiler.profiles()] == ["GET /next-race?n=2", "GET /next-race?n=1"]
+    assert profiler.get(slow[0].id) is None
+    assert slow[-1].samples
+    assert any(frame[2] == "busy_wait" for stack in slow[-1].samples for frame in stack)
+    assert profiler.metrics()["in_flight"] == 0
+
+
+def test_speedscope_export_references_shared_frames():
+    document = make_profile().to_speedscope()
+    frames = document["shared"]["frames"]
+    profile = document["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) == 4
+    assert [frames[index]["name"] for index in profile["samples"][2]] == ["get_next_race", "encode"]
+    json.dumps(document)
+
+
+def test_pstats_export_loads(tmp_path):
+    path = tmp_path / "profile.pstats"
+    path.write_bytes(make_profile().to_pstats())
+    stats = pstats.Stats(str(path)).stats
+
+    handler = ("app.py", 10, "get_next_race")
+    compute = ("fetcher.py", 20, "compute")
+    cc, nc, tt, ct, callers = stats[handler]
+    assert (nc, round(tt, 3), round(ct, 3)) == (4, 0.01, 0.04)
+    cc, nc, tt, ct, callers = stats[compute]
+    assert (nc, round(tt, 3)) == (2, 0.02)
+    assert callers[handler][:2] == (2, 2)
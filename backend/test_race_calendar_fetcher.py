@@ -0,0 +1,96 @@
+import os
+import datetime
+
+import pandas as pd
+import pytest
+
+import race_calendar_fetcher
+from race_calendar_fetcher import DEFAULT_YEAR, RaceCalendarFetcher, determine_race_status
+from serialization import CALENDAR_SCHEMA, encode, read_json_file
+
+NOW = 1744243200  # 2025-04-10T00:00:00Z, between status boundaries
+
+
+def make_schedule(year, race_hour=15):
+    return pd.DataFrame([{
+        "RoundNumber": 1, "Country": "Bahrain", "Location": "Sakhir", "EventName": "Bahrain Grand Prix",
+        "OfficialEventName": f"FORMULA 1 GULF AIR BAHRAIN GRAND PRIX {year}", "EventFormat": "conventional",
+        "EventDate": pd.Timestamp(f"{year}-04-13"),
+        "Session4Date": pd.Timestamp(f"{year}-04-12 16:00", tz="UTC"),
+        "Session5Date": pd.Timestamp(f"{year}-04-13 {race_hour}:00", tz="UTC"),
+    }])
+
+
+@pytest.fixture
+def fetcher(tmp_path, monkeypatch):
+    schedules = {}
+    monkeypatch.setattr(race_calendar_fetcher.fastf1, "get_event_schedule", lambda year: schedules[year])
+    fetcher = RaceCalendarFetcher(data_dir=str(tmp_path), cache_dir=str(tmp_path / "cache"), clock=lambda: NOW)
+    fetcher.schedules = schedules
+    yield fetcher
+    fetcher.scheduler.stop()
+
+
+def test_refreshing_another_season_leaves_the_default_alone(fetcher, tmp_path):
+    fetcher.schedules[2024] = make_schedule(2024)
+    assert fetcher.refresh_calendar("2024")["races"] == 1
+
+    assert fetcher.year == DEFAULT_YEAR
+    assert fetcher.calendar_file == os.path.join(str(tmp_path), f'f1_calendar_{DEFAULT_YEAR}.json')
+    assert read_json_file(os.path.join(str(tmp_path), 'f1_calendar_2024.json'))["year"] == "2024"
+    assert not os.path.exists(fetcher.calendar_file)
+
+
+def test_saved_calendar_is_encoded_like_responses(fetcher, tmp_path):
+    fetcher.schedules[2024] = make_schedule(2024)
+    fetcher.refresh_calendar("2024")
+
+    path = os.path.join(str(tmp_path), 'f1_calendar_2024.json')
+    with open(path, 'rb') as f:
+        saved = f.read()
+    assert b'\n' not in saved
+    assert saved == encode(read_json_file(path), CALENDAR_SCHEMA)
+
+
+def test_round_lookup_stays_on_the_requested_season(fetcher):
+    fetcher.schedules[2024] = make_schedule(2024)
+    fetcher.schedules[DEFAULT_YEAR] = make_schedule(DEFAULT_YEAR)
+    fetcher.get_calendar(str(DEFAULT_YEAR))
+    fetcher.get_calendar("2024")
+
+    race = fetcher.get_race_by_round(1, tz="Europe/London")
+    assert race["date"].startswith(f"{DEFAULT_YEAR}-04-13T16:00:00+01:00")
+    assert fetcher.get_race_by_round(1, year="2024")["date"].startswith("2024-04-13")
+
+
+def test_refresh_skips_an_unchanged_schedule_and_applies_a_changed_one(fetcher, monkeypatch):
+    processed = []
+    process_calendar = fetcher.process_calendar
+    monkeypatch.setattr(fetcher, "process_calendar",
+                        lambda schedule, year: processed.append(year) or process_calendar(schedule, year))
+    fetcher.schedules[DEFAULT_YEAR] = make_schedule(DEFAULT_YEAR)
+
+    assert fetcher.refresh_calendar(DEFAULT_YEAR)["decision"] == "stored"
+    version = fetcher.get_season(DEFAULT_YEAR).version
+    fetcher.schedules[DEFAULT_YEAR] = make_schedule(DEFAULT_YEAR)
+    assert fetcher.refresh_calendar(DEFAULT_YEAR)["decision"] == "skipped"
+    assert fetcher.get_season(DEFAULT_YEAR).version == version
+    assert processed == [str(DEFAULT_YEAR)]
+
+    fetcher.schedules[DEFAULT_YEAR] = make_schedule(DEFAULT_YEAR, race_hour=17)
+    result = fetcher.refresh_calendar(DEFAULT_YEAR)
+    assert result["decision"] == "changed"
+    assert [change["type"] for change in result["changes"]] == ["date_moved", "session_moved"]
+    race = fetcher.get_calendar(DEFAULT_YEAR)["races"][0]
+    assert race["date"].startswith(f"{DEFAULT_YEAR}-04-13T17:00:00")
+    assert race["status"] == "future"
+    assert len(processed) == 2
+
+
+def test_race_status_at_the_boundaries():
+    now = datetime.datetime(2025, 4, 13, 15, 0, tzinfo=datetime.timezone.utc)
+    assert determine_race_status(None, now) == "future"
+    assert determine_race_status(now - datetime.timedelta(seconds=1), now) == "completed"
+    assert determine_race_status(datetime.datetime(2025, 4, 13, 14, 59), now) == "completed"
+    assert determine_race_status(now + datetime.timedelta(hours=2), now) == "current"
+    assert determine_race_status(now + datetime.timedelta(days=1), now) == "future"
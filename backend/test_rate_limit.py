@@ -0,0 +1,49 @@
+import job_queue
+import rate_limit
+from rate_limit import InMemoryBucketStore, RateLimiter, RateLimitPolicy, client_identity
+
+
+def test_only_configured_keys_get_their_own_bucket():
+    keys = {"dashboard-1"}
+    assert client_identity({"X-API-Key": "made-up"}, "203.0.113.7", keys) == "ip:203.0.113.7"
+    identity = client_identity({"x-api-key": "dashboard-1"}, "203.0.113.7", keys)
+    assert identity.startswith("key:") and "dashboard-1" not in identity
+    assert client_identity({}, None, keys) == "ip:unknown"
+
+
+def test_metrics_do_not_publish_addresses_or_keys():
+    limiter = RateLimiter(store=InMemoryBucketStore(), policies={"default": RateLimitPolicy("default", 0.001, 1)},
+                          enabled=True)
+    for client in ("ip:203.0.113.7", client_identity({"X-API-Key": "secret"}, None, {"secret"})):
+        limiter.check(client)
+        assert not limiter.check(client).allowed
+
+    reported = limiter.metrics()["top_rejected_clients"]
+    assert len(reported) == 2
+    assert not any("203.0.113.7" in client or "secret" in client for client in reported)
+
+
+def test_rejected_clients_are_capped(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'MAX_REJECTED_CLIENTS', 5)
+    limiter = RateLimiter(store=InMemoryBucketStore(), policies={"default": RateLimitPolicy("default", 0.001, 0)},
+                          enabled=True)
+    for number in range(50):
+        limiter.check(f"ip:198.51.100.{number}")
+    limiter.check("ip:198.51.100.3")
+
+    assert list(limiter._rejected_clients) == ["ip:198.51.100.46", "ip:198.51.100.47", "ip:198.51.100.48",
+                                               "ip:198.51.100.49", "ip:198.51.100.3"]
+    assert limiter.metrics()["policies"]["default"]["rejected"] == 51
+
+
+def test_metrics_require_the_admin_token(monkeypatch):
+    import api_handler
+    monkeypatch.setattr(job_queue, 'ADMIN_TOKEN', 'admin-secret')
+
+    def get(headers):
+        event = {'httpMethod': 'GET', 'queryStringParameters': {'path': 'metrics'}, 'headers': headers}
+        return api_handler.handler(event, None)['statusCode']
+
+    assert get({}) == 403
+    assert get({'Authorization': 'Bearer wrong'}) == 403
+    assert get({'Authorization': 'Bearer admin-secret'}) == 200
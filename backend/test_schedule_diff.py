@@ -0,0 +1,55 @@
+from race_model import SeasonCalendar
+from schedule_diff import ChangeLog, diff_seasons, merge_season
+
+
+def make_season(races):
+    return SeasonCalendar.from_dict({"year": "2021", "races": races})
+
+
+def race(round_number, name, date, **sessions):
+    return {"round": round_number, "name": name, "date": date, "sessions": sessions or {"race": date}}
+
+
+TEST_1 = race(0, "Pre-Season Test", "2021-03-12T08:00:00+00:00")
+TEST_2 = race(0, "Pre-Season Test", "2021-03-14T08:00:00+00:00")
+BAHRAIN = race(1, "Bahrain Grand Prix", "2021-03-28T15:00:00+00:00")
+
+
+def test_identical_seasons_have_no_changes():
+    old, new = make_season([TEST_1, TEST_2, BAHRAIN]), make_season([TEST_1, TEST_2, BAHRAIN])
+    assert diff_seasons(old, new) == []
+    assert merge_season(old, new, []) == []
+
+
+def test_two_testing_events_are_diffed_and_merged_separately():
+    moved = dict(TEST_2, date="2021-03-15T08:00:00+00:00", sessions={"race": "2021-03-15T08:00:00+00:00"})
+    old, new = make_season([TEST_1, TEST_2, BAHRAIN]), make_season([TEST_1, moved, BAHRAIN])
+
+    changes = diff_seasons(old, new)
+    assert [(change["round"], change["type"]) for change in changes] == [(0, "date_moved"), (0, "session_moved")]
+
+    assert merge_season(old, new, changes) == [1]
+    dates = [item["date"] for item in old.to_dict()["races"]]
+    assert dates == [TEST_1["date"], moved["date"], BAHRAIN["date"]]
+
+
+def test_added_and_cancelled_events_replace_the_season():
+    old, new = make_season([TEST_1, TEST_2, BAHRAIN]), make_season([TEST_1, BAHRAIN])
+    changes = diff_seasons(old, new)
+    assert changes == [{"round": 0, "type": "cancelled", "name": "Pre-Season Test"}]
+    assert merge_season(old, new, changes) is None
+    assert [item["date"] for item in old.to_dict()["races"]] == [TEST_1["date"], BAHRAIN["date"]]
+
+
+def test_change_log_persists_and_filters_by_sequence(tmp_path):
+    path = str(tmp_path / "changes.json")
+    log = ChangeLog(path)
+    assert log.append([]) == 0
+    assert log.append([{"round": 1, "type": "date_moved"}, {"round": 2, "type": "cancelled"}]) == 2
+    assert log.append([{"round": 3, "type": "added"}]) == 3
+
+    reloaded = ChangeLog(path)
+    assert reloaded.latest == 3
+    assert [entry["round"] for entry in reloaded.since(1)] == [2, 3]
+    assert reloaded.since("2000-01-01T00:00:00Z") == reloaded.since()
+    assert reloaded.truncated_before == 1
@@ -0,0 +1,41 @@
+import pytest
+
+import serialization
+from race_model import SeasonCalendar
+from serialization import CALENDAR_SCHEMA, dumps, encode
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if serialization.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+def test_non_finite_floats_encode_as_null(backend):
+    payload = {"air_temp": float("nan"), "readings": [1.5, float("inf"), (float("-inf"),)]}
+    assert dumps(payload) == b'{"air_temp":null,"readings":[1.5,null,[null]]}'
+
+
+def test_backends_match_for_calendar_payloads(backend):
+    payload = {"year": "2025", "races": [{"round": "3", "name": "Japanese Grand Prix", "is_sprint": 0,
+                                          "circuit": {"lat": 34.8431, "lng": 136.541}}]}
+    assert encode(payload, CALENDAR_SCHEMA) == (
+        b'{"year":"2025","races":[{"round":3,"name":"Japanese Grand Prix","is_sprint":false,'
+        b'"circuit":{"lat":34.8431,"lng":136.541}}]}')
+
+
+def test_season_bytes_are_cached_until_touched():
+    season = SeasonCalendar.from_dict({"year": "2025", "races": [
+        {"round": 1, "name": "Bahrain Grand Prix", "date": "2025-04-13T15:00:00+00:00", "status": "future"}]})
+    first = season.encoded()
+    assert season.encoded() is first
+    assert first == encode(season.to_dict(), CALENDAR_SCHEMA)
+
+    season.races[0].status = "completed"
+    season.touch([0])
+    assert season.encoded() is not first
+    assert b'"status":"completed"' in season.encoded()
@@ -0,0 +1,220 @@
+import threading
+
+import pytest
+
+from race_model import SeasonCalendar
+from session_conditions import SessionConditions, SessionSeries
+
+QUALIFYING = 1744473600  # 2025-04-12T16:00:00Z
+RACE = 1744556400  # 2025-04-13T15:00:00Z
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFetcher:
+    year = "2025"
+
+    def __init__(self, now):
+        self.clock = FakeClock(now)
+        self.lookups = []
+        self.season = SeasonCalendar.from_dict({
+            "year": "2025",
+            "races": [
+                {"round": 1, "name": "Bahrain Grand Prix", "date": "2025-04-13T15:00:00+00:00",
+                 "sessions": {"qualifying": "2025-04-12T16:00:00+00:00", "race": "2025-04-13T15:00:00+00:00"}},
+            ]
+        })
+
+    def get_stored_season(self, year):
+        self.lookups.append(str(year))
+        return self.season if str(year) == "2025" else None
+
+
+class FakeLoader:
+    """Serves whatever rows of each session have 'happened' by the fetcher's clock."""
+
+    def __init__(self, fetcher, rows):
+        self.fetcher = fetcher
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, year, round_number, identifier):
+        self.calls.append((year, round_number, identifier))
+        now = self.fetcher.clock()
+        times = [t for t in self.rows.get(identifier, []) if t <= now]
+        return {
+            "weather": {"t": times, "air_temp": [20.0 + i for i in range(len(times))]},
+            "track_status": [{"t": t, "status": "1", "message": "AllClear"} for t in times[:1]]
+        }
+
+
+def test_series_appends_only_new_rows():
+    series = SessionSeries(2025, 1, 'R')
+    first = {"weather": {"t": [10, 20], "air_temp": [25.0, 25.5]},
+             "track_status": [{"t": 10, "status": "1", "message": "AllClear"}]}
+    assert series.extend(first, now=20) == 3
+    assert series.version == 1
+
+    second = {"weather": {"t": [10, 20, 30], "air_temp": [25.0, 25.5, 26.0]},
+              "track_status": [{"t": 10, "status": "1", "message": "AllClear"},
+                               {"t": 25, "status": "4", "message": "SCDeployed"}]}
+    assert series.extend(second, now=30) == 2
+    assert series.extend(second, now=40) == 0
+    assert series.version == 2
+
+    assert series.weather["t"] == [10, 20, 30]
+    assert series.weather["track_temp"] == [None, None, None]
+    assert series.weather_since(20) == {key: values[2:] for key, values in series.weather.items()}
+    assert [change["message"] for change in series.track_status_since(10)] == ["SCDeployed"]
+    assert series.header()["latest"] == 30
+    assert series.latest()["track_status"]["message"] == "SCDeployed"
+
+
+def test_poll_follows_the_clock_through_a_weekend():
+    fetcher = FakeFetcher(now=QUALIFYING - 7200)
+    loader = FakeLoader(fetcher, {"Q": [QUALIFYING, QUALIFYING + 60], "R": [RACE, RACE + 60]})
+    conditions = SessionConditions(fetcher, loader=loader)
+
+    assert conditions.active_sessions() == []
+    assert conditions.poll() == 0
+
+    fetcher.clock.now = QUALIFYING + 30
+    assert conditions.active_sessions() == [(2025, 1, 'Q')]
+    assert conditions.poll() == 2
+    fetcher.clock.now = QUALIFYING + 90
+    assert conditions.poll() == 1
+    assert conditions.poll() == 0
+
+    result = conditions.weather(2025, 1, session='q', since=QUALIFYING)
+    assert result["loading"] is False
+    assert result["sessions"]["Q"]["weather"]["t"] == [QUALIFYING + 60]
+    assert result["sessions"]["Q"]["version"] == 2
+
+    summary = conditions.summary(2025, 1)
+    assert summary["session"] == 'Q'
+    assert summary["weather"]["air_temp"] == 21.0
+    conditions.stop()
+
+
+def test_unknown_weekend_loads_in_background():
+    fetcher = FakeFetcher(now=RACE + 3600)
+    loader = FakeLoader(fetcher, {"Q": [QUALIFYING], "R": [RACE]})
+    gate = threading.Event()
+    conditions = SessionConditions(fetcher, loader=lambda *key: gate.wait(5) and loader(*key), poll_interval=3600)
+    conditions._run = lambda: None
+
+    with pytest.raises(ValueError):
+        conditions.track_status(2025, 1, session='FP9')
+
+    assert conditions.weather(2025, 1)["loading"] is True
+    assert conditions.weather(2025, 1, session='Q')["loading"] is True
+    assert len(conditions._loads.jobs()) == 1
+    gate.set()
+    conditions._loads.stop(timeout=5)
+    assert conditions.stats()["loading"] == 0
+
+    result = conditions.track_status(2025, 1)
+    assert sorted(result["sessions"]) == ['Q', 'R']
+    assert sorted(call[2] for call in loader.calls) == ['Q', 'R']
+    conditions.stop()
+
+
+def test_only_rounds_of_the_tracked_season_are_served():
+    fetcher = FakeFetcher(now=RACE + 3600)
+    loader = FakeLoader(fetcher, {"R": [RACE]})
+    conditions = SessionConditions(fetcher, loader=loader, poll_interval=3600)
+    conditions._run = lambda: None
+
+    assert conditions.weather(2025, 2) is None
+    assert conditions.track_status(2019, 1) is None
+    assert set(fetcher.lookups) == {"2025"}
+    assert loader.calls == []
+
+
+def test_lru_keeps_max_sessions():
+    fetcher = FakeFetcher(now=RACE + 3600)
+    loader = FakeLoader(fetcher, {"Q": [QUALIFYING], "R": [RACE]})
+    conditions = SessionConditions(fetcher, loader=loader, max_sessions=1)
+    conditions.refresh(2025, 1, 'Q')
+    conditions.refresh(2025, 1, 'R')
+    assert conditions.stats()["sessions"] == 1
+    assert [series.session for series in conditions._weekend(2025, 1)] == ['R']
+
+
+def test_loader_reads_only_the_side_feeds(monkeypatch):
+    fastf1 = pytest.importorskip("fastf1")
+    pd = pytest.importorskip("pandas")
+    from fastf1 import api
+
+    from session_conditions import load_session_side_data
+
+    class StubSession:
+        date = pd.Timestamp("2025-04-13 15:00:00")  # scheduled start, UTC
+        api_path = "/static/2025/2025-04-13_Bahrain_Grand_Prix/2025-04-13_Race/"
+
+        def load(self, **kwargs):
+            raise AssertionError("the loader must not load the whole session")
+
+    requested = []
+
+    def feed(name, data):
+        def fetch(path):
+            requested.append((name, path))
+            return data
+        return fetch
+
+    started = pd.Timedelta(minutes=58)
+    monkeypatch.setattr(fastf1, "get_session", lambda year, round_number, identifier: StubSession())
+    monkeypatch.setattr(api, "session_status_data", feed("status", {
+        "Time": [pd.Timedelta(minutes=40), started], "Status": ["Inactive", "Started"]}))
+    monkeypatch.setattr(api, "weather_data", feed("weather", {
+        "Time": [started - pd.Timedelta(minutes=1), started + pd.Timedelta(minutes=1)],
+        "AirTemp": [25.04, float("nan")], "TrackTemp": [41.0, 41.5], "Humidity": [30.0, 31.0],
+        "Pressure": [1010.0, 1010.0], "Rainfall": [False, False], "WindDirection": [180, 190],
+        "WindSpeed": [2.0, 2.1]}))
+    monkeypatch.setattr(api, "track_status_data", feed("track_status", {
+        "Time": [started, started + pd.Timedelta(minutes=10)], "Status": ["1", "4"],
+        "Message": ["AllClear", "SCDeployed"]}))
+
+    data = load_session_side_data(2025, 4, 'R')
+    assert sorted(name for name, _ in requested) == ["status", "track_status", "weather"]
+    assert data["weather"]["t"] == [RACE - 60, RACE + 60]
+    assert data["weather"]["air_temp"] == [25.0, None]
+    assert data["weather"]["rainfall"] == [False, False]
+    assert data["track_status"] == [{"t": RACE, "status": "1", "message": "AllClear"},
+                                    {"t": RACE + 600, "status": "4", "message": "SCDeployed"}]
+
+
+def test_practice_sessions_of_a_processed_calendar_are_polled(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("fastf1")
+    from race_calendar_fetcher import RaceCalendarFetcher
+
+    schedule = pd.DataFrame([{
+        "RoundNumber": 1, "Country": "Bahrain", "Location": "Sakhir", "EventName": "Bahrain Grand Prix",
+        "EventFormat": "conventional", "EventDate": pd.Timestamp("2025-04-13"),
+        "Session1Date": pd.Timestamp("2025-04-11 11:30", tz="UTC"),
+        "Session2Date": pd.Timestamp("2025-04-11 15:00", tz="UTC"),
+        "Session3Date": pd.Timestamp("2025-04-12 12:30", tz="UTC"),
+        "Session4Date": pd.Timestamp("2025-04-12 16:00", tz="UTC"),
+        "Session5Date": pd.Timestamp("2025-04-13 15:00", tz="UTC"),
+    }])
+    fetcher = FakeFetcher(now=RACE + 3600)
+    producer = RaceCalendarFetcher(data_dir=str(tmp_path), cache_dir=str(tmp_path), clock=fetcher.clock)
+    fetcher.season = SeasonCalendar.from_dict(producer.process_calendar(schedule, 2025))
+    producer.scheduler.stop()
+
+    first_practice = 1744371000  # 2025-04-11T11:30:00Z
+    conditions = SessionConditions(fetcher, loader=FakeLoader(fetcher, {}), poll_interval=3600)
+    assert conditions.active_sessions(now=first_practice) == [(2025, 1, 'FP1')]
+
+    conditions._run = lambda: None
+    conditions.weather(2025, 1)
+    conditions._loads.stop(timeout=5)
+    assert [call[2] for call in conditions.loader.calls] == ['FP1', 'FP2', 'FP3', 'Q', 'R']
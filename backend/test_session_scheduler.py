@@ -0,0 +1,110 @@
+from clock import parse_at
+from live_updates import LiveStatusBroadcaster
+from race_model import SeasonCalendar
+from session_scheduler import SessionScheduler, status_boundaries
+
+QUALIFYING = parse_at("2025-04-12T16:00:00Z")
+RACE = parse_at("2025-04-13T15:00:00Z")
+
+
+def make_season():
+    return SeasonCalendar.from_dict({
+        "year": "2025",
+        "races": [
+            {"round": 1, "name": "Bahrain Grand Prix", "date": "2025-04-13T15:00:00+00:00",
+             "sessions": {"qualifying": "2025-04-12T16:00:00+00:00", "race": "2025-04-13T15:00:00+00:00"}},
+            {"round": 2, "name": "Saudi Arabian Grand Prix", "date": "2025-04-20T17:00:00+00:00",
+             "sessions": {"qualifying": "2025-04-19T17:00:00+00:00", "race": "2025-04-20T17:00:00+00:00"}},
+        ]
+    })
+
+
+def session_statuses(season, round_number=1):
+    race = season.races[round_number - 1]
+    return {session.key: session.status for session in race.sessions}
+
+
+def tracked(now):
+    season = make_season()
+    scheduler = SessionScheduler(clock=lambda: now, autostart=False)
+    scheduler.track("2025", season)
+    return season, scheduler
+
+
+def test_sessions_are_live_from_their_start_until_their_duration_ends():
+    # Qualifying lasts 60 minutes, the race 120 (ics_export.SESSION_DURATIONS)
+    assert session_statuses(tracked(QUALIFYING - 1)[0])["qualifying"] == "future"
+    assert session_statuses(tracked(QUALIFYING)[0])["qualifying"] == "live"
+    assert session_statuses(tracked(QUALIFYING + 3599)[0])["qualifying"] == "live"
+    assert session_statuses(tracked(QUALIFYING + 3600)[0])["qualifying"] == "completed"
+
+    season, _ = tracked(RACE + 7199)
+    assert session_statuses(season) == {"qualifying": "completed", "race": "live"}
+    assert season.races[0].status == "completed"
+    assert session_statuses(tracked(RACE + 7200)[0])["race"] == "completed"
+
+
+def test_heap_applies_start_and_end_boundaries_in_order():
+    season, scheduler = tracked(QUALIFYING - 60)
+    assert scheduler.next_boundary() == QUALIFYING
+
+    assert scheduler.advance(QUALIFYING) == 1
+    assert session_statuses(season)["qualifying"] == "live"
+    assert scheduler.next_boundary() == QUALIFYING + 3600
+
+    assert scheduler.advance(QUALIFYING + 3599) == 0
+    assert scheduler.advance(QUALIFYING + 3600) == 1
+    assert session_statuses(season)["qualifying"] == "completed"
+
+    # Race day, race start and race session start are all due by the race start
+    applied = scheduler.advance(RACE)
+    assert applied == 3
+    assert season.races[0].status == "completed"
+    assert session_statuses(season)["race"] == "live"
+
+
+def test_tracking_mid_session_queues_only_its_end():
+    season, scheduler = tracked(QUALIFYING + 60)
+    assert session_statuses(season)["qualifying"] == "live"
+    assert scheduler.next_boundary() == QUALIFYING + 3600
+
+
+def test_session_ends_are_status_boundaries():
+    boundaries = status_boundaries(make_season())
+    assert QUALIFYING in boundaries and QUALIFYING + 3600 in boundaries
+    assert RACE + 7200 in boundaries
+
+
+class FakeFetcher:
+    def __init__(self, season, scheduler):
+        self.season = season
+        self.scheduler = scheduler
+
+    def get_calendar(self, year):
+        return self.season.to_dict()
+
+    def get_next_race(self, year):
+        return self.scheduler.next_race(year)
+
+
+def events(subscriber):
+    found = []
+    while not subscriber.empty():
+        found.append(subscriber.get_nowait())
+    return [(event_type, data) for _, event_type, data in found]
+
+
+def test_broadcaster_labels_sessions_started_at_their_start_and_ended_at_their_end():
+    season, scheduler = tracked(QUALIFYING - 60)
+    broadcaster = LiveStatusBroadcaster(FakeFetcher(season, scheduler), year=2025)
+    subscriber = broadcaster.subscribe()
+
+    scheduler.advance(QUALIFYING)
+    assert events(subscriber) == [("update", {"sessions_started": [{"round": 1, "session": "qualifying"}]})]
+
+    scheduler.advance(QUALIFYING + 3599)
+    assert events(subscriber) == []
+
+    scheduler.advance(QUALIFYING + 3600)
+    assert events(subscriber) == [("update", {"sessions_ended": [{"round": 1, "session": "qualifying"}]})]
+    broadcaster.stop()
@@ -0,0 +1,137 @@
+import os
+import gzip
+import json
+
+import pytest
+
+import api_handler
+from build_static import build_bundle, is_stale, redirect_rules, update_redirects
+from calendar_archive import ARCHIVE_FILE, CalendarArchive, write_archive
+
+NOW = 1744243200  # 2025-04-10T00:00:00Z, mid-season
+
+
+def make_calendar(year):
+    return {"year": str(year), "races": [
+        {"round": 1, "name": "British Grand Prix", "date": f"{year}-05-13T14:00:00+00:00", "status": "completed",
+         "sessions": {"race": f"{year}-05-13T14:00:00+00:00"}}]}
+
+
+def handler_body(path, at=None):
+    params = {'path': path}
+    if at is not None:
+        params['at'] = repr(float(at))
+    response = api_handler.handler({'httpMethod': 'GET', 'queryStringParameters': params, 'headers': {}}, None)
+    assert response['statusCode'] == 200
+    return response['body'].encode('utf-8')
+
+
+@pytest.fixture(scope='module')
+def bundle(tmp_path_factory):
+    archive_path = str(tmp_path_factory.mktemp('data') / ARCHIVE_FILE)
+    write_archive(archive_path, {"1950": make_calendar(1950), "1951": make_calendar(1951)}, 1767225600)
+    out_dir = str(tmp_path_factory.mktemp('static-api'))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(api_handler.calendar_fetcher, 'archive', CalendarArchive(archive_path))
+        manifest = build_bundle(out_dir, now=NOW)
+        yield out_dir, manifest
+
+
+def read(out_dir, relative):
+    with open(os.path.join(out_dir, relative), 'rb') as f:
+        return f.read()
+
+
+def test_archived_seasons_never_expire(bundle):
+    _, manifest = bundle
+    for route in ('/calendar/1950', '/calendar/1951'):
+        assert manifest['routes'][route]['valid_until'] is None
+
+
+def test_time_dependent_routes_are_bundled_for_the_current_window(bundle):
+    _, manifest = bundle
+    assert {'/calendar', '/calendar/2025', '/next-race', '/race/1', '/race/24'} <= set(manifest['routes'])
+
+    for route in ('/calendar', '/next-race', '/race/24'):
+        entry = manifest['routes'][route]
+        assert entry['valid_from'] == NOW
+        assert entry['valid_until'] is not None and entry['valid_until'] > NOW
+    # Round 1 was run before the build and cannot change any more
+    assert manifest['routes']['/race/1']['valid_until'] is None
+    assert manifest['valid_until'] == min(entry['valid_until'] for entry in manifest['routes'].values()
+                                          if entry['valid_until'] is not None)
+
+
+def test_static_routes_match_live_handler(bundle):
+    out_dir, manifest = bundle
+
+    for route, entry in manifest['routes'].items():
+        path = route.lstrip('/')
+        # Archived seasons read the same at any instant
+        expected = handler_body(path, at=NOW)
+        assert read(out_dir, entry['alias']) == expected, route
+        assert read(out_dir, entry['file']) == expected, route
+        assert gzip.decompress(read(out_dir, entry['file'] + '.gz')) == expected, route
+
+
+def test_hashed_names_follow_content(bundle):
+    out_dir, manifest = bundle
+    for entry in manifest['routes'].values():
+        assert entry['sha256'][:12] in entry['file']
+        assert entry['bytes'] == len(read(out_dir, entry['file']))
+
+
+@pytest.mark.parametrize('route', ['/next-race', '/race/1', '/race/12'])
+def test_windows_are_contiguous_and_match_the_handler_inside_them(bundle, route):
+    out_dir, manifest = bundle
+    fetcher = api_handler.calendar_fetcher
+    windows = manifest['windows'][route]
+    assert windows[0]['valid_from'] == NOW
+    assert read(out_dir, windows[0]['file']) == read(out_dir, manifest['routes'][route]['alias'])
+
+    for previous, current in zip(windows, windows[1:]):
+        assert previous['valid_until'] == current['valid_from']
+        assert previous['window'][1] <= current['window'][0]
+
+    for window in windows:
+        end = window['valid_until'] if window['valid_until'] is not None else window['valid_from'] + 2
+        instant = (window['valid_from'] + end) / 2
+        assert read(out_dir, window['file']) == handler_body(route.lstrip('/'), at=instant), (route, window)
+        _, start, stop = fetcher.get_status_window('2025', instant)
+        assert window['window'][0] <= start and stop <= window['window'][1]
+
+
+def test_race_files_only_change_around_their_own_weekend(bundle):
+    _, manifest = bundle
+    # Consecutive windows that render the same body share one file
+    assert len(manifest['windows']['/race/12']) < len(manifest['windows']['/next-race'])
+
+
+def test_bundle_is_stale_from_its_valid_until(bundle):
+    out_dir, manifest = bundle
+    assert not is_stale(out_dir, now=NOW)
+    assert is_stale(out_dir, now=manifest['valid_until'])
+    assert is_stale(str(out_dir) + '-missing', now=NOW)
+
+
+def test_manifest_is_written(bundle):
+    out_dir, manifest = bundle
+    with open(os.path.join(out_dir, 'manifest.json')) as f:
+        assert json.load(f)['routes'].keys() == manifest['routes'].keys()
+
+
+def test_redirects_send_filtered_requests_to_function(bundle, tmp_path):
+    _, manifest = bundle
+    rules = redirect_rules(manifest)
+    assert any(rule.startswith('/calendar/1950 tz=:value /.netlify/functions/api_handler') for rule in rules)
+    assert any(rule.startswith('/next-race at=:value /.netlify/functions/api_handler') for rule in rules)
+    assert '/next-race /static-api/next-race.json 200' in rules
+
+    redirects = tmp_path / '_redirects'
+    redirects.write_text('/* /index.html 200\n')
+    update_redirects(str(redirects), manifest)
+    update_redirects(str(redirects), manifest)
+    lines = redirects.read_text().splitlines()
+    # The generated block is replaced, not duplicated, and stays ahead of the SPA fallback
+    assert lines.count(rules[0]) == 1
+    assert lines[-1] == '/* /index.html 200'
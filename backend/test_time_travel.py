@@ -0,0 +1,94 @@
+import pytest
+
+from clock import TimeTravelClock, create_clock, parse_at
+from race_model import SeasonCalendar
+from session_scheduler import evaluate_season, status_boundaries
+
+
+def make_season():
+    return SeasonCalendar.from_dict({
+        "year": "2025",
+        "races": [
+            {"round": 1, "name": "Bahrain Grand Prix", "date": "2025-04-13T15:00:00+00:00",
+             "sessions": {"qualifying": "2025-04-12T16:00:00+00:00", "race": "2025-04-13T15:00:00+00:00"}},
+            {"round": 2, "name": "Saudi Arabian Grand Prix", "date": "2025-04-20T17:00:00+00:00",
+             "sessions": {"qualifying": "2025-04-19T17:00:00+00:00", "race": "2025-04-20T17:00:00+00:00"}},
+        ]
+    })
+
+
+def test_parse_at_accepts_iso_and_epoch():
+    assert parse_at("2025-04-13T15:00:00Z") == 1744556400
+    assert parse_at("2025-04-13T15:00:00") == 1744556400
+    assert parse_at("1744556400") == 1744556400
+    with pytest.raises(ValueError):
+        parse_at("next sunday")
+
+
+@pytest.mark.parametrize('value', ['inf', '-inf', 'nan', '1e20', '-1e20', '0001-01-01T00:00:00Z'])
+def test_parse_at_rejects_instants_out_of_range(value):
+    # These used to reach datetime and fail with OverflowError (a 500)
+    with pytest.raises(ValueError):
+        parse_at(value)
+
+
+def test_frozen_clock_only_moves_when_told():
+    clock = TimeTravelClock(1000, frozen=True)
+    assert clock() == 1000
+    clock.advance(60)
+    assert clock() == 1060
+
+
+def test_running_clock_advances_with_its_source():
+    ticks = iter([50, 80])
+    clock = TimeTravelClock(1000, source=lambda: next(ticks))
+    assert clock() == 1030
+
+
+def test_create_clock_defaults_to_wall_clock():
+    import time
+    assert create_clock({}) is time.time
+    assert create_clock({'CLOCK_AT': '1000', 'CLOCK_FROZEN': '1'})() == 1000
+
+
+def test_evaluate_season_replays_any_instant_without_touching_the_season():
+    season = make_season()
+    version = season.version
+
+    scratch, next_race = evaluate_season(season, parse_at("2025-04-13T16:00:00Z"))
+    assert [race.status for race in scratch.races] == ["completed", "future"]
+    assert next_race["round"] == 2
+    assert season.version == version
+
+    # At its exact start time a race is still current, but no longer the next race
+    scratch, next_race = evaluate_season(season, parse_at("2025-04-13T15:00:00Z"))
+    assert scratch.races[0].status == "current"
+    assert next_race["round"] == 2
+
+
+def test_demo_mode_follows_the_clock():
+    _, next_race = evaluate_season(make_season(), parse_at("2025-04-01T00:00:00Z"))
+    assert not next_race.get("demo_mode")
+
+    _, next_race = evaluate_season(make_season(), parse_at("2025-12-01T00:00:00Z"))
+    assert next_race["demo_mode"] is True
+    assert next_race["round"] == 1
+
+
+def test_instants_in_one_window_get_identical_answers():
+    season = make_season()
+    boundaries = status_boundaries(season)
+    assert boundaries == sorted(set(boundaries))
+
+    start, end = boundaries[1], boundaries[2]
+    first = evaluate_season(season, start + 1)
+    last = evaluate_season(season, end - 1)
+    assert first[0].to_dict() == last[0].to_dict()
+    assert first[1] == last[1]
+
+
+@pytest.mark.parametrize('path', ['calendar', 'next-race', 'race/1'])
+def test_out_of_range_at_is_a_bad_request(path):
+    import api_handler
+    event = {'httpMethod': 'GET', 'queryStringParameters': {'path': path, 'at': '1e20'}, 'headers': {}}
+    assert api_handler.handler(event, None)['statusCode'] == 400
@@ -57,8 +57,13 @@ const Countdown = ({ targetDate }) => {
   );
 };
 
+// localStorage key holding the last dashboard sections and their ETags
+const DASHBOARD_CACHE_KEY = 'f1-dashboard-sections';
+
 function App() {
   const [nextRace, setNextRace] = useState(null);
+  const [lastWinner, setLastWinner] = useState(null);
+  const [conditions, setConditions] = useState(null);
   const [calendar, setCalendar] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -73,35 +78,49 @@ function App() {
     const fetchData = async () => {
       try {
         setLoading(true);
-        // Fetch next race data
-        const nextRaceResponse = await fetch(`${apiBaseUrl}/next-race`);
-        if (!nextRaceResponse.ok) {
-          throw new Error(`Failed to fetch next race data: ${nextRaceResponse.status} ${nextRaceResponse.statusText}`);
-        }
-        
-        // Check content-type to ensure we're getting JSON
-        const contentType = nextRaceResponse.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-          throw new Error(`Expected JSON response but got ${contentType || 'unknown format'}`);
-        }
-        
-        const nextRaceData = await nextRaceResponse.json();
-        
-        // Fetch calendar data
-        const calendarResponse = await fetch(`${apiBaseUrl}/calendar`);
-        if (!calendarResponse.ok) {
-          throw new Error(`Failed to fetch calendar data: ${calendarResponse.status} ${calendarResponse.statusText}`);
+        // One request for every section; send the ETags of sections we already hold
+        let cached = {};
+        try {
+          cached = JSON.parse(window.localStorage.getItem(DASHBOARD_CACHE_KEY)) || {};
+        } catch (storageError) {
+          cached = {};
         }
+        const knownEtags = Object.values(cached).map((section) => section.etag).filter(Boolean);
+        const dashboardResponse = await fetch(`${apiBaseUrl}/dashboard`, {
+          headers: knownEtags.length ? { 'If-None-Match': knownEtags.join(', ') } : {}
+        });
         
-        // Check content-type to ensure we're getting JSON
-        const calendarContentType = calendarResponse.headers.get('content-type');
-        if (!calendarContentType || !calendarContentType.includes('application/json')) {
-          throw new Error(`Expected JSON response but got ${calendarContentType || 'unknown format'}`);
+        let sections = cached;
+        if (dashboardResponse.status !== 304) {
+          if (!dashboardResponse.ok) {
+            throw new Error(`Failed to fetch dashboard data: ${dashboardResponse.status} ${dashboardResponse.statusText}`);
+          }
+          
+          // Check content-type to ensure we're getting JSON
+          const contentType = dashboardResponse.headers.get('content-type');
+          if (!contentType || !contentType.includes('application/json')) {
+            throw new Error(`Expected JSON response but got ${contentType || 'unknown format'}`);
+          }
+          
+          const dashboardData = await dashboardResponse.json();
+          sections = {};
+          Object.entries(dashboardData.sections || {}).forEach(([name, section]) => {
+            // Unchanged sections arrive without data; reuse the stored copy
+            sections[name] = section.not_modified ? cached[name] : section;
+          });
+          try {
+            window.localStorage.setItem(DASHBOARD_CACHE_KEY, JSON.stringify(sections));
+          } catch (storageError) {
+            // Storage full or disabled; the next load simply fetches everything
+          }
         }
         
-        const calendarData = await calendarResponse.json();
+        const nextRaceData = sections.next_race ? sections.next_race.data : null;
+        const calendarData = sections.calendar ? sections.calendar.data : null;
         
         setNextRace(nextRaceData);
+        setLastWinner(sections.last_winner ? sections.last_winner.data : null);
+        setConditions(sections.conditions ? sections.conditions.data : null);
         // Make sure calendar data is an array before setting it
         if (calendarData && Array.isArray(calendarData)) {
           setCalendar(calendarData);
@@ -123,7 +142,41 @@ function App() {
     
     fetchData();
   }, [apiBaseUrl]);
-  
+
+  // Subscribe to live status pushes instead of polling
+  useEffect(() => {
+    if (!window.EventSource) return undefined;
+
+    const source = new EventSource(`${apiBaseUrl}/events`);
+
+    source.addEventListener('update', (event) => {
+      const diff = JSON.parse(event.data);
+
+      if (diff.races) {
+        const statusByRound = {};
+        diff.races.forEach((change) => {
+          statusByRound[change.round] = change.status;
+        });
+        setCalendar((current) => current.map((race) => (
+          race.round in statusByRound ? { ...race, status: statusByRound[race.round] } : race
+        )));
+      }
+
+      if (diff.next_race) {
+        setNextRace(diff.next_race);
+      }
+    });
+
+    source.onerror = () => {
+      // Serverless deployments cannot hold the stream open; fall back to the initial fetch
+      if (source.readyState === EventSource.CLOSED) {
+        source.close();
+      }
+    };
+
+    return () => source.close();
+  }, [apiBaseUrl]);
+
   // Function to format date for display
   const formatDate = (dateString) => {
     const options = { weekday: 'short', month: 'short', day: 'numeric' };
@@ -237,6 +290,18 @@ function App() {
                         );
                       })()}
                       <p className="next-race-time">Race starts at: {nextRace.time || 'TBD'}</p>
+                      {lastWinner && (
+                        <p className="next-race-time">
+                          Last winner: {lastWinner.driver_name || lastWinner.driver_code} ({lastWinner.name || `Round ${lastWinner.round}`})
+                        </p>
+                      )}
+                      {conditions && conditions.weather && (
+                        <p className="next-race-time">
+                          {conditions.session}: air {conditions.weather.air_temp}°C, track {conditions.weather.track_temp}°C
+                          {conditions.weather.rainfall ? ', rain' : ''}
+                          {conditions.track_status ? ` · ${conditions.track_status.message}` : ''}
+                        </p>
+                      )}
                     </div>
                     
                     <Countdown targetDate={`${nextRace.date}T${nextRace.time || '00:00:00'}`} />